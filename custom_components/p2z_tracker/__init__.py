@@ -7,18 +7,31 @@ https://github.com/xyz00777/hacs_p2z_tracker
 
 from __future__ import annotations
 
-from datetime import timedelta
 from typing import TYPE_CHECKING
 
 from homeassistant.const import Platform
+from homeassistant.helpers import config_validation as cv
 from homeassistant.loader import async_get_loaded_integration
 
-from .const import DEFAULT_UPDATE_INTERVAL, DOMAIN, LOGGER
+from .const import (
+    CONF_ENTRY_TYPE,
+    CONF_PERSON_ENTITY,
+    DOMAIN,
+    ENTRY_TYPE_HOUSEHOLD,
+    LOGGER,
+)
 from .coordinator import P2ZDataUpdateCoordinator
 from .data import P2ZTrackerData
+from .household import P2ZHouseholdCoordinator
+from .scheduler import async_get_scheduler
+from .services import async_setup_services
+from .store import IntervalStore
+from .websocket_api import async_setup_websocket_api
+from .zones import async_setup_zone_resolver
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
 
     from .data import P2ZTrackerConfigEntry
 
@@ -26,6 +39,16 @@ PLATFORMS: list[Platform] = [
     Platform.SENSOR,
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the zone resolver, services and websocket commands."""
+    await async_setup_zone_resolver(hass)
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+    return True
+
 
 # https://developers.home-assistant.io/docs/config_entries_index/#setting-up-an-entry
 async def async_setup_entry(
@@ -33,11 +56,17 @@ async def async_setup_entry(
     entry: P2ZTrackerConfigEntry,
 ) -> bool:
     """Set up this integration using UI."""
-    coordinator = P2ZDataUpdateCoordinator(
+    coordinator_class = (
+        P2ZHouseholdCoordinator
+        if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_HOUSEHOLD
+        else P2ZDataUpdateCoordinator
+    )
+    # Refreshes are driven by the shared scheduler rather than per-entry timers
+    coordinator = coordinator_class(
         hass=hass,
         logger=LOGGER,
         name=DOMAIN,
-        update_interval=timedelta(seconds=DEFAULT_UPDATE_INTERVAL),
+        update_interval=None,
         config_entry=entry,
     )
     entry.runtime_data = P2ZTrackerData(
@@ -46,7 +75,13 @@ async def async_setup_entry(
     )
 
     # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
-    await coordinator.async_config_entry_first_refresh()
+    scheduler = async_get_scheduler(hass)
+    await scheduler.async_run_limited(coordinator.async_config_entry_first_refresh)
+    entry.async_on_unload(
+        scheduler.async_register(
+            entry.entry_id, coordinator, entry.data.get(CONF_PERSON_ENTITY)
+        )
+    )
 
     # Cleanup orphaned entities
     await _async_cleanup_orphaned_entities(hass, entry)
@@ -65,6 +100,15 @@ async def async_unload_entry(
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
+async def async_remove_entry(
+    hass: HomeAssistant,
+    entry: P2ZTrackerConfigEntry,
+) -> None:
+    """Delete the stored intervals of a removed entry."""
+    if entry.data.get(CONF_ENTRY_TYPE) != ENTRY_TYPE_HOUSEHOLD:
+        await IntervalStore(hass, entry.entry_id).async_remove()
+
+
 async def async_reload_entry(
     hass: HomeAssistant,
     entry: P2ZTrackerConfigEntry,
@@ -79,41 +123,23 @@ async def _async_cleanup_orphaned_entities(
 ) -> None:
     """Remove entities that are no longer tracked."""
     from homeassistant.helpers import device_registry as dr, entity_registry as er
-    from homeassistant.util import slugify
-
-    from .const import (
-        CONF_PERSON_ENTITY,
-        CONF_TRACKED_ZONES,
-        CONF_ZONE_NAME,
-        PERIOD_MONTH,
-        PERIOD_TODAY,
-        PERIOD_WEEK,
-    )
+
+    from .selection import expected_device_identifiers, expected_unique_ids
 
     entity_registry = er.async_get(hass)
-    tracked_zones = entry.options.get(CONF_TRACKED_ZONES, [])
-    person_entity = entry.data[CONF_PERSON_ENTITY]
-    person_name = person_entity.replace("person.", "")
-    periods = [PERIOD_TODAY, PERIOD_WEEK, PERIOD_MONTH]
-
-    # Generate set of expected unique IDs
-    expected_unique_ids = set()
-    for zone_config in tracked_zones:
-        zone_name = zone_config[CONF_ZONE_NAME]
-        zone_slug = slugify(zone_name.replace("zone.", ""))
-        for period in periods:
-            expected_unique_ids.add(f"p2z_{person_name}_{zone_slug}_{period}")
+    # Sensor setup builds its entities from the same per-zone selection
+    expected_ids = expected_unique_ids(entry)
 
     # Find and remove entities that are not in expected list
     entries = er.async_entries_for_config_entry(entity_registry, entry.entry_id)
     LOGGER.debug(
         "Checking cleanup: Found %d existing entities, expected %d unique IDs",
         len(entries),
-        len(expected_unique_ids),
+        len(expected_ids),
     )
 
     for entity in entries:
-        if entity.unique_id not in expected_unique_ids:
+        if entity.unique_id not in expected_ids:
             LOGGER.info("Removing orphaned entity: %s", entity.entity_id)
             entity_registry.async_remove(entity.entity_id)
 
@@ -122,11 +148,7 @@ async def _async_cleanup_orphaned_entities(
     devices = dr.async_entries_for_config_entry(device_registry, entry.entry_id)
 
     # Generate set of expected device identifiers
-    expected_device_ids = set()
-    for zone_config in tracked_zones:
-        zone_name = zone_config[CONF_ZONE_NAME]
-        zone_slug = slugify(zone_name.replace("zone.", ""))
-        expected_device_ids.add((DOMAIN, f"{person_name}_{zone_slug}"))
+    expected_device_ids = expected_device_identifiers(entry)
 
     for device in devices:
         # Check if device has any of our expected identifiers
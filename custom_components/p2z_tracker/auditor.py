@@ -0,0 +1,208 @@
+"""Background integrity auditor for p2z_tracker."""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    AUDIT_DAYS_PER_RUN,
+    AUDIT_INTERVAL,
+    AUDIT_MAX_BACKLOG,
+    AUDIT_RECENT_MISMATCHES,
+    AUDIT_TOLERANCE,
+    DOMAIN,
+    LOGGER,
+)
+from .scheduler import async_get_scheduler
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from .coordinator import P2ZDataUpdateCoordinator
+
+
+class IntegrityAuditor:
+    """Recompute stored days from the recorder and repair the ones that drifted."""
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: P2ZDataUpdateCoordinator
+    ) -> None:
+        """Initialize the auditor of one person entry."""
+        self._hass = hass
+        self._coordinator = coordinator
+        # Per zone, the day audited last; audits walk back from yesterday
+        self._cursor: dict[str, date] = {}
+        self._next_zone = 0
+        self._running = False
+        self.days_checked = 0
+        self.mismatches = 0
+        self.healed = 0
+        self.unhealed = 0
+        self.repaired_gap_days = 0
+        self.last_run: datetime | None = None
+        self.recent: deque[dict[str, Any]] = deque(maxlen=AUDIT_RECENT_MISMATCHES)
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start auditing in small steps, returning a callback that stops it."""
+        return async_track_time_interval(
+            self._hass,
+            self._async_step,
+            timedelta(seconds=AUDIT_INTERVAL),
+            cancel_on_shutdown=True,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the audit counters for diagnostics."""
+        return {
+            "enabled": self._coordinator.auditable,
+            "days_checked": self.days_checked,
+            "mismatches": self.mismatches,
+            "healed": self.healed,
+            "unhealed": self.unhealed,
+            "repaired_gap_days": self.repaired_gap_days,
+            "pending_gap_days": len(self._coordinator.store.dirty),
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "cursor": {zone: day.isoformat() for zone, day in self._cursor.items()},
+            "recent_mismatches": list(self.recent),
+        }
+
+    def _is_idle(self) -> bool:
+        """Return whether nothing else is loading history right now."""
+        if self._coordinator.backfilling or async_get_scheduler(self._hass).busy:
+            return False
+        return get_instance(self._hass).backlog <= AUDIT_MAX_BACKLOG
+
+    @callback
+    def _async_step(self, _now: datetime) -> None:
+        """Audit the next days if the system is idle."""
+        coordinator = self._coordinator
+        if self._running or not (coordinator.auditable or coordinator.store.dirty):
+            return
+        if not self._is_idle():
+            return
+        self._running = True
+        self._coordinator.config_entry.async_create_background_task(
+            self._hass,
+            self._async_audit(),
+            f"{DOMAIN} audit {self._coordinator.config_entry.entry_id}",
+        )
+
+    def _next_day(self, today: date) -> tuple[str, date] | None:
+        """Return the next zone and day to audit, visiting zones in turn."""
+        store = self._coordinator.store
+        zones = sorted(store.zones)
+        yesterday = today - timedelta(days=1)
+        # Older days may be partly purged from the recorder already
+        oldest = today - timedelta(days=get_instance(self._hass).keep_days - 1)
+        for offset in range(len(zones)):
+            zone = zones[(self._next_zone + offset) % len(zones)]
+            if (covered_since := store.covered_since.get(zone)) is None:
+                continue
+            # Only whole days are compared
+            first = max(
+                oldest,
+                dt_util.as_local(dt_util.utc_from_timestamp(covered_since)).date()
+                + timedelta(days=1),
+            )
+            if first > yesterday:
+                continue
+            day = self._cursor.get(zone, today) - timedelta(days=1)
+            if not first <= day <= yesterday:
+                day = yesterday
+            self._next_zone = (self._next_zone + offset + 1) % len(zones)
+            return zone, day
+        return None
+
+    async def _async_audit(self) -> None:
+        """Audit a few days and repair the ones that differ."""
+        try:
+            # Days a gap changed are recalculated before any audit
+            if self._coordinator.store.dirty:
+                await self._async_repair_gap_day()
+                return
+            if not self._coordinator.auditable:
+                return
+            for _ in range(AUDIT_DAYS_PER_RUN):
+                if (target := self._next_day(dt_util.now().date())) is None:
+                    break
+                await self._async_audit_day(*target)
+        except Exception as err:
+            LOGGER.warning("Integrity audit failed: %s", err)
+        finally:
+            self._running = False
+            self.last_run = dt_util.now()
+
+    async def _async_repair_gap_day(self) -> None:
+        """Recalculate the newest day queued by the gap index."""
+        coordinator = self._coordinator
+        store = coordinator.store
+        day = date.fromisoformat(max(store.dirty))
+        day_start = dt_util.start_of_local_day(day).timestamp()
+        # Days the recorder no longer has keep what was stored
+        oldest = coordinator.recorder_gaps.oldest
+        if oldest is not None and day_start >= oldest:
+            for zone in sorted(store.zones):
+                covered_since = store.covered_since.get(zone)
+                if covered_since is not None and day_start >= covered_since:
+                    await coordinator.async_heal_day(zone, day)
+            self.repaired_gap_days += 1
+            LOGGER.debug(
+                "Recalculated %s of %s for gaps", day, coordinator.config_entry.title
+            )
+        store.dirty.discard(day.isoformat())
+        store.async_schedule_save()
+
+    async def _async_audit_day(self, zone: str, day: date) -> None:
+        """Compare a stored day with the reference recompute."""
+        self._cursor[zone] = day
+        reference = await self._coordinator.async_reference_seconds(
+            zone,
+            dt_util.start_of_local_day(day),
+            dt_util.start_of_local_day(day + timedelta(days=1)),
+        )
+        stored = self._coordinator.store.day_seconds(zone, day)
+        self.days_checked += 1
+        if abs(stored - reference) <= AUDIT_TOLERANCE * 3600:
+            return
+
+        self.mismatches += 1
+        healed = await self._coordinator.async_heal_day(zone, day)
+        repaired = abs(healed - reference) <= AUDIT_TOLERANCE * 3600
+        if repaired:
+            self.healed += 1
+            LOGGER.info(
+                "Repaired %s of %s on %s: stored %.2f h, recorder %.2f h",
+                zone,
+                self._coordinator.config_entry.title,
+                day,
+                stored / 3600,
+                reference / 3600,
+            )
+        else:
+            # The fast path itself disagrees with the reference
+            self.unhealed += 1
+            LOGGER.warning(
+                "Could not repair %s of %s on %s: recomputed %.2f h, recorder %.2f h",
+                zone,
+                self._coordinator.config_entry.title,
+                day,
+                healed / 3600,
+                reference / 3600,
+            )
+        self.recent.append(
+            {
+                "zone": zone,
+                "day": day.isoformat(),
+                "stored": round(stored / 3600, 2),
+                "reference": round(reference / 3600, 2),
+                "repaired": repaired,
+            }
+        )
@@ -0,0 +1,74 @@
+"""Backfill cost estimation for p2z_tracker."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING, NamedTuple
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.db_schema import States, StatesMeta
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.util import dt as dt_util
+from sqlalchemy import func, select
+
+from .const import (
+    BACKFILL_CHUNK_ROWS,
+    BACKFILL_ROW_BYTES,
+    BACKFILL_ROW_SECONDS,
+    DEFAULT_BACKFILL_CHUNK_DAYS,
+    MAX_BACKFILL_CHUNK_DAYS,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+class BackfillEstimate(NamedTuple):
+    """Expected cost of backfilling a number of days."""
+
+    rows: int
+    seconds: float
+    memory: int  # bytes held by one chunk
+    chunk_days: int
+
+
+def _count_rows(hass: HomeAssistant, entity_id: str, start_ts: float) -> int:
+    """Count an entity's recorded states since a timestamp."""
+    with session_scope(hass=hass, read_only=True) as session:
+        metadata_id = session.execute(
+            select(StatesMeta.metadata_id).where(StatesMeta.entity_id == entity_id)
+        ).scalar()
+        if metadata_id is None:
+            return 0
+        # Answered from the (metadata_id, last_updated_ts) index alone
+        return session.execute(
+            select(func.count())
+            .select_from(States)
+            .where(
+                States.metadata_id == metadata_id,
+                States.last_updated_ts >= start_ts,
+            )
+        ).scalar_one()
+
+
+async def async_estimate_backfill(
+    hass: HomeAssistant, entity_id: str, days: int
+) -> BackfillEstimate:
+    """Estimate the cost of backfilling days of an entity's history."""
+    start_ts = (dt_util.now() - timedelta(days=days)).timestamp()
+    rows = await get_instance(hass).async_add_executor_job(
+        _count_rows, hass, entity_id, start_ts
+    )
+    # Size chunks so each query loads about the same number of rows
+    chunk_days = (
+        int(min(max(BACKFILL_CHUNK_ROWS * days // rows, 1), MAX_BACKFILL_CHUNK_DAYS))
+        if rows
+        else DEFAULT_BACKFILL_CHUNK_DAYS
+    )
+    chunk_rows = min(rows, -(-rows * chunk_days // days))
+    return BackfillEstimate(
+        rows=rows,
+        seconds=rows * BACKFILL_ROW_SECONDS,
+        memory=chunk_rows * BACKFILL_ROW_BYTES,
+        chunk_days=chunk_days,
+    )
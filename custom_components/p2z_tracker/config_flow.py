@@ -7,20 +7,113 @@ from typing import Any
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.helpers import entity_registry as er, selector
+from sqlalchemy.exc import SQLAlchemyError
 
+from .backfill import BackfillEstimate, async_estimate_backfill
 from .const import (
+    BACKFILL_MAX_ROWS,
+    BACKFILL_WARN_ROWS,
+    CONF_BACKFILL_CHUNK_DAYS,
     CONF_BACKFILL_DAYS,
+    CONF_DAILY_QUANTILES,
     CONF_DISPLAY_NAME,
     CONF_ENABLE_AVERAGES,
+    CONF_ENABLE_AWAY,
     CONF_ENABLE_BACKFILL,
+    CONF_ENTRY_TYPE,
+    CONF_GAP_POLICY,
+    CONF_HOUSEHOLD_NAME,
+    CONF_MEMBERS,
+    CONF_MEMBERSHIP_MODE,
+    CONF_MERGE_GAP,
+    CONF_MIN_DWELL,
+    CONF_PERIODS,
     CONF_PERSON_ENTITY,
     CONF_RETENTION_DAYS,
+    CONF_ROLLING_WINDOWS,
+    CONF_THRESHOLD_TODAY,
+    CONF_THRESHOLD_WEEK,
     CONF_TRACKED_ZONES,
+    CONF_VISIT_METRICS,
+    CONF_WEEKDAYS,
     CONF_ZONE_NAME,
+    DAILY_QUANTILES,
     DEFAULT_RETENTION_DAYS,
     DOMAIN,
+    ENTRY_TYPE_HOUSEHOLD,
+    ENTRY_TYPE_PERSON,
+    GAP_POLICY_EXCLUDE,
+    GAP_POLICY_HOLD,
+    GAP_POLICY_IGNORE,
     LOGGER,
+    MEMBERSHIP_GEOMETRY,
+    MEMBERSHIP_STATE,
+    ROLLING_WINDOW_SECONDS,
 )
+from .selection import PERIODS, VISIT_METRICS, WEEKDAY_PERIODS
+
+ROLLING_WINDOW_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=list(ROLLING_WINDOW_SECONDS),
+        multiple=True,
+        mode=selector.SelectSelectorMode.LIST,
+        translation_key=CONF_ROLLING_WINDOWS,
+    ),
+)
+PERIOD_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=PERIODS,
+        multiple=True,
+        mode=selector.SelectSelectorMode.LIST,
+        translation_key=CONF_PERIODS,
+    ),
+)
+WEEKDAY_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=WEEKDAY_PERIODS,
+        multiple=True,
+        mode=selector.SelectSelectorMode.LIST,
+        translation_key=CONF_WEEKDAYS,
+    ),
+)
+VISIT_METRIC_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=VISIT_METRICS,
+        multiple=True,
+        mode=selector.SelectSelectorMode.LIST,
+        translation_key=CONF_VISIT_METRICS,
+    ),
+)
+DAILY_QUANTILE_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=list(DAILY_QUANTILES),
+        multiple=True,
+        mode=selector.SelectSelectorMode.LIST,
+        translation_key=CONF_DAILY_QUANTILES,
+    ),
+)
+
+
+def threshold_selector(max_hours: int) -> selector.NumberSelector:
+    """Return a selector for a threshold in hours, 0 meaning off."""
+    return selector.NumberSelector(
+        selector.NumberSelectorConfig(
+            min=0,
+            max=max_hours,
+            step=0.25,
+            mode=selector.NumberSelectorMode.BOX,
+            unit_of_measurement="h",
+        ),
+    )
+
+
+# Households combine their members' data, so only these zone fields apply
+HOUSEHOLD_ZONE_FIELDS = {
+    "original_zone_name",
+    CONF_ZONE_NAME,
+    CONF_DISPLAY_NAME,
+    CONF_PERIODS,
+}
 
 
 class P2ZTrackerFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -33,6 +126,16 @@ class P2ZTrackerFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         user_input: dict[str, Any] | None = None,
     ) -> config_entries.ConfigFlowResult:
         """Handle a flow initialized by the user."""
+        return self.async_show_menu(
+            step_id="user",
+            menu_options=[ENTRY_TYPE_PERSON, ENTRY_TYPE_HOUSEHOLD],
+        )
+
+    async def async_step_person(
+        self,
+        user_input: dict[str, Any] | None = None,
+    ) -> config_entries.ConfigFlowResult:
+        """Set up tracking for a single person."""
         errors = {}
 
         if user_input is not None:
@@ -46,12 +149,15 @@ class P2ZTrackerFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 # Zones will be added via options flow
                 return self.async_create_entry(
                     title=f"Zone Tracking: {person_entity}",
-                    data={CONF_PERSON_ENTITY: person_entity},
+                    data={
+                        CONF_ENTRY_TYPE: ENTRY_TYPE_PERSON,
+                        CONF_PERSON_ENTITY: person_entity,
+                    },
                     options={CONF_TRACKED_ZONES: []},
                 )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="person",
             data_schema=vol.Schema(
                 {
                     vol.Required(CONF_PERSON_ENTITY): selector.EntitySelector(
@@ -62,6 +168,45 @@ class P2ZTrackerFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def async_step_household(
+        self,
+        user_input: dict[str, Any] | None = None,
+    ) -> config_entries.ConfigFlowResult:
+        """Set up combined tracking for several persons."""
+        errors = {}
+
+        if user_input is not None:
+            household_name = user_input[CONF_HOUSEHOLD_NAME].strip()
+            members = user_input[CONF_MEMBERS]
+            if not household_name:
+                errors[CONF_HOUSEHOLD_NAME] = "invalid_household_name"
+            elif len(members) < 2:
+                errors[CONF_MEMBERS] = "not_enough_members"
+            else:
+                # Zones are added via options flow, like for a person
+                return self.async_create_entry(
+                    title=f"Household Zone Tracking: {household_name}",
+                    data={
+                        CONF_ENTRY_TYPE: ENTRY_TYPE_HOUSEHOLD,
+                        CONF_HOUSEHOLD_NAME: household_name,
+                        CONF_MEMBERS: members,
+                    },
+                    options={CONF_TRACKED_ZONES: []},
+                )
+
+        return self.async_show_form(
+            step_id="household",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_HOUSEHOLD_NAME): selector.TextSelector(),
+                    vol.Required(CONF_MEMBERS): selector.EntitySelector(
+                        selector.EntitySelectorConfig(domain="person", multiple=True),
+                    ),
+                },
+            ),
+            errors=errors,
+        )
+
     @staticmethod
     def async_get_options_flow(
         config_entry: config_entries.ConfigEntry,
@@ -78,6 +223,94 @@ class P2ZTrackerOptionsFlow(config_entries.OptionsFlow):
         self._current_zones: list[dict[str, Any]] = list(
             config_entry.options.get(CONF_TRACKED_ZONES, [])
         )
+        self._options: dict[str, Any] = dict(config_entry.options)
+        self._is_household = (
+            config_entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_HOUSEHOLD
+        )
+        self._person_entity: str | None = config_entry.data.get(CONF_PERSON_ENTITY)
+        self._estimate: BackfillEstimate | None = None
+
+    def _async_save_options(self) -> config_entries.ConfigFlowResult:
+        """Save the tracked zones, keeping the other options."""
+        return self.async_create_entry(
+            title="",
+            data={**self._options, CONF_TRACKED_ZONES: self._current_zones},
+        )
+
+    def _zone_schema(self, fields: dict[Any, Any]) -> vol.Schema:
+        """Build a zone form, leaving out settings households don't use."""
+        if self._is_household:
+            fields = {
+                key: value
+                for key, value in fields.items()
+                if key.schema in HOUSEHOLD_ZONE_FIELDS
+            }
+        return vol.Schema(fields)
+
+    async def _async_plan_backfill(
+        self, zone_config: dict[str, Any], previous: dict[str, Any] | None = None
+    ) -> str | None:
+        """Estimate a zone's backfill and plan its chunks, returning any error."""
+        self._estimate = None
+        days = int(zone_config.get(CONF_BACKFILL_DAYS, 0))
+        if (
+            self._person_entity is None
+            or not zone_config.get(CONF_ENABLE_BACKFILL)
+            or days <= 0
+        ):
+            return None
+        if (
+            previous is not None
+            and previous.get(CONF_ENABLE_BACKFILL)
+            and previous.get(CONF_BACKFILL_DAYS) == zone_config[CONF_BACKFILL_DAYS]
+            and CONF_BACKFILL_CHUNK_DAYS in previous
+        ):
+            # Unchanged, keep the plan made when it was set
+            zone_config[CONF_BACKFILL_CHUNK_DAYS] = previous[CONF_BACKFILL_CHUNK_DAYS]
+            return None
+
+        try:
+            estimate = await async_estimate_backfill(
+                self.hass, self._person_entity, days
+            )
+        except SQLAlchemyError as err:
+            LOGGER.warning("Could not estimate the backfill cost: %s", err)
+            return None
+        LOGGER.debug("Backfill estimate for %d days: %s", days, estimate)
+        self._estimate = estimate
+        if estimate.rows > BACKFILL_MAX_ROWS:
+            return "backfill_too_large"
+        zone_config[CONF_BACKFILL_CHUNK_DAYS] = estimate.chunk_days
+        return None
+
+    def _estimate_placeholders(self) -> dict[str, str]:
+        """Describe the last backfill estimate for the forms."""
+        estimate = self._estimate
+        return {
+            "rows": f"{estimate.rows:,}" if estimate else "0",
+            "max_rows": f"{BACKFILL_MAX_ROWS:,}",
+            "minutes": f"{estimate.seconds / 60:.1f}" if estimate else "0",
+            "memory": f"{estimate.memory / 1e6:.0f}" if estimate else "0",
+            "chunk_days": str(estimate.chunk_days) if estimate else "0",
+        }
+
+    async def _async_save_or_confirm(self) -> config_entries.ConfigFlowResult:
+        """Save the options, asking first when the backfill is expensive."""
+        if self._estimate is not None and self._estimate.rows > BACKFILL_WARN_ROWS:
+            return await self.async_step_confirm_backfill()
+        return self._async_save_options()
+
+    async def async_step_confirm_backfill(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Confirm a backfill that reads a lot of history."""
+        if user_input is not None:
+            return self._async_save_options()
+        return self.async_show_form(
+            step_id="confirm_backfill",
+            data_schema=vol.Schema({}),
+            description_placeholders=self._estimate_placeholders(),
+        )
 
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
@@ -100,6 +333,8 @@ class P2ZTrackerOptionsFlow(config_entries.OptionsFlow):
         menu_options = ["add_zone"]
         if self._current_zones:
             menu_options.extend(["edit_zone", "remove_zone"])
+        if not self._is_household:
+            menu_options.append("settings")
 
         # Show current zones
         zones_text = "\n".join(
@@ -118,6 +353,74 @@ class P2ZTrackerOptionsFlow(config_entries.OptionsFlow):
             description_placeholders=description_placeholders,
         )
 
+    async def async_step_settings(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Configure settings that apply to all zones."""
+        if user_input is not None:
+            self._options.update(user_input)
+            return self._async_save_options()
+
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_MIN_DWELL,
+                        default=self._options.get(CONF_MIN_DWELL, 0),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=120,
+                            mode=selector.NumberSelectorMode.BOX,
+                            unit_of_measurement="min",
+                        ),
+                    ),
+                    vol.Optional(
+                        CONF_MERGE_GAP,
+                        default=self._options.get(CONF_MERGE_GAP, 0),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=240,
+                            mode=selector.NumberSelectorMode.BOX,
+                            unit_of_measurement="min",
+                        ),
+                    ),
+                    vol.Optional(
+                        CONF_MEMBERSHIP_MODE,
+                        default=self._options.get(
+                            CONF_MEMBERSHIP_MODE, MEMBERSHIP_STATE
+                        ),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[MEMBERSHIP_STATE, MEMBERSHIP_GEOMETRY],
+                            mode=selector.SelectSelectorMode.LIST,
+                            translation_key=CONF_MEMBERSHIP_MODE,
+                        ),
+                    ),
+                    vol.Optional(
+                        CONF_GAP_POLICY,
+                        default=self._options.get(CONF_GAP_POLICY, GAP_POLICY_IGNORE),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                GAP_POLICY_IGNORE,
+                                GAP_POLICY_EXCLUDE,
+                                GAP_POLICY_HOLD,
+                            ],
+                            mode=selector.SelectSelectorMode.LIST,
+                            translation_key=CONF_GAP_POLICY,
+                        ),
+                    ),
+                    vol.Optional(
+                        CONF_ENABLE_AWAY,
+                        default=self._options.get(CONF_ENABLE_AWAY, False),
+                    ): selector.BooleanSelector(),
+                }
+            ),
+        )
+
     async def async_step_edit_zone(
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.ConfigFlowResult:
@@ -152,6 +455,9 @@ class P2ZTrackerOptionsFlow(config_entries.OptionsFlow):
         self, zone_name: str | dict[str, Any]
     ) -> config_entries.ConfigFlowResult:
         """Configure the selected zone."""
+        errors: dict[str, str] = {}
+        pending: dict[str, Any] | None = None
+
         # Handle form submission
         if isinstance(zone_name, dict):
             user_input = zone_name
@@ -171,21 +477,31 @@ class P2ZTrackerOptionsFlow(config_entries.OptionsFlow):
                         CONF_RETENTION_DAYS: user_input.get(
                             CONF_RETENTION_DAYS, DEFAULT_RETENTION_DAYS
                         ),
+                        CONF_PERIODS: user_input.get(CONF_PERIODS, PERIODS),
                         CONF_ENABLE_AVERAGES: user_input.get(
                             CONF_ENABLE_AVERAGES, False
                         ),
+                        CONF_WEEKDAYS: user_input.get(CONF_WEEKDAYS, WEEKDAY_PERIODS),
+                        CONF_ROLLING_WINDOWS: user_input.get(CONF_ROLLING_WINDOWS, []),
+                        CONF_VISIT_METRICS: user_input.get(CONF_VISIT_METRICS, []),
+                        CONF_DAILY_QUANTILES: user_input.get(CONF_DAILY_QUANTILES, []),
+                        CONF_THRESHOLD_TODAY: user_input.get(CONF_THRESHOLD_TODAY, 0),
+                        CONF_THRESHOLD_WEEK: user_input.get(CONF_THRESHOLD_WEEK, 0),
                     }
-                    self._current_zones[i] = updated_zone
+                    if error := await self._async_plan_backfill(updated_zone, zone):
+                        errors[CONF_BACKFILL_DAYS] = error
+                        pending = updated_zone
+                    else:
+                        self._current_zones[i] = updated_zone
                     break
 
-            return self.async_create_entry(
-                title="",
-                data={CONF_TRACKED_ZONES: self._current_zones},
-            )
+            if not errors:
+                return await self._async_save_or_confirm()
+            zone_name = original_zone_name
 
         # Handle initial call with zone_name string
         # Find current config for this zone
-        current_config = next(
+        current_config = pending or next(
             (z for z in self._current_zones if z[CONF_ZONE_NAME] == zone_name), None
         )
 
@@ -194,7 +510,7 @@ class P2ZTrackerOptionsFlow(config_entries.OptionsFlow):
 
         return self.async_show_form(
             step_id="configure_zone",
-            data_schema=vol.Schema(
+            data_schema=self._zone_schema(
                 {
                     vol.Required(
                         "original_zone_name", default=zone_name
@@ -233,12 +549,42 @@ class P2ZTrackerOptionsFlow(config_entries.OptionsFlow):
                             unit_of_measurement="days",
                         ),
                     ),
+                    vol.Optional(
+                        CONF_PERIODS,
+                        default=current_config.get(CONF_PERIODS, PERIODS),
+                    ): PERIOD_SELECTOR,
                     vol.Optional(
                         CONF_ENABLE_AVERAGES,
                         default=current_config.get(CONF_ENABLE_AVERAGES, False),
                     ): selector.BooleanSelector(),
+                    vol.Optional(
+                        CONF_WEEKDAYS,
+                        default=current_config.get(CONF_WEEKDAYS, WEEKDAY_PERIODS),
+                    ): WEEKDAY_SELECTOR,
+                    vol.Optional(
+                        CONF_ROLLING_WINDOWS,
+                        default=current_config.get(CONF_ROLLING_WINDOWS, []),
+                    ): ROLLING_WINDOW_SELECTOR,
+                    vol.Optional(
+                        CONF_VISIT_METRICS,
+                        default=current_config.get(CONF_VISIT_METRICS, []),
+                    ): VISIT_METRIC_SELECTOR,
+                    vol.Optional(
+                        CONF_DAILY_QUANTILES,
+                        default=current_config.get(CONF_DAILY_QUANTILES, []),
+                    ): DAILY_QUANTILE_SELECTOR,
+                    vol.Optional(
+                        CONF_THRESHOLD_TODAY,
+                        default=current_config.get(CONF_THRESHOLD_TODAY, 0),
+                    ): threshold_selector(24),
+                    vol.Optional(
+                        CONF_THRESHOLD_WEEK,
+                        default=current_config.get(CONF_THRESHOLD_WEEK, 0),
+                    ): threshold_selector(168),
                 }
             ),
+            errors=errors,
+            description_placeholders=self._estimate_placeholders(),
         )
 
     async def async_step_add_zone(
@@ -263,21 +609,28 @@ class P2ZTrackerOptionsFlow(config_entries.OptionsFlow):
                     CONF_RETENTION_DAYS: user_input.get(
                         CONF_RETENTION_DAYS, DEFAULT_RETENTION_DAYS
                     ),
+                    CONF_PERIODS: user_input.get(CONF_PERIODS, PERIODS),
                     CONF_ENABLE_AVERAGES: user_input.get(CONF_ENABLE_AVERAGES, False),
+                    CONF_WEEKDAYS: user_input.get(CONF_WEEKDAYS, WEEKDAY_PERIODS),
+                    CONF_ROLLING_WINDOWS: user_input.get(CONF_ROLLING_WINDOWS, []),
+                    CONF_VISIT_METRICS: user_input.get(CONF_VISIT_METRICS, []),
+                    CONF_DAILY_QUANTILES: user_input.get(CONF_DAILY_QUANTILES, []),
+                    CONF_THRESHOLD_TODAY: user_input.get(CONF_THRESHOLD_TODAY, 0),
+                    CONF_THRESHOLD_WEEK: user_input.get(CONF_THRESHOLD_WEEK, 0),
                 }
-                self._current_zones.append(new_zone)
+                if error := await self._async_plan_backfill(new_zone):
+                    errors[CONF_BACKFILL_DAYS] = error
+                else:
+                    self._current_zones.append(new_zone)
+
+                    LOGGER.info(
+                        "Added zone %s to tracking. Total zones: %d",
+                        zone_name,
+                        len(self._current_zones),
+                    )
 
-                LOGGER.info(
-                    "Added zone %s to tracking. Total zones: %d",
-                    zone_name,
-                    len(self._current_zones),
-                )
-
-                # Save and return to menu
-                return self.async_create_entry(
-                    title="",
-                    data={CONF_TRACKED_ZONES: self._current_zones},
-                )
+                    # Save and return to menu
+                    return await self._async_save_or_confirm()
 
         # Get all available zones
         all_zones = self.hass.states.async_entity_ids("zone")
@@ -288,7 +641,7 @@ class P2ZTrackerOptionsFlow(config_entries.OptionsFlow):
 
         return self.async_show_form(
             step_id="add_zone",
-            data_schema=vol.Schema(
+            data_schema=self._zone_schema(
                 {
                     vol.Required(CONF_ZONE_NAME): selector.SelectSelector(
                         selector.SelectSelectorConfig(
@@ -322,12 +675,30 @@ class P2ZTrackerOptionsFlow(config_entries.OptionsFlow):
                             unit_of_measurement="days",
                         ),
                     ),
+                    vol.Optional(CONF_PERIODS, default=PERIODS): PERIOD_SELECTOR,
                     vol.Optional(
                         CONF_ENABLE_AVERAGES, default=False
                     ): selector.BooleanSelector(),
+                    vol.Optional(
+                        CONF_WEEKDAYS, default=WEEKDAY_PERIODS
+                    ): WEEKDAY_SELECTOR,
+                    vol.Optional(
+                        CONF_ROLLING_WINDOWS, default=[]
+                    ): ROLLING_WINDOW_SELECTOR,
+                    vol.Optional(CONF_VISIT_METRICS, default=[]): VISIT_METRIC_SELECTOR,
+                    vol.Optional(
+                        CONF_DAILY_QUANTILES, default=[]
+                    ): DAILY_QUANTILE_SELECTOR,
+                    vol.Optional(CONF_THRESHOLD_TODAY, default=0): threshold_selector(
+                        24
+                    ),
+                    vol.Optional(CONF_THRESHOLD_WEEK, default=0): threshold_selector(
+                        168
+                    ),
                 },
             ),
             errors=errors,
+            description_placeholders=self._estimate_placeholders(),
         )
 
     async def async_step_remove_zone(
@@ -341,10 +712,7 @@ class P2ZTrackerOptionsFlow(config_entries.OptionsFlow):
             ]
 
             # Save and return to menu
-            return self.async_create_entry(
-                title="",
-                data={CONF_TRACKED_ZONES: self._current_zones},
-            )
+            return self._async_save_options()
 
         # Build list of removable zones
         zone_options = [
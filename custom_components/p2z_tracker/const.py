@@ -7,20 +7,84 @@ LOGGER: Logger = getLogger(__package__)
 DOMAIN = "p2z_tracker"
 
 # Configuration keys
+CONF_ENTRY_TYPE = "entry_type"
+CONF_MEMBERS = "members"
+CONF_HOUSEHOLD_NAME = "household_name"
 CONF_PERSON_ENTITY = "person_entity"
 CONF_TRACKED_ZONES = "tracked_zones"
 CONF_ZONE_NAME = "zone_name"
 CONF_DISPLAY_NAME = "display_name"
 CONF_ENABLE_BACKFILL = "enable_backfill"
 CONF_BACKFILL_DAYS = "backfill_days"
+CONF_BACKFILL_CHUNK_DAYS = "backfill_chunk_days"
 CONF_RETENTION_DAYS = "retention_days"
 CONF_ENABLE_AVERAGES = "enable_averages"
+CONF_ROLLING_WINDOWS = "rolling_windows"
+CONF_MIN_DWELL = "min_dwell"
+CONF_MERGE_GAP = "merge_gap"
+CONF_MEMBERSHIP_MODE = "membership_mode"
+CONF_PERIODS = "periods"
+CONF_WEEKDAYS = "weekdays"
+CONF_VISIT_METRICS = "visit_metrics"
+CONF_DAILY_QUANTILES = "daily_quantiles"
+CONF_ENABLE_AWAY = "enable_away"
+CONF_GAP_POLICY = "gap_policy"
+CONF_THRESHOLD_TODAY = "threshold_today"
+CONF_THRESHOLD_WEEK = "threshold_week"
+
+# Config entry types
+ENTRY_TYPE_PERSON = "person"
+ENTRY_TYPE_HOUSEHOLD = "household"
+
+# Zone membership modes
+MEMBERSHIP_STATE = "state"
+MEMBERSHIP_GEOMETRY = "geometry"
+
+# How gaps in the recorded history are counted
+GAP_POLICY_IGNORE = "ignore"  # as recorded: downtime keeps the last state
+GAP_POLICY_EXCLUDE = "exclude"  # downtime counts for no zone
+GAP_POLICY_HOLD = "hold"  # unavailable and unknown states keep the last state
+
+# Kinds of gaps in the recorded history
+GAP_DOWNTIME = "downtime"
+GAP_UNAVAILABLE = "unavailable"
+
+# Household occupancy modes
+OCCUPANCY_ANY = "any"
+OCCUPANCY_ALL = "all"
 
 # Time periods
 PERIOD_TODAY = "today"
 PERIOD_WEEK = "week"
 PERIOD_MONTH = "month"
 
+# Rolling window periods
+PERIOD_ROLLING_24H = "rolling_24h"
+PERIOD_ROLLING_7D = "rolling_7d"
+PERIOD_ROLLING_30D = "rolling_30d"
+
+# Rolling window lengths in seconds
+ROLLING_WINDOW_SECONDS = {
+    PERIOD_ROLLING_24H: 24 * 3600,
+    PERIOD_ROLLING_7D: 7 * 24 * 3600,
+    PERIOD_ROLLING_30D: 30 * 24 * 3600,
+}
+
+# Visit metrics, reported per standard period except the current stay
+METRIC_VISITS = "visits"
+METRIC_LONGEST_STAY = "longest_stay"
+METRIC_FIRST_ARRIVAL = "first_arrival"
+METRIC_LAST_DEPARTURE = "last_departure"
+METRIC_CURRENT_STAY = "current_stay"
+
+# Quantiles of the time per day, over all stored days
+METRIC_DAILY_MEDIAN = "daily_median"
+METRIC_DAILY_P90 = "daily_p90"
+DAILY_QUANTILES = {METRIC_DAILY_MEDIAN: 0.5, METRIC_DAILY_P90: 0.9}
+
+# Coordinator data key of the time spent outside every tracked zone
+AWAY = "away"
+
 # Weekday periods for averages
 PERIOD_MONDAY = "monday"
 PERIOD_TUESDAY = "tuesday"
@@ -36,7 +100,60 @@ ATTR_PERSON_ENTITY = "person_entity"
 ATTR_PERIOD = "period"
 ATTR_LAST_UPDATED = "last_updated"
 ATTR_BACKFILLED = "backfilled"
+ATTR_MEMBERS = "members"
+ATTR_DAYS = "days"
+
+# Services
+SERVICE_EXPORT_INTERVALS = "export_intervals"
+SERVICE_PROFILE = "profile"
+SERVICE_IMPORT_HISTORY = "import_history"
+
+# Events
+EVENT_THRESHOLD_REACHED = f"{DOMAIN}_threshold_reached"
+
+# Event data
+ATTR_ZONE = "zone"
+ATTR_THRESHOLD = "threshold"
+ATTR_REACHED_AT = "reached_at"
+
+# Service fields
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_ZONES = "zones"
+ATTR_FORMAT = "format"
+ATTR_FILENAME = "filename"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_RUNS = "runs"
+
+# Export formats
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_JSONL = "jsonl"
 
 # Default values
 DEFAULT_RETENTION_DAYS = 90
 DEFAULT_UPDATE_INTERVAL = 60  # seconds
+EXPORT_CHUNK_DAYS = 7  # days of history loaded per recorder query
+DEFAULT_MAX_CONCURRENT_REFRESHES = 2
+PRIORITY_REFRESH_DELAY = 5  # seconds after a zone change before refreshing
+PROFILE_TOP_FUNCTIONS = 30
+PROCESS_POOL_MIN_TRANSITIONS = 20000  # smaller recomputes stay in a thread
+PROCESS_POOL_IDLE_TIMEOUT = 300  # seconds before an idle worker process exits
+DEFAULT_BACKFILL_CHUNK_DAYS = 7  # days of history loaded per backfill query
+MAX_BACKFILL_CHUNK_DAYS = 31
+DELTA_OVERLAP = 300  # seconds of known history each delta read checks again
+STORE_RAW_DAYS = 35  # raw intervals kept before rolling them into daily totals
+STORE_SAVE_DELAY = 60  # seconds
+SKETCH_BIN_SECONDS = 300  # width of the daily time histogram bins
+TIMELINE_MAX_PAGE_SIZE = 1000  # visits per websocket timeline page
+AUDIT_INTERVAL = 900  # seconds between integrity audit steps
+AUDIT_DAYS_PER_RUN = 1  # days recomputed per audit step
+AUDIT_TOLERANCE = 0.02  # hours a stored day may differ from the recompute
+AUDIT_MAX_BACKLOG = 100  # recorder queue length above which audits wait
+AUDIT_RECENT_MISMATCHES = 10  # mismatches listed in diagnostics
+
+# Backfill cost model, measured per recorder row
+BACKFILL_ROW_SECONDS = 0.0001
+BACKFILL_ROW_BYTES = 2000
+BACKFILL_CHUNK_ROWS = 50000  # rows loaded per backfill query
+BACKFILL_WARN_ROWS = 250000  # ask for confirmation above this
+BACKFILL_MAX_ROWS = 5000000  # refuse above this
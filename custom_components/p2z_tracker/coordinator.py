@@ -2,23 +2,59 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, Any
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from homeassistant.components.recorder import get_instance, history
+from homeassistant.const import (
+    ATTR_LATITUDE,
+    ATTR_LONGITUDE,
+    ATTR_RADIUS,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+)
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt as dt_util
 
 from .const import (
+    AWAY,
+    CONF_BACKFILL_CHUNK_DAYS,
     CONF_BACKFILL_DAYS,
-    CONF_ENABLE_AVERAGES,
+    CONF_ENABLE_AWAY,
     CONF_ENABLE_BACKFILL,
+    CONF_GAP_POLICY,
+    CONF_MEMBERS,
+    CONF_MEMBERSHIP_MODE,
+    CONF_MERGE_GAP,
+    CONF_MIN_DWELL,
     CONF_PERSON_ENTITY,
     CONF_RETENTION_DAYS,
+    CONF_ROLLING_WINDOWS,
+    CONF_THRESHOLD_TODAY,
+    CONF_THRESHOLD_WEEK,
     CONF_TRACKED_ZONES,
     CONF_ZONE_NAME,
+    DAILY_QUANTILES,
+    DEFAULT_BACKFILL_CHUNK_DAYS,
+    DELTA_OVERLAP,
+    DOMAIN,
+    GAP_DOWNTIME,
+    GAP_POLICY_EXCLUDE,
+    GAP_POLICY_HOLD,
+    GAP_POLICY_IGNORE,
+    GAP_UNAVAILABLE,
     LOGGER,
+    MAX_BACKFILL_CHUNK_DAYS,
+    MEMBERSHIP_GEOMETRY,
+    MEMBERSHIP_STATE,
+    METRIC_CURRENT_STAY,
+    METRIC_FIRST_ARRIVAL,
+    METRIC_LAST_DEPARTURE,
+    METRIC_LONGEST_STAY,
+    METRIC_VISITS,
     PERIOD_MONTH,
     PERIOD_TODAY,
     PERIOD_WEEK,
@@ -29,13 +65,79 @@ from .const import (
     PERIOD_FRIDAY,
     PERIOD_SATURDAY,
     PERIOD_SUNDAY,
+    ROLLING_WINDOW_SECONDS,
+)
+from .auditor import IntegrityAuditor
+from .gaps import RecorderGaps, async_get_recorder_gaps
+from .geometry import ZoneCircle, ZoneIndex, zone_transitions_from_points
+from .importer import read_location_history
+from .intervals import (
+    FlapFilter,
+    SlidingWindowAggregator,
+    ZoneTimeline,
+    clipped_seconds,
+    filter_flaps,
+    hold_through,
+    mark_gaps,
+    state_spans,
+    union_intervals,
+    visit_metrics,
+    weekday_averages_from_totals,
+    zone_intervals,
 )
+from .offload import async_get_offloader
+from .profiler import RefreshProfiler
+from .selection import (
+    PERIODS,
+    WEEKDAY_PERIODS,
+    ZoneSelection,
+    totals_keys,
+    zone_selection,
+)
+from .store import IntervalStore
+from .thresholds import Threshold, ThresholdTracker
+from .totals import Totals, TotalsLayout
+from .window import HistoryWindow
+from .zones import async_get_zone_resolver
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from .data import P2ZTrackerConfigEntry
+    from .zones import ZoneResolver
+
+_T = TypeVar("_T")
+
+# Person states that say nothing about where the person is
+UNAVAILABLE_STATES = (STATE_UNAVAILABLE, STATE_UNKNOWN)
+
+# The kinds of gaps whose time each policy counts differently
+_POLICY_GAPS = {
+    GAP_POLICY_IGNORE: frozenset(),
+    GAP_POLICY_EXCLUDE: frozenset({GAP_DOWNTIME}),
+    GAP_POLICY_HOLD: frozenset({GAP_UNAVAILABLE}),
+}
+
 
+def get_period_starts(now: datetime) -> dict[str, datetime]:
+    """Return the start of each standard period containing now."""
+    today = dt_util.start_of_local_day(now)
+    return {
+        PERIOD_TODAY: today,
+        PERIOD_WEEK: dt_util.start_of_local_day(now - timedelta(days=now.weekday())),
+        PERIOD_MONTH: today.replace(day=1),
+    }
 
-class P2ZDataUpdateCoordinator(DataUpdateCoordinator[dict[str, dict[str, float]]]):
+
+def _get_retention(tracked_zones: list[dict[str, Any]]) -> dict[str, int]:
+    """Return the retention in days per zone, 0 meaning unlimited."""
+    return {
+        zone_config[CONF_ZONE_NAME]: zone_config.get(CONF_RETENTION_DAYS, 0)
+        for zone_config in tracked_zones
+    }
+
+
+class P2ZDataUpdateCoordinator(DataUpdateCoordinator[Totals]):
     """Class to manage fetching zone time data."""
 
     config_entry: P2ZTrackerConfigEntry
@@ -52,40 +154,256 @@ class P2ZDataUpdateCoordinator(DataUpdateCoordinator[dict[str, dict[str, float]]
         super().__init__(hass, logger, name=name, update_interval=update_interval)
         self.config_entry = config_entry
         self._person_entity = config_entry.data[CONF_PERSON_ENTITY]
+        # Options changes reload the entry, so the sensors' slots stay put
+        self.layout = TotalsLayout(totals_keys(config_entry))
         self._backfilled = False
         self._averages_data: dict[str, dict[str, float]] = {}
+        self._resume_from: datetime | None = None
+        self._rolling: dict[str, dict[str, SlidingWindowAggregator]] = {}
+        self._zone_index: ZoneIndex | None = None
+        # The refresh window's rows, only newer ones are read each refresh
+        self.window = HistoryWindow()
+        # Per zone, the stays the window's rows add up to so far
+        self._timelines: dict[str, ZoneTimeline] = {}
+        # Flap filters keep pending stays between refreshes, keyed by zone in
+        # geometry mode and shared by all zones in state mode
+        self._timeline_filters: dict[str | None, FlapFilter] = {}
+        self._timelines_key: tuple[Any, ...] | None = None
+        self._membership_mode = config_entry.options.get(
+            CONF_MEMBERSHIP_MODE, MEMBERSHIP_STATE
+        )
+        # Flap filter thresholds, converted from minutes to seconds
+        self._min_dwell = config_entry.options.get(CONF_MIN_DWELL, 0) * 60
+        self._merge_gap = config_entry.options.get(CONF_MERGE_GAP, 0) * 60
+        self._gap_policy = config_entry.options.get(CONF_GAP_POLICY, GAP_POLICY_IGNORE)
+        self.recorder_gaps = RecorderGaps(None, [])
+        self._gaps_checked: date | None = None
+        self.zone_intervals: dict[str, list[tuple[float, float]]] = {}
+        # Per zone and quantile, the hours per weekday shown as attributes
+        self.weekday_quantiles: dict[str, dict[str, dict[str, float | None]]] = {}
         self.last_update_success_time: datetime | None = None
+        self.profiler: RefreshProfiler | None = None
+        self._thresholds = ThresholdTracker(
+            hass,
+            self._person_entity,
+            watch_position=self._membership_mode == MEMBERSHIP_GEOMETRY,
+        )
+        config_entry.async_on_unload(self._thresholds.async_cancel)
+        self.store = IntervalStore(hass, config_entry.entry_id)
+        self.backfilling = False
+        self.auditor = IntegrityAuditor(hass, self)
+
+    async def _async_setup(self) -> None:
+        """Load the stored intervals before the first refresh."""
+        await self.store.async_load()
+        if self.store.watermark is not None:
+            self._resume_from = dt_util.as_local(
+                dt_util.utc_from_timestamp(self.store.watermark)
+            )
+        self.config_entry.async_on_unload(self.auditor.async_start())
+
+    @property
+    def auditable(self) -> bool:
+        """Return whether the stored intervals follow the reference algorithm."""
+        # The reference matches person states and applies no flap filter
+        return (
+            self._membership_mode == MEMBERSHIP_STATE
+            and not self._min_dwell
+            and not self._merge_gap
+        )
+
+    async def async_reference_seconds(
+        self, zone_entity_id: str, start_time: datetime, end_time: datetime
+    ) -> float:
+        """Recompute the time in a zone from history with the reference algorithm."""
+        hours = await self._calculate_time_in_zone(zone_entity_id, start_time, end_time)
+        return hours * 3600
+
+    async def async_heal_day(self, zone_entity_id: str, day: date) -> float:
+        """Reload a zone's stored intervals of one day, returning its new total."""
+        start_time = dt_util.start_of_local_day(day)
+        end_time = dt_util.start_of_local_day(day + timedelta(days=1))
+        target_zone, transitions = (
+            await self._async_fetch_zone_transitions(
+                [zone_entity_id], start_time, end_time, include_start_time_state=True
+            )
+        )[zone_entity_id]
+        intervals = (
+            (
+                await async_get_offloader(self.hass).async_stays_by_zone(
+                    [
+                        (
+                            zone_entity_id,
+                            transitions,
+                            target_zone,
+                            start_time.timestamp(),
+                            end_time.timestamp(),
+                        )
+                    ],
+                    self._min_dwell,
+                    self._merge_gap,
+                    end_time.timestamp(),
+                )
+            )[zone_entity_id]
+            if target_zone is not None
+            else []
+        )
+        self.store.heal(zone_entity_id, day, intervals)
+        tracked_zones = self.config_entry.options.get(CONF_TRACKED_ZONES, [])
+        self.store.compact(
+            dt_util.now().date(), _get_retention(tracked_zones), force=True
+        )
+        self.store.async_schedule_save()
+        return self.store.day_seconds(zone_entity_id, day)
+
+    async def async_import_history(
+        self, path: str, file_format: str, start: datetime, end: datetime
+    ) -> dict[str, Any]:
+        """Read a location history file into the stored history of each zone.
+
+        The file only fills the time before a zone's stored history, so what
+        was recorded by Home Assistant is never replaced.
+        """
+        tracked_zones = self.config_entry.options.get(CONF_TRACKED_ZONES, [])
+        zones = [zone_config[CONF_ZONE_NAME] for zone_config in tracked_zones]
+        index = self._build_zone_index(zones)
+        # Parsing and zone lookups run in a thread, one point at a time
+        history = await self.hass.async_add_executor_job(
+            read_location_history,
+            path,
+            file_format,
+            index,
+            start.timestamp(),
+            end.timestamp(),
+        )
+
+        if history.first is None or history.last is None:
+            raise ServiceValidationError("The file has no points in the import range")
+        # Zones are only stored once a refresh could resolve them
+        unstored = [zone for zone in zones if zone not in self.store.covered_since]
+        if len(unstored) == len(zones):
+            raise ServiceValidationError(
+                f"{self._person_entity} has no stored history to import before yet"
+            )
 
-    async def _async_update_data(self) -> dict[str, dict[str, float]]:
+        imported: dict[str, float] = {}
+        detached: list[str] = []
+        self.backfilling = True
+        try:
+            for zone in zones:
+                if (covered_since := self.store.covered_since.get(zone)) is None:
+                    continue
+                if covered_since <= history.first:
+                    continue
+                # The last imported state lasts until the last point, not beyond
+                end = min(history.last, covered_since)
+                transitions = self._filter_transitions(
+                    history.transitions.get(zone, []),
+                    dt_util.utc_from_timestamp(end),
+                )
+                intervals = zone_intervals(transitions, zone, history.first, end)
+                # Coverage only moves back when the import reaches the stored
+                # history, a gap between them stays uncovered
+                self.store.replace(zone, history.first, end, intervals)
+                if end < covered_since:
+                    detached.append(zone)
+                imported[zone] = round(
+                    clipped_seconds(intervals, history.first, end) / 3600, 2
+                )
+            self.store.compact(
+                dt_util.now().date(), _get_retention(tracked_zones), force=True
+            )
+            self.store.async_schedule_save()
+        finally:
+            self.backfilling = False
+        # Averages are recalculated with the imported days on the next refresh
+        self._averages_data = {}
+
+        LOGGER.info(
+            "Imported %d points of %s from %s, skipped %d",
+            history.points,
+            self._person_entity,
+            path,
+            history.skipped,
+        )
+        if detached:
+            LOGGER.warning(
+                "Imported history of %s ends before the stored history of %s, "
+                "the time in between is not counted as covered",
+                self._person_entity,
+                ", ".join(detached),
+            )
+        return {
+            "points": history.points,
+            "skipped": history.skipped,
+            "first": history.first,
+            "last": history.last,
+            "zones": imported,
+            "detached_zones": detached,
+            "unstored_zones": unstored,
+        }
+
+    async def _async_update_data(self) -> Totals:
         """Fetch zone time data from recorder."""
+        if self.profiler is None:
+            return await self._async_calculate_data()
+
+        profiler = self.profiler
+        try:
+            return await profiler.async_run(self._async_calculate_data)
+        finally:
+            if profiler.remaining <= 0:
+                self.profiler = None
+                path = await self.hass.async_add_executor_job(profiler.write)
+                LOGGER.info("Wrote refresh profile of %s to %s", self.name, path)
+
+    async def _async_calculate_data(self) -> Totals:
+        """Calculate zone times for all tracked zones."""
         tracked_zones = self.config_entry.options.get(CONF_TRACKED_ZONES, [])
 
-        # Perform backfill on first update if needed
-        if not self._backfilled:
-            await self._perform_backfill(tracked_zones)
-            self._backfilled = True
+        # Fetch the person's history once for the widest period anything shows
+        now = dt_util.now()
+        window_start = self._get_window_start(tracked_zones, now)
+        # Known gaps must be in place before any interval is calculated
+        try:
+            await self._async_update_gap_index(now, window_start)
+        except Exception as err:
+            LOGGER.error("Error reading recorder runs: %s", err)
+        history_read = True
+        try:
+            # Zones whose intervals are reliable enough to persist
+            stored_zones = await self._async_update_timelines(
+                tracked_zones, window_start, now
+            )
+        except Exception as err:
+            LOGGER.error("Error fetching history for %s: %s", self._person_entity, err)
+            # The next refresh reads the window again and starts over
+            self.window.invalidate()
+            self._timelines = {}
+            self._rolling = {}
+            stored_zones = []
+            history_read = False
 
         # Calculate current time in zones
         zone_data = {}
         for zone_config in tracked_zones:
             zone_name = zone_config[CONF_ZONE_NAME]
-            enable_averages = zone_config.get(CONF_ENABLE_AVERAGES, False)
+            # Only what the zone's sensors show is calculated
+            selection = zone_selection(zone_config)
 
-            # Calculate standard periods (today, week, month)
+            # Calculate the selected standard periods (today, week, month)
             try:
-                times = await self._calculate_zone_times(zone_name)
+                times = self._calculate_zone_times(
+                    zone_name, window_start, now, selection.periods
+                )
             except Exception as err:
                 LOGGER.error(
                     "Error calculating standard times for zone %s: %s", zone_name, err
                 )
-                times = {
-                    PERIOD_TODAY: 0.0,
-                    PERIOD_WEEK: 0.0,
-                    PERIOD_MONTH: 0.0,
-                }
+                times = dict.fromkeys(selection.periods, 0.0)
 
-            # Calculate averages if enabled
-            if enable_averages:
+            # Calculate averages if enabled for any weekday
+            if selection.weekdays:
                 try:
                     # Check if we need to calculate averages (first run or new day)
                     # We store averages in self._averages_data to avoid querying history every update
@@ -97,65 +415,686 @@ class P2ZDataUpdateCoordinator(DataUpdateCoordinator[dict[str, dict[str, float]]
                             zone_name
                         ] = await self._calculate_weekday_averages(zone_name, days)
 
-                    # Merge averages into times
-                    times.update(self._averages_data[zone_name])
+                    # Merge the selected weekdays into times
+                    times.update(
+                        {
+                            # Zones without history have no averages yet
+                            period: self._averages_data[zone_name].get(period, 0.0)
+                            for period in selection.weekdays
+                        }
+                    )
                 except Exception as err:
                     LOGGER.error(
                         "Error calculating averages for zone %s: %s", zone_name, err
                     )
                     # Don't fail standard sensors if averages fail
                     # Add 0s for weekday averages
-                    times.update(
-                        {
-                            PERIOD_MONDAY: 0.0,
-                            PERIOD_TUESDAY: 0.0,
-                            PERIOD_WEDNESDAY: 0.0,
-                            PERIOD_THURSDAY: 0.0,
-                            PERIOD_FRIDAY: 0.0,
-                            PERIOD_SATURDAY: 0.0,
-                            PERIOD_SUNDAY: 0.0,
-                        }
-                    )
+                    times.update(dict.fromkeys(selection.weekdays, 0.0))
+
+            # Visit statistics come from the same intervals, at no extra query
+            if selection.visit_metrics:
+                times.update(self._calculate_visit_metrics(zone_name, now, selection))
 
             zone_data[zone_name] = times
 
-        self.last_update_success_time = dt_util.now()
-        return zone_data
+        if self.config_entry.options.get(CONF_ENABLE_AWAY, False):
+            zone_data[AWAY] = self._calculate_away_times(stored_zones, now)
 
-    async def _perform_backfill(self, tracked_zones: list[dict[str, Any]]) -> None:
-        """Perform historical backfill for zones that have it enabled."""
+        # Rolling windows are fed by the timelines, only expired stays leave them
+        now_ts = now.timestamp()
+        for zone_name, aggregators in self._rolling.items():
+            zone_data.setdefault(zone_name, {}).update(
+                {
+                    window: round(aggregator.advance(now_ts) / 3600, 2)
+                    for window, aggregator in aggregators.items()
+                }
+            )
+
+        # Without the history the store keeps its watermark, so a restart still
+        # rebuilds the time since the last refresh that read it
+        if history_read:
+            self._update_store(tracked_zones, stored_zones, window_start, now)
+            self._resume_from = None
+        # Quantiles only change when the store closes or recalculates a day
         for zone_config in tracked_zones:
-            if not zone_config.get(CONF_ENABLE_BACKFILL, False):
-                continue
+            if quantiles := zone_selection(zone_config).daily_quantiles:
+                zone_data.setdefault(zone_config[CONF_ZONE_NAME], {}).update(
+                    self._calculate_daily_quantiles(
+                        zone_config[CONF_ZONE_NAME], quantiles
+                    )
+                )
+        # History older than the store's coverage is loaded in the background
+        if not self._backfilled:
+            self._backfilled = True
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self._perform_backfill(tracked_zones),
+                f"{DOMAIN} backfill {self._person_entity}",
+            )
 
-            zone_name = zone_config[CONF_ZONE_NAME]
-            backfill_days = zone_config.get(CONF_BACKFILL_DAYS, 0)
+        # Crossing times only move on transitions, so this rarely rearms a timer
+        self._thresholds.async_update(
+            self._get_thresholds(tracked_zones, now),
+            self.zone_intervals,
+            now.timestamp(),
+            self._zone_index,
+        )
+
+        self.last_update_success_time = dt_util.now()
+        return self.layout.pack(zone_data, self.data)
 
-            if backfill_days > 0:
-                LOGGER.info(
-                    "Performing %d-day backfill for zone %s",
-                    backfill_days,
-                    zone_name,
+    def _get_window_start(
+        self, tracked_zones: list[dict[str, Any]], now: datetime
+    ) -> datetime:
+        """Return the start of the earliest period a refresh has to calculate."""
+        needed = {
+            period
+            for zone_config in tracked_zones
+            for period in zone_selection(zone_config).periods
+        }
+        # Away time and weekly thresholds don't depend on the zones' periods
+        if self.config_entry.options.get(CONF_ENABLE_AWAY, False):
+            needed.update(PERIODS)
+        if any(
+            zone_config.get(CONF_THRESHOLD_WEEK, 0) > 0 for zone_config in tracked_zones
+        ):
+            needed.add(PERIOD_WEEK)
+        # Households read this person's timelines for their own periods
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            if self._person_entity in entry.data.get(CONF_MEMBERS, []):
+                needed.update(
+                    period
+                    for zone_config in entry.options.get(CONF_TRACKED_ZONES, [])
+                    for period in zone_selection(zone_config).periods
                 )
-                # Backfill will be handled during first calculation
-                # Data is calculated from history, so backfill is automatic
 
-    async def _calculate_zone_times(self, zone_entity_id: str) -> dict[str, float]:
-        """Calculate time spent in a zone for different periods."""
-        now = dt_util.now()
+        periods = get_period_starts(now)
+        start = min(
+            (periods[period] for period in needed), default=periods[PERIOD_TODAY]
+        )
+        if self._resume_from is not None:
+            # After a restart the time since the last stored refresh is read
+            # again, so the store has no hole, but never more than a month
+            start = max(min(start, self._resume_from), min(periods.values()))
+        return start
 
-        # Calculate period boundaries
-        periods = {
-            PERIOD_TODAY: dt_util.start_of_local_day(now),
-            PERIOD_WEEK: self._get_week_start(now),
-            PERIOD_MONTH: dt_util.start_of_local_day(now).replace(day=1),
+    def _get_thresholds(
+        self, tracked_zones: list[dict[str, Any]], now: datetime
+    ) -> list[Threshold]:
+        """Return the configured thresholds with their current period bounds."""
+        periods = get_period_starts(now)
+        ends = {
+            PERIOD_TODAY: periods[PERIOD_TODAY] + timedelta(days=1),
+            PERIOD_WEEK: periods[PERIOD_WEEK] + timedelta(days=7),
         }
+        return [
+            Threshold(
+                zone_config[CONF_ZONE_NAME],
+                period,
+                hours,
+                periods[period].timestamp(),
+                ends[period].timestamp(),
+            )
+            for zone_config in tracked_zones
+            for period, option in (
+                (PERIOD_TODAY, CONF_THRESHOLD_TODAY),
+                (PERIOD_WEEK, CONF_THRESHOLD_WEEK),
+            )
+            if (hours := zone_config.get(option, 0)) > 0
+        ]
 
-        result = {}
-        for period, start_time in periods.items():
-            hours = await self._calculate_time_in_zone(zone_entity_id, start_time, now)
-            result[period] = hours
+    def _calculate_daily_quantiles(
+        self, zone_entity_id: str, quantiles: list[str]
+    ) -> dict[str, float | None]:
+        """Read the selected quantiles of a zone's time per day from the store."""
+        sketches = [
+            self.store.sketch(zone_entity_id, [weekday])
+            for weekday in range(len(WEEKDAY_PERIODS))
+        ]
+        # Merged from the same weekday sketches, without reading any day
+        merged = self.store.sketch(zone_entity_id)
 
+        def hours(seconds: float | None) -> float | None:
+            return round(seconds / 3600, 2) if seconds is not None else None
+
+        self.weekday_quantiles[zone_entity_id] = {
+            metric: {
+                period: hours(sketch.quantile(DAILY_QUANTILES[metric]))
+                for period, sketch in zip(WEEKDAY_PERIODS, sketches, strict=True)
+            }
+            for metric in quantiles
+        }
+        return {
+            metric: hours(merged.quantile(DAILY_QUANTILES[metric]))
+            for metric in quantiles
+        }
+
+    def _calculate_visit_metrics(
+        self, zone_entity_id: str, now: datetime, selection: ZoneSelection
+    ) -> dict[str, float | None]:
+        """Calculate the selected visit statistics of a zone."""
+        intervals = self.zone_intervals.get(zone_entity_id, [])
+        end = now.timestamp()
+        periods = get_period_starts(now)
+        metrics: dict[str, float | None] = {}
+        for period in selection.periods:
+            visits = visit_metrics(intervals, periods[period].timestamp(), end)
+            values = {
+                METRIC_VISITS: visits.visits,
+                METRIC_LONGEST_STAY: round(visits.longest / 3600, 2),
+                METRIC_FIRST_ARRIVAL: visits.first_arrival,
+                METRIC_LAST_DEPARTURE: visits.last_departure,
+            }
+            for metric in selection.visit_metrics:
+                if metric in values:
+                    metrics[f"{metric}_{period}"] = values[metric]
+        if METRIC_CURRENT_STAY in selection.visit_metrics:
+            # An interval reaching now is a stay that is still going on
+            metrics[METRIC_CURRENT_STAY] = (
+                round((end - intervals[-1][0]) / 3600, 2)
+                if intervals and intervals[-1][1] >= end
+                else 0.0
+            )
+        return metrics
+
+    def _calculate_away_times(
+        self, zones: list[str], now: datetime
+    ) -> dict[str, float]:
+        """Calculate the time spent outside every tracked zone per period."""
+        # Overlapping zones must not count the same time twice
+        timelines = [self.zone_intervals.get(zone, []) for zone in zones]
+        tracked = union_intervals(timelines)
+        end = now.timestamp()
+        away = {}
+        for period, start in get_period_starts(now).items():
+            inside = clipped_seconds(tracked, start.timestamp(), end)
+            away[period] = round((end - start.timestamp() - inside) / 3600, 2)
+        return away
+
+    async def _async_update_gap_index(
+        self, now: datetime, window_start: datetime
+    ) -> None:
+        """Read the recorder's gaps once a day and queue the stored days they change."""
+        if self._gaps_checked == now.date():
+            return
+        self.recorder_gaps = await async_get_recorder_gaps(self.hass)
+        self._gaps_checked = now.date()
+
+        store = self.store
+        new = store.add_gaps(GAP_DOWNTIME, self.recorder_gaps.downtime)
+        policy_gaps = _POLICY_GAPS[self._gap_policy]
+        # Refreshes recalculate their own window, only older days are queued
+        before = window_start.timestamp()
+        for kind in _POLICY_GAPS[store.gap_policy or GAP_POLICY_IGNORE] ^ policy_gaps:
+            store.mark_dirty(store.gaps.get(kind, []), before)
+        if GAP_DOWNTIME in policy_gaps:
+            store.mark_dirty(new, before)
+        store.gap_policy = self._gap_policy
+        if store.dirty:
+            LOGGER.debug(
+                "%d stored days of %s are recalculated for gaps",
+                len(store.dirty),
+                self._person_entity,
+            )
+
+    def _update_store(
+        self,
+        tracked_zones: list[dict[str, Any]],
+        zones: list[str],
+        window_start: datetime,
+        now: datetime,
+    ) -> None:
+        """Persist this refresh's intervals and compact old ones."""
+        store = self.store
+        store.remove_zones(
+            {zone_config[CONF_ZONE_NAME] for zone_config in tracked_zones}
+        )
+        # Purged history is missing from the refresh, keep what was stored
+        start = max(window_start.timestamp(), self.recorder_gaps.oldest or 0.0)
+        for zone in zones:
+            if zone in self.zone_intervals:
+                store.replace(
+                    zone,
+                    start,
+                    now.timestamp(),
+                    [
+                        (max(interval_start, start), interval_end)
+                        for interval_start, interval_end in self.zone_intervals[zone]
+                        if interval_end > start
+                    ],
+                )
+        store.watermark = now.timestamp()
+        store.compact(now.date(), _get_retention(tracked_zones))
+        store.async_schedule_save()
+
+    async def _perform_backfill(self, tracked_zones: list[dict[str, Any]]) -> None:
+        """Fill the interval store from history for zones that have it enabled."""
+        # Keeps the integrity auditor from reading days that are being written
+        self.backfilling = True
+        try:
+            now = dt_util.now()
+            # The refreshes cover the standard periods, backfill what lies before
+            covered = min(get_period_starts(now).values()).timestamp()
+            ranges: dict[str, tuple[float, float]] = {}
+            chunk_days = MAX_BACKFILL_CHUNK_DAYS
+            for zone_config in tracked_zones:
+                backfill_days = zone_config.get(CONF_BACKFILL_DAYS, 0)
+                if (
+                    not zone_config.get(CONF_ENABLE_BACKFILL, False)
+                    or backfill_days <= 0
+                ):
+                    continue
+                zone_name = zone_config[CONF_ZONE_NAME]
+                # Nothing can be loaded from before the recorder's history
+                start = max(
+                    (now - timedelta(days=backfill_days)).timestamp(),
+                    self.recorder_gaps.oldest or 0.0,
+                )
+                end = self.store.covered_since.get(zone_name, covered)
+                if start < end:
+                    ranges[zone_name] = (start, end)
+                    # Planned in the options flow from the zone's row count
+                    chunk_days = min(
+                        chunk_days,
+                        zone_config.get(
+                            CONF_BACKFILL_CHUNK_DAYS, DEFAULT_BACKFILL_CHUNK_DAYS
+                        ),
+                    )
+            if not ranges:
+                return
+
+            LOGGER.info(
+                "Backfilling %s for %s, %d days per query",
+                ", ".join(ranges),
+                self._person_entity,
+                chunk_days,
+            )
+            first = min(start for start, _end in ranges.values())
+            chunk_end = max(end for _start, end in ranges.values())
+            # Newest chunk first, so an interrupted backfill leaves no holes
+            while chunk_end > first:
+                chunk_start = max(chunk_end - chunk_days * 86400, first)
+                zones = [
+                    zone
+                    for zone, (start, end) in ranges.items()
+                    if start < chunk_end and end > chunk_start
+                ]
+                zone_transitions = await self._async_fetch_zone_transitions(
+                    zones,
+                    dt_util.utc_from_timestamp(chunk_start),
+                    dt_util.utc_from_timestamp(chunk_end),
+                    include_start_time_state=True,
+                )
+                jobs = [
+                    (
+                        zone,
+                        transitions,
+                        target_zone,
+                        max(chunk_start, ranges[zone][0]),
+                        min(chunk_end, ranges[zone][1]),
+                    )
+                    for zone, (target_zone, transitions) in zone_transitions.items()
+                    if target_zone is not None
+                ]
+                # Long chunks are filtered and turned into stays in a worker
+                stays = await async_get_offloader(self.hass).async_stays_by_zone(
+                    jobs, self._min_dwell, self._merge_gap, chunk_end
+                )
+                for zone, _transitions, _target, start, end in jobs:
+                    self.store.replace(zone, start, end, stays[zone])
+                chunk_end = chunk_start
+
+            self.store.compact(now.date(), _get_retention(tracked_zones), force=True)
+            self.store.async_schedule_save()
+            LOGGER.info("Backfill finished for %s", self._person_entity)
+        finally:
+            self.backfilling = False
+
+    async def _async_update_timelines(
+        self, tracked_zones: list[dict[str, Any]], window_start: datetime, now: datetime
+    ) -> list[str]:
+        """Fold the rows recorded since the previous refresh into the zone timelines.
+
+        Returns the zones whose target is known.
+        """
+        zones = [zone_config[CONF_ZONE_NAME] for zone_config in tracked_zones]
+        rolling = {
+            zone_config[CONF_ZONE_NAME]: zone_config[CONF_ROLLING_WINDOWS]
+            for zone_config in tracked_zones
+            if zone_config.get(CONF_ROLLING_WINDOWS)
+        }
+        if rolling:
+            # Rolling windows are fed from the same rows, so they reach back
+            # to the day the longest one starts on
+            longest = max(
+                ROLLING_WINDOW_SECONDS[window]
+                for windows in rolling.values()
+                for window in windows
+            )
+            window_start = min(
+                window_start,
+                dt_util.start_of_local_day(now - timedelta(seconds=longest)),
+            )
+        rows, new_rows = await self._async_fetch_window_rows(window_start, now)
+
+        geometry = self._membership_mode == MEMBERSHIP_GEOMETRY
+        targets = {
+            zone: zone if geometry else self._get_zone_target(zone) for zone in zones
+        }
+        # Anything that changes what the rows mean starts the timelines over
+        key = (
+            window_start,
+            targets,
+            rolling,
+            self._build_zone_index(zones) if geometry else None,
+            self.recorder_gaps,
+        )
+        if new_rows is None or key != self._timelines_key:
+            start = window_start.timestamp()
+            self._rolling = {
+                zone: {
+                    window: SlidingWindowAggregator(ROLLING_WINDOW_SECONDS[window])
+                    for window in windows
+                }
+                for zone, windows in rolling.items()
+                if targets[zone] is not None
+            }
+            self._timelines = {
+                zone: ZoneTimeline(start, self._rolling.get(zone, {}).values())
+                for zone, target in targets.items()
+                if target is not None
+            }
+            self._timeline_filters = {}
+            self._timelines_key = key
+        else:
+            # The row before the new ones repeats the state the timelines are
+            # in, which keeps gap spans and zone memberships continuous
+            rows = rows[-len(new_rows) - 1 :]
+
+        zone_transitions = await self._async_zone_transitions(
+            list(self._timelines), rows, now
+        )
+        confirmed: dict[str | None, list[tuple[float, str]]] = {}
+        for zone, timeline in self._timelines.items():
+            target_zone, transitions = zone_transitions[zone]
+            if self._min_dwell or self._merge_gap:
+                flap_key = zone if geometry else None
+                if flap_key not in confirmed:
+                    flap_filter = self._timeline_filters.setdefault(
+                        flap_key, FlapFilter(self._min_dwell, self._merge_gap)
+                    )
+                    confirmed[flap_key] = [
+                        transition
+                        for timestamp, state in transitions
+                        if (transition := flap_filter.feed(timestamp, state))
+                    ]
+                    if settled := flap_filter.settle(now.timestamp()):
+                        confirmed[flap_key].append(settled)
+                transitions = confirmed[flap_key]
+            for timestamp, state in transitions:
+                timeline.feed(timestamp, state == target_zone)
+        return list(self._timelines)
+
+    async def _async_fetch_window_rows(
+        self, window_start: datetime, now: datetime
+    ) -> tuple[list[tuple[Any, ...]], list[tuple[Any, ...]] | None]:
+        """Return the person's rows since the window start, reading only new ones.
+
+        Also returns the rows that are new since the previous refresh, or None
+        when the window was read in full.
+        """
+        window = self.window
+        start = window_start.timestamp()
+        # Each new day or period reads the window again, which also picks up
+        # rows written too late for the overlap check
+        if not window.needs_full_read(start, now.date()):
+            # Rows a little older than the watermark are read again, so late
+            # writes show up as a mismatch instead of going unnoticed
+            since = max(window.watermark - DELTA_OVERLAP, start)
+            fetched = await self._async_fetch_rows(
+                dt_util.utc_from_timestamp(since), now, True
+            )
+            if (new_rows := window.fold(since, fetched)) is not None:
+                return window.rows, new_rows
+            LOGGER.debug(
+                "History of %s changed before %s, reading the window again",
+                self._person_entity,
+                dt_util.utc_from_timestamp(window.watermark),
+            )
+        window.reset(
+            start, now.date(), await self._async_fetch_rows(window_start, now, True)
+        )
+        return window.rows, None
+
+    async def _async_fetch_zone_transitions(
+        self,
+        zones: list[str],
+        start_time: datetime,
+        end_time: datetime,
+        include_start_time_state: bool,
+    ) -> dict[str, tuple[str | None, list[tuple[float, str]]]]:
+        """Fetch each zone's target state and the transitions to match it against."""
+        return await self._async_zone_transitions(
+            zones,
+            await self._async_fetch_rows(
+                start_time, end_time, include_start_time_state
+            ),
+            end_time,
+        )
+
+    async def _async_fetch_rows(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        include_start_time_state: bool,
+    ) -> list[tuple[Any, ...]]:
+        """Fetch the person's points or states, as the membership mode needs."""
+        if self._membership_mode == MEMBERSHIP_GEOMETRY:
+            return await self._async_fetch_points(
+                start_time, end_time, include_start_time_state
+            )
+        return await self._async_fetch_transitions(
+            start_time, end_time, include_start_time_state
+        )
+
+    async def _async_zone_transitions(
+        self, zones: list[str], rows: list[tuple[Any, ...]], end_time: datetime
+    ) -> dict[str, tuple[str | None, list[tuple[float, str]]]]:
+        """Turn the person's recorder rows into each zone's target and transitions."""
+        if self._membership_mode == MEMBERSHIP_GEOMETRY:
+            index = self._build_zone_index(zones)
+            # Every overlapping zone is resolved from the same pass over the points
+            per_zone = await self.hass.async_add_executor_job(
+                self._profiled(zone_transitions_from_points), rows, index
+            )
+            return {
+                zone: (zone, self._apply_gap_policy(per_zone.get(zone, [])))
+                for zone in zones
+            }
+
+        # Person states are shared by all zones, the target tells them apart
+        transitions, unavailable = await self.hass.async_add_executor_job(
+            self._profiled(self._resolve_states),
+            async_get_zone_resolver(self.hass),
+            rows,
+            end_time.timestamp(),
+        )
+        self.store.add_gaps(GAP_UNAVAILABLE, unavailable)
+        return {zone: (self._get_zone_target(zone), transitions) for zone in zones}
+
+    def _resolve_states(
+        self, resolver: ZoneResolver, rows: list[tuple[Any, ...]], end: float
+    ) -> tuple[list[tuple[float, str]], list[tuple[float, float]]]:
+        """Resolve person states to zones and apply the gap policy in a thread.
+
+        Returns the transitions and the spans the person was unavailable.
+        """
+        # Zone names are resolved to entity IDs once, so renames keep matching
+        transitions = [
+            (timestamp, resolver.resolve(state, timestamp)) for timestamp, state in rows
+        ]
+        unavailable = state_spans(transitions, UNAVAILABLE_STATES, end)
+        return self._apply_gap_policy(transitions), unavailable
+
+    def _apply_gap_policy(
+        self, transitions: list[tuple[float, str]]
+    ) -> list[tuple[float, str]]:
+        """Count the gaps in the transitions as the gap policy says."""
+        if self._gap_policy == GAP_POLICY_HOLD:
+            return hold_through(transitions, UNAVAILABLE_STATES)
+        if self._gap_policy == GAP_POLICY_EXCLUDE and self.recorder_gaps.downtime:
+            return mark_gaps(
+                transitions, self.recorder_gaps.downtime, STATE_UNAVAILABLE
+            )
+        return transitions
+
+    async def _async_fetch_points(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        include_start_time_state: bool,
+    ) -> list[tuple[float, float, float]]:
+        """Fetch the person's GPS fixes as (timestamp, latitude, longitude)."""
+        states = await get_instance(self.hass).async_add_executor_job(
+            self._profiled(history.get_significant_states),
+            self.hass,
+            start_time,
+            end_time,
+            [self._person_entity],
+            None,
+            include_start_time_state,
+            False,  # significant_changes_only, coordinates are attribute updates
+        )
+        points = []
+        for state in (states or {}).get(self._person_entity, []):
+            latitude = state.attributes.get(ATTR_LATITUDE)
+            longitude = state.attributes.get(ATTR_LONGITUDE)
+            if isinstance(latitude, (int, float)) and isinstance(
+                longitude, (int, float)
+            ):
+                points.append((state.last_updated.timestamp(), latitude, longitude))
+        return points
+
+    def _profiled(self, target: Callable[..., _T]) -> Callable[..., _T]:
+        """Return an executor job, wrapped in the profiler when one is armed."""
+        if self.profiler is None:
+            return target
+        return partial(self.profiler.run_profiled, target)
+
+    def _build_zone_index(self, zones: list[str]) -> ZoneIndex:
+        """Return a spatial index over the circles of the given zones.
+
+        The index is only rebuilt when a zone was added, removed or moved.
+        """
+        circles = []
+        for zone_entity_id in zones:
+            zone_state = self.hass.states.get(zone_entity_id)
+            if zone_state is None:
+                LOGGER.warning("Zone entity %s not found", zone_entity_id)
+                continue
+            try:
+                circles.append(
+                    ZoneCircle(
+                        zone_entity_id,
+                        float(zone_state.attributes[ATTR_LATITUDE]),
+                        float(zone_state.attributes[ATTR_LONGITUDE]),
+                        float(zone_state.attributes[ATTR_RADIUS]),
+                    )
+                )
+            except (KeyError, TypeError, ValueError):
+                LOGGER.warning("Zone %s has no usable location", zone_entity_id)
+        if self._zone_index is None or self._zone_index.zones != circles:
+            self._zone_index = ZoneIndex(circles)
+        return self._zone_index
+
+    async def _async_fetch_transitions(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        include_start_time_state: bool,
+    ) -> list[tuple[float, str]]:
+        """Fetch the person's state changes as (timestamp, state) pairs."""
+        states = await get_instance(self.hass).async_add_executor_job(
+            self._profiled(history.get_significant_states),
+            self.hass,
+            start_time,
+            end_time,
+            [self._person_entity],
+            None,
+            include_start_time_state,
+            True,  # significant_changes_only
+        )
+        return [
+            (state.last_updated.timestamp(), state.state)
+            for state in (states or {}).get(self._person_entity, [])
+        ]
+
+    def _filter_transitions(
+        self, transitions: list[tuple[float, str]], end_time: datetime
+    ) -> list[tuple[float, str]]:
+        """Collapse GPS flapping before any aggregation, if configured."""
+        if not self._min_dwell and not self._merge_gap:
+            return transitions
+        filtered = list(
+            filter_flaps(
+                transitions, self._min_dwell, self._merge_gap, end_time.timestamp()
+            )
+        )
+        LOGGER.debug(
+            "Flap filter reduced %d transitions to %d for %s",
+            len(transitions),
+            len(filtered),
+            self._person_entity,
+        )
+        return filtered
+
+    def _get_zone_target(self, zone_entity_id: str) -> str | None:
+        """Return the resolved person state that means being in the zone."""
+        resolver = async_get_zone_resolver(self.hass)
+        if not resolver.knows(zone_entity_id):
+            LOGGER.warning("Zone entity %s not found", zone_entity_id)
+            return None
+        return resolver.canonical(zone_entity_id)
+
+    def _calculate_zone_times(
+        self,
+        zone_entity_id: str,
+        window: datetime,
+        now: datetime,
+        selected: list[str],
+    ) -> dict[str, float]:
+        """Calculate time spent in a zone for the selected periods."""
+        periods = get_period_starts(now)
+        end = now.timestamp()
+        window_start = window.timestamp()
+
+        timeline = self._timelines.get(zone_entity_id)
+        intervals = timeline.intervals(end) if timeline is not None else []
+        if (oldest := self.recorder_gaps.oldest) is not None and oldest > window_start:
+            # The recorder purged the start of the window, the store still has it
+            stored = [
+                (interval_start, min(interval_end, oldest))
+                for interval_start, interval_end in self.store.intervals(
+                    zone_entity_id, window_start, oldest
+                )
+            ]
+            intervals = union_intervals([stored, intervals])
+        # Kept so households can combine timelines without querying again
+        self.zone_intervals[zone_entity_id] = intervals
+
+        result = {
+            period: round(
+                clipped_seconds(intervals, periods[period].timestamp(), end) / 3600, 2
+            )
+            for period in selected
+        }
+        LOGGER.debug(
+            "Calculated %s for %s in zone %s from %d stays",
+            result,
+            self._person_entity,
+            zone_entity_id,
+            len(intervals),
+        )
         return result
 
     async def _calculate_time_in_zone(
@@ -164,7 +1103,7 @@ class P2ZDataUpdateCoordinator(DataUpdateCoordinator[dict[str, dict[str, float]]
         """Calculate time spent in a specific zone between two times."""
         # Get state history for the person entity
         states = await get_instance(self.hass).async_add_executor_job(
-            history.get_significant_states,
+            self._profiled(history.get_significant_states),
             self.hass,
             start_time,
             end_time,
@@ -196,18 +1135,13 @@ class P2ZDataUpdateCoordinator(DataUpdateCoordinator[dict[str, dict[str, float]]
             zone_entity_id,
         )
 
-        # Get the zone's friendly name from the zone entity
-        # Person entities use the zone's friendly name, not the entity_id
-        zone_state = self.hass.states.get(zone_entity_id)
-        if zone_state is None:
-            LOGGER.warning("Zone entity %s not found", zone_entity_id)
+        # Person entities use the zone's name, which the resolver maps back
+        # to the zone's entity ID, including names the zone had in the past
+        resolver = async_get_zone_resolver(self.hass)
+        target_zone = self._get_zone_target(zone_entity_id)
+        if target_zone is None:
             return 0.0
 
-        # The zone's friendly name is in the attributes
-        target_zone = zone_state.attributes.get(
-            "friendly_name", zone_entity_id.replace("zone.", "")
-        )
-
         # Log first few states to see what we're working with
         if len(person_states) > 0:
             sample_states = [s.state for s in person_states[:5]]
@@ -220,17 +1154,27 @@ class P2ZDataUpdateCoordinator(DataUpdateCoordinator[dict[str, dict[str, float]]
 
         total_seconds = 0.0
         last_zone_entry = None
+        # The reference counts gaps the same way as the stored intervals
+        hold = self._gap_policy == GAP_POLICY_HOLD
+        downtime = (
+            self.recorder_gaps.downtime
+            if self._gap_policy == GAP_POLICY_EXCLUDE
+            else []
+        )
 
         for i, state in enumerate(person_states):
             current_state = state.state
             current_time = state.last_updated
+            if hold and current_state in UNAVAILABLE_STATES:
+                continue
 
             # Ensure we don't count time before the start_time
             if current_time < start_time:
                 current_time = start_time
 
             # Check if person is in the target zone
-            if current_state == target_zone:
+            current_zone = resolver.resolve(current_state, current_time.timestamp())
+            if current_zone == target_zone:
                 if last_zone_entry is None:
                     # Entering zone
                     last_zone_entry = current_time
@@ -243,12 +1187,18 @@ class P2ZDataUpdateCoordinator(DataUpdateCoordinator[dict[str, dict[str, float]]
                         current_time = end_time
 
                     duration = (current_time - last_zone_entry).total_seconds()
+                    duration -= clipped_seconds(
+                        downtime, last_zone_entry.timestamp(), current_time.timestamp()
+                    )
                     total_seconds += duration
                     last_zone_entry = None
 
         # If still in zone at end time, count duration until end
         if last_zone_entry is not None:
             duration = (end_time - last_zone_entry).total_seconds()
+            duration -= clipped_seconds(
+                downtime, last_zone_entry.timestamp(), end_time.timestamp()
+            )
             total_seconds += duration
 
         # Convert seconds to hours
@@ -263,12 +1213,6 @@ class P2ZDataUpdateCoordinator(DataUpdateCoordinator[dict[str, dict[str, float]]
         )
         return hours
 
-    def _get_week_start(self, dt: datetime) -> datetime:
-        """Get the start of the week (Monday at 00:00)."""
-        days_since_monday = dt.weekday()
-        week_start = dt - timedelta(days=days_since_monday)
-        return dt_util.start_of_local_day(week_start)
-
     async def _calculate_weekday_averages(
         self, zone_name: str, days: int
     ) -> dict[str, float]:
@@ -280,64 +1224,47 @@ class P2ZDataUpdateCoordinator(DataUpdateCoordinator[dict[str, dict[str, float]]
         zone_entity_id = (
             f"zone.{zone_name}" if not zone_name.startswith("zone.") else zone_name
         )
-        zone_state = self.hass.states.get(zone_entity_id)
-        if zone_state is None:
-            return {}
-        target_zone = zone_state.attributes.get(
-            "friendly_name", zone_name.replace("zone.", "")
-        )
-
-        # Fetch history
-        states = await get_instance(self.hass).async_add_executor_job(
-            history.get_significant_states,
-            self.hass,
-            start_time,
-            now,
-            [self._person_entity],
-            None,
-            True,  # include_start_time_state
-            True,  # significant_changes_only
-        )
+        totals = self.store.daily_totals(zone_entity_id)
+        oldest = self.recorder_gaps.oldest
+        if (
+            totals
+            and oldest is not None
+            and start_time.timestamp() < oldest
+            and min(totals)
+            < dt_util.as_local(dt_util.utc_from_timestamp(oldest)).date()
+        ):
+            # Stored or imported history reaches back further than the recorder.
+            # Days without time are not averaged, so uncovered days don't count
+            averages = weekday_averages_from_totals(
+                totals,
+                # The first stored day is only partly known
+                max(start_time.date(), min(totals) + timedelta(days=1)),
+                now.date(),
+            )
+        else:
+            zone_transitions = await self._async_fetch_zone_transitions(
+                [zone_entity_id], start_time, now, include_start_time_state=True
+            )
+            target_zone, transitions = zone_transitions[zone_entity_id]
+            if target_zone is None:
+                return {}
+            if not transitions:
+                LOGGER.debug(
+                    "No history found for %s when calculating averages",
+                    self._person_entity,
+                )
+                return {}
+            transitions = self._filter_transitions(transitions, now)
 
-        if not states or self._person_entity not in states:
             LOGGER.debug(
-                "No history found for %s when calculating averages", self._person_entity
+                "Found %d transitions for averages calculation (target zone: %s)",
+                len(transitions),
+                target_zone,
+            )
+            # Long histories are aggregated in a worker process, off the GIL
+            averages = await async_get_offloader(self.hass).async_weekday_averages(
+                transitions, target_zone, now.date(), dt_util.get_default_time_zone()
             )
-            return {}
-
-        person_states = states[self._person_entity]
-        LOGGER.debug(
-            "Found %d states for averages calculation (target zone: %s)",
-            len(person_states),
-            target_zone,
-        )
-
-        # Buckets for each weekday (0=Monday, 6=Sunday)
-        # total_seconds: sum of duration
-        # unique_days: set of unique dates (YYYY-MM-DD) encountered for this weekday
-        weekday_stats = {
-            i: {"total_seconds": 0.0, "unique_days": set()} for i in range(7)
-        }
-
-        for i in range(len(person_states) - 1):
-            state = person_states[i]
-            next_state = person_states[i + 1]
-
-            if state.state == target_zone:
-                duration = (
-                    next_state.last_changed - state.last_changed
-                ).total_seconds()
-                weekday = state.last_changed.weekday()
-                date_str = state.last_changed.strftime("%Y-%m-%d")
-
-                # Exclude today from historical average to avoid skewing with incomplete data
-                if date_str == now.strftime("%Y-%m-%d"):
-                    continue
-
-                weekday_stats[weekday]["total_seconds"] += duration
-                weekday_stats[weekday]["unique_days"].add(date_str)
-
-        LOGGER.debug("Weekday stats raw data: %s", weekday_stats)
 
         # Map weekday index to period constant
         weekday_map = {
@@ -349,15 +1276,7 @@ class P2ZDataUpdateCoordinator(DataUpdateCoordinator[dict[str, dict[str, float]]
             5: PERIOD_SATURDAY,
             6: PERIOD_SUNDAY,
         }
-
-        results = {}
-        for i, stats in weekday_stats.items():
-            count = len(stats["unique_days"])
-            if count > 0:
-                avg_seconds = stats["total_seconds"] / count
-                results[weekday_map[i]] = round(avg_seconds / 3600, 2)
-            else:
-                results[weekday_map[i]] = 0.0
+        results = {weekday_map[i]: hours for i, hours in averages.items()}
 
         LOGGER.debug("Calculated weekday averages for %s: %s", zone_name, results)
         return results
@@ -10,6 +10,7 @@ if TYPE_CHECKING:
     from homeassistant.loader import Integration
 
     from .coordinator import P2ZDataUpdateCoordinator
+    from .household import P2ZHouseholdCoordinator
 
 
 type P2ZTrackerConfigEntry = ConfigEntry[P2ZTrackerData]
@@ -19,5 +20,5 @@ type P2ZTrackerConfigEntry = ConfigEntry[P2ZTrackerData]
 class P2ZTrackerData:
     """Data for the Person Zone Time Tracker integration."""
 
-    coordinator: P2ZDataUpdateCoordinator
+    coordinator: P2ZDataUpdateCoordinator | P2ZHouseholdCoordinator
     integration: Integration
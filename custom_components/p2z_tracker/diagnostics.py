@@ -0,0 +1,42 @@
+"""Diagnostics support for p2z_tracker."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .coordinator import P2ZDataUpdateCoordinator
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .data import P2ZTrackerConfigEntry
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: P2ZTrackerConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = entry.runtime_data.coordinator
+    diagnostics: dict[str, Any] = {
+        "data": dict(entry.data),
+        "options": dict(entry.options),
+        "last_update_success": coordinator.last_update_success,
+    }
+    if not isinstance(coordinator, P2ZDataUpdateCoordinator):
+        return diagnostics
+
+    store = coordinator.store
+    diagnostics["store"] = {
+        "watermark": store.watermark,
+        "covered_since": store.covered_since,
+        "zones": sorted(store.zones),
+    }
+    diagnostics["gaps"] = {
+        "policy": store.gap_policy,
+        "recorded_since": coordinator.recorder_gaps.oldest,
+        "known": {kind: len(spans) for kind, spans in store.gaps.items()},
+        "pending_days": sorted(store.dirty),
+    }
+    diagnostics["window"] = coordinator.window.as_dict()
+    diagnostics["audit"] = coordinator.auditor.as_dict()
+    return diagnostics
@@ -0,0 +1,42 @@
+"""Recorder gap detection for p2z_tracker."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.db_schema import RecorderRuns
+from homeassistant.components.recorder.models import process_timestamp
+from homeassistant.components.recorder.util import session_scope
+from sqlalchemy import select
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+class RecorderGaps(NamedTuple):
+    """Where the recorded history has holes."""
+
+    oldest: float | None  # history before this was purged or never recorded
+    downtime: list[tuple[float, float]]  # Home Assistant was not recording
+
+
+def _fetch_recorder_gaps(hass: HomeAssistant) -> RecorderGaps:
+    """Read the recorder runs and return the time between them."""
+    with session_scope(hass=hass, read_only=True) as session:
+        runs = session.execute(
+            select(RecorderRuns.start, RecorderRuns.end).order_by(RecorderRuns.start)
+        ).all()
+    downtime = [
+        (process_timestamp(end).timestamp(), process_timestamp(start).timestamp())
+        for (_start, end), (start, _end) in zip(runs, runs[1:], strict=False)
+        # Runs that crashed are closed at the next start, so they show no gap
+        if end is not None and start > end
+    ]
+    oldest = process_timestamp(runs[0].start).timestamp() if runs else None
+    return RecorderGaps(oldest, downtime)
+
+
+async def async_get_recorder_gaps(hass: HomeAssistant) -> RecorderGaps:
+    """Return the purge boundary and the downtime the recorder knows of."""
+    return await get_instance(hass).async_add_executor_job(_fetch_recorder_gaps, hass)
@@ -0,0 +1,120 @@
+"""Zone geometry helpers for p2z_tracker."""
+
+from __future__ import annotations
+
+import math
+from itertools import chain
+from statistics import median
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+EARTH_RADIUS = 6371008.8  # meters
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+MIN_CELL_SIZE = 0.0005  # degrees, roughly 50 m
+MAX_ZONE_CELLS = 64  # cells a zone may cover before it is checked for every point
+
+# State used in per-zone transitions while the person is outside the zone
+STATE_OUTSIDE = ""
+
+NO_ZONES: frozenset[str] = frozenset()
+
+
+class ZoneCircle(NamedTuple):
+    """A circular zone as defined by its state attributes."""
+
+    entity_id: str
+    latitude: float
+    longitude: float
+    radius: float
+
+
+def distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance between two points in meters."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
+
+
+class ZoneIndex:
+    """Uniform grid over zone bounding boxes for fast point-in-zone lookups."""
+
+    def __init__(self, zones: Iterable[ZoneCircle]) -> None:
+        """Build the index."""
+        self.zones = list(zones)
+        radii = [zone.radius for zone in self.zones]
+        # Cells about the size of a typical zone keep candidate lists short
+        self._cell = max(
+            2 * median(radii) / METERS_PER_DEGREE if radii else 0.0, MIN_CELL_SIZE
+        )
+        self._grid: dict[tuple[int, int], list[ZoneCircle]] = {}
+        # Zones much larger than the cells would fill the grid, they are few
+        self._large: list[ZoneCircle] = []
+        for zone in self.zones:
+            lat_span = zone.radius / METERS_PER_DEGREE
+            lon_span = lat_span / max(math.cos(math.radians(zone.latitude)), 1e-6)
+            rows = range(
+                self._cell_of(zone.latitude - lat_span),
+                self._cell_of(zone.latitude + lat_span) + 1,
+            )
+            cols = range(
+                self._cell_of(zone.longitude - lon_span),
+                self._cell_of(zone.longitude + lon_span) + 1,
+            )
+            if len(rows) * len(cols) > MAX_ZONE_CELLS:
+                self._large.append(zone)
+                continue
+            for row in rows:
+                for col in cols:
+                    self._grid.setdefault((row, col), []).append(zone)
+
+    def _cell_of(self, degrees: float) -> int:
+        """Return the grid coordinate of a latitude or longitude."""
+        return math.floor(degrees / self._cell)
+
+    def containing(self, latitude: float, longitude: float) -> frozenset[str]:
+        """Return the entity IDs of every zone containing the point."""
+        candidates = self._grid.get(
+            (self._cell_of(latitude), self._cell_of(longitude)), []
+        )
+        if not candidates and not self._large:
+            return NO_ZONES
+        return frozenset(
+            zone.entity_id
+            for zone in chain(candidates, self._large)
+            if distance(latitude, longitude, zone.latitude, zone.longitude)
+            <= zone.radius
+        )
+
+
+def zone_transitions_from_points(
+    points: Iterable[tuple[float, float, float]], index: ZoneIndex
+) -> dict[str, list[tuple[float, str]]]:
+    """Turn (timestamp, latitude, longitude) points into per-zone transitions."""
+    transitions: dict[str, list[tuple[float, str]]] = {
+        zone.entity_id: [] for zone in index.zones
+    }
+    inside: frozenset[str] | None = None
+    last_position: tuple[float, float] | None = None
+    members = NO_ZONES
+
+    for timestamp, latitude, longitude in points:
+        # Stationary phones report the same fix over and over
+        if (latitude, longitude) != last_position:
+            members = index.containing(latitude, longitude)
+            last_position = (latitude, longitude)
+
+        # Overlapping zones all accrue time from the same point
+        changed = transitions.keys() if inside is None else members ^ inside
+        for zone in changed:
+            transitions[zone].append(
+                (timestamp, zone if zone in members else STATE_OUTSIDE)
+            )
+        inside = members
+
+    return transitions
@@ -0,0 +1,111 @@
+"""Household aggregation coordinator for p2z_tracker."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_MEMBERS,
+    CONF_PERSON_ENTITY,
+    CONF_TRACKED_ZONES,
+    CONF_ZONE_NAME,
+    DOMAIN,
+    LOGGER,
+    OCCUPANCY_ALL,
+    OCCUPANCY_ANY,
+)
+from .coordinator import P2ZDataUpdateCoordinator, get_period_starts
+from .intervals import clipped_seconds, intersect_intervals, union_intervals
+from .selection import totals_keys, zone_selection
+from .totals import Totals, TotalsLayout
+
+if TYPE_CHECKING:
+    from .data import P2ZTrackerConfigEntry
+
+
+class P2ZHouseholdCoordinator(DataUpdateCoordinator[Totals]):
+    """Class to combine the zone timelines of several tracked persons."""
+
+    config_entry: P2ZTrackerConfigEntry
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        logger,
+        name: str,
+        update_interval: timedelta,
+        config_entry: P2ZTrackerConfigEntry,
+    ) -> None:
+        """Initialize coordinator."""
+        super().__init__(hass, logger, name=name, update_interval=update_interval)
+        self.config_entry = config_entry
+        self._members: list[str] = config_entry.data[CONF_MEMBERS]
+        self.layout = TotalsLayout(totals_keys(config_entry))
+        self.last_update_success_time: datetime | None = None
+
+    def _get_member_coordinators(self) -> dict[str, P2ZDataUpdateCoordinator]:
+        """Return the loaded person coordinators of the household members."""
+        coordinators = {}
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            if (
+                entry.state is ConfigEntryState.LOADED
+                and entry.data.get(CONF_PERSON_ENTITY) in self._members
+                and isinstance(entry.runtime_data.coordinator, P2ZDataUpdateCoordinator)
+            ):
+                coordinators[entry.data[CONF_PERSON_ENTITY]] = (
+                    entry.runtime_data.coordinator
+                )
+        return coordinators
+
+    async def _async_update_data(self) -> Totals:
+        """Combine the members' zone timelines into household occupancy."""
+        tracked_zones = self.config_entry.options.get(CONF_TRACKED_ZONES, [])
+        coordinators = self._get_member_coordinators()
+
+        now = dt_util.now()
+        end = now.timestamp()
+        periods = {
+            period: start.timestamp()
+            for period, start in get_period_starts(now).items()
+        }
+
+        zone_data = {}
+        for zone_config in tracked_zones:
+            zone_name = zone_config[CONF_ZONE_NAME]
+
+            # Reuse the intervals each person coordinator already computed
+            timelines = []
+            for member in self._members:
+                coordinator = coordinators.get(member)
+                intervals = (
+                    coordinator.zone_intervals.get(zone_name) if coordinator else None
+                )
+                if intervals is None:
+                    LOGGER.debug(
+                        "No %s timeline for %s, counting them as absent",
+                        zone_name,
+                        member,
+                    )
+                    intervals = []
+                timelines.append(intervals)
+
+            occupancy = {
+                OCCUPANCY_ANY: union_intervals(timelines),
+                OCCUPANCY_ALL: intersect_intervals(timelines),
+            }
+            zone_data[zone_name] = {
+                f"{mode}_{period}": round(
+                    clipped_seconds(intervals, periods[period], end) / 3600, 2
+                )
+                for mode, intervals in occupancy.items()
+                for period in zone_selection(zone_config).periods
+            }
+
+        self.last_update_success_time = now
+        return self.layout.pack(zone_data, self.data)
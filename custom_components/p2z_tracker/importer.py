@@ -0,0 +1,216 @@
+"""Streaming readers for external location history files."""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, NamedTuple
+from xml.etree.ElementTree import iterparse
+
+from .geometry import zone_transitions_from_points
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import Any, TextIO
+    from xml.etree.ElementTree import Element
+
+    from .geometry import ZoneIndex
+
+IMPORT_FORMAT_OWNTRACKS = "owntracks"
+IMPORT_FORMAT_GPX = "gpx"
+IMPORT_FORMAT_JSON = "json"
+IMPORT_FORMATS = [IMPORT_FORMAT_OWNTRACKS, IMPORT_FORMAT_GPX, IMPORT_FORMAT_JSON]
+
+_EXTENSIONS = {
+    ".rec": IMPORT_FORMAT_OWNTRACKS,
+    ".gpx": IMPORT_FORMAT_GPX,
+    ".json": IMPORT_FORMAT_JSON,
+    ".jsonl": IMPORT_FORMAT_JSON,
+}
+_POINT_TAGS = ("trkpt", "wpt", "rtept")
+READ_CHUNK_SIZE = 1 << 20  # characters read from a JSON file at a time
+_WHITESPACE = " \t\r\n,"
+
+
+class LocationHistory(NamedTuple):
+    """The per-zone transitions read from a location history file."""
+
+    points: int
+    skipped: int  # out of order or outside the requested range
+    first: float | None
+    last: float | None
+    transitions: dict[str, list[tuple[float, str]]]
+
+
+def read_location_history(
+    path: str, file_format: str, index: ZoneIndex, start: float, end: float
+) -> LocationHistory:
+    """Stream a file's points through the zone index into per-zone transitions."""
+    points = skipped = 0
+    first: float | None = None
+    last = start
+
+    def iter_accepted() -> Iterator[tuple[float, float, float]]:
+        nonlocal points, skipped, first, last
+        for point in iter_points(path, file_format):
+            # Transitions must be in order, late points are dropped
+            if not last <= point[0] < end:
+                skipped += 1
+                continue
+            if first is None:
+                first = point[0]
+            last = point[0]
+            points += 1
+            yield point
+
+    transitions = zone_transitions_from_points(iter_accepted(), index)
+    return LocationHistory(
+        points, skipped, first, last if first is not None else None, transitions
+    )
+
+
+def detect_format(path: str) -> str:
+    """Return the format of a location history file from its extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _EXTENSIONS:
+        raise ValueError(f"Unknown location history file type {extension!r}")
+    return _EXTENSIONS[extension]
+
+
+def iter_points(path: str, file_format: str) -> Iterator[tuple[float, float, float]]:
+    """Yield (timestamp, latitude, longitude) points from a file as it is read."""
+    if file_format == IMPORT_FORMAT_GPX:
+        # Parsed from bytes, so the encoding declaration is honored
+        yield from _iter_gpx(path)
+        return
+    reader = _iter_owntracks if file_format == IMPORT_FORMAT_OWNTRACKS else _iter_json
+    with open(path, encoding="utf-8") as file:
+        yield from reader(file)
+
+
+def _iter_owntracks(file: TextIO) -> Iterator[tuple[float, float, float]]:
+    """Yield the location records of an OwnTracks recorder .rec file."""
+    for line in file:
+        # "<ISO time>\t<topic suffix>\t<JSON payload>", other types are skipped
+        if (start := line.find("{")) < 0 or '"location"' not in line:
+            continue
+        try:
+            record = json.loads(line[start:])
+        except ValueError:
+            continue
+        if record.get("_type") == "location" and (point := _json_point(record)):
+            yield point
+
+
+def _iter_gpx(path: str) -> Iterator[tuple[float, float, float]]:
+    """Yield the track, route and way points of a GPX file as it is parsed."""
+    parents: list[Element] = []
+    for event, element in iterparse(path, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag.rpartition("}")[2] not in _POINT_TAGS:
+            continue
+        when = next(
+            (
+                child.text
+                for child in element
+                if child.tag.rpartition("}")[2] == "time" and child.text
+            ),
+            None,
+        )
+        try:
+            point = (
+                _parse_time(when),
+                float(element.attrib["lat"]),
+                float(element.attrib["lon"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            point = None
+        # Parsed points are dropped, so memory stays flat on huge tracks
+        if parents:
+            parents[-1].remove(element)
+        if point is not None:
+            yield point
+
+
+def _iter_json(file: TextIO) -> Iterator[tuple[float, float, float]]:
+    """Yield the points of a JSON export without loading the whole file.
+
+    Reads a top-level array of points, the "locations" array of a Google
+    Takeout export, or one point per line.
+    """
+    decoder = json.JSONDecoder()
+    buffer = file.read(READ_CHUNK_SIZE)
+    position = _skip(buffer, 0)
+    # Takeout wraps the points in an object, only its array is streamed
+    if (key := buffer.find('"locations"', position, position + 4096)) >= 0:
+        position = buffer.index("[", key) + 1
+    elif buffer.startswith("[", position):
+        position += 1
+
+    while True:
+        position = _skip(buffer, position)
+        if position == len(buffer):
+            if not (buffer := file.read(READ_CHUNK_SIZE)):
+                return
+            position = 0
+            continue
+        if buffer[position] in "]}":
+            # The end of the points, whatever follows is not streamed
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as err:
+            # A point cut in two by the chunk boundary needs the next chunk
+            more = file.read(READ_CHUNK_SIZE)
+            if not more or len(buffer) - position > READ_CHUNK_SIZE:
+                raise ValueError(f"Invalid JSON: {err.msg}") from err
+            buffer, position = buffer[position:] + more, 0
+            continue
+        position = end
+        if isinstance(record, dict) and (point := _json_point(record)):
+            yield point
+
+
+def _skip(buffer: str, position: int) -> int:
+    """Return the position of the next value in a JSON buffer."""
+    while position < len(buffer) and buffer[position] in _WHITESPACE:
+        position += 1
+    return position
+
+
+def _json_point(record: dict[str, Any]) -> tuple[float, float, float] | None:
+    """Return the point of an OwnTracks, Takeout or plain JSON record."""
+    try:
+        if "latitudeE7" in record:
+            latitude = record["latitudeE7"] / 1e7
+            longitude = record["longitudeE7"] / 1e7
+        elif "lat" in record:
+            latitude, longitude = float(record["lat"]), float(record["lon"])
+        else:
+            latitude = float(record["latitude"])
+            longitude = float(record["longitude"])
+
+        if "tst" in record:
+            timestamp = float(record["tst"])
+        elif "timestampMs" in record:
+            timestamp = int(record["timestampMs"]) / 1000
+        else:
+            when = record.get("timestamp", record.get("time"))
+            timestamp = (
+                float(when) if isinstance(when, (int, float)) else _parse_time(when)
+            )
+    except (KeyError, TypeError, ValueError):
+        return None
+    return timestamp, latitude, longitude
+
+
+def _parse_time(value: str) -> float:
+    """Return the timestamp of an ISO 8601 time, UTC unless it has an offset."""
+    when = datetime.fromisoformat(value)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return when.timestamp()
@@ -0,0 +1,526 @@
+"""Interval aggregation engine for p2z_tracker."""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from datetime import date, datetime, time, timedelta, tzinfo
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Iterable, Iterator
+
+
+def iter_stays(
+    transitions: Iterable[tuple[float, str]], start: float, end: float
+) -> Iterator[tuple[str, float, float]]:
+    """Collapse (timestamp, state) transitions into (state, start, end) stays."""
+    current: str | None = None
+    since = start
+    for timestamp, state in transitions:
+        # Clamp to the requested range, the first state may predate it
+        timestamp = min(max(timestamp, start), end)
+        if state == current:
+            continue
+        if current is not None and timestamp > since:
+            yield current, since, timestamp
+        current, since = state, timestamp
+
+    if current is not None and end > since:
+        yield current, since, end
+
+
+def state_spans(
+    transitions: Iterable[tuple[float, str]], states: Collection[str], end: float
+) -> list[tuple[float, float]]:
+    """Return the (start, end) spans spent in any of the given states."""
+    spans: list[tuple[float, float]] = []
+    since: float | None = None
+    for timestamp, state in transitions:
+        if state in states:
+            if since is None:
+                since = timestamp
+        elif since is not None:
+            if timestamp > since:
+                spans.append((since, timestamp))
+            since = None
+    if since is not None and end > since:
+        spans.append((since, end))
+    return spans
+
+
+def hold_through(
+    transitions: Iterable[tuple[float, str]], states: Collection[str]
+) -> list[tuple[float, str]]:
+    """Drop transitions into the given states, so the previous state carries on."""
+    return [transition for transition in transitions if transition[1] not in states]
+
+
+def mark_gaps(
+    transitions: list[tuple[float, str]],
+    gaps: list[tuple[float, float]],
+    gap_state: str,
+) -> list[tuple[float, str]]:
+    """Put the sorted gaps into the transitions as a state of their own.
+
+    The state from before a gap, or the last one recorded within it, resumes
+    when the gap ends. Gaps before the first transition are left out.
+    """
+    result: list[tuple[float, str]] = []
+    current: str | None = None
+    index = 0
+    count = len(transitions)
+    for gap_start, gap_end in gaps:
+        while index < count and transitions[index][0] < gap_start:
+            result.append(transitions[index])
+            current = transitions[index][1]
+            index += 1
+        # States recorded within the gap only decide what resumes after it
+        while index < count and transitions[index][0] < gap_end:
+            current = transitions[index][1]
+            index += 1
+        if current is None:
+            continue
+        result.append((gap_start, gap_state))
+        result.append((gap_end, current))
+    result.extend(transitions[index:])
+    return result
+
+
+class FlapFilter:
+    """Streaming filter that folds short stays into the surrounding stay."""
+
+    __slots__ = ("_candidate", "_committed", "merge_gap", "min_dwell")
+
+    def __init__(self, min_dwell: float, merge_gap: float) -> None:
+        """Initialize the filter with thresholds in seconds."""
+        self.min_dwell = min_dwell
+        self.merge_gap = merge_gap
+        self._committed: str | None = None
+        # A new stay that hasn't lasted long enough to be trusted yet
+        self._candidate: tuple[float, str] | None = None
+
+    def feed(self, timestamp: float, state: str) -> tuple[float, str] | None:
+        """Process a transition and return the transition it confirms, if any."""
+        if self._committed is None:
+            # The first state describes where the range starts, pass it through
+            self._committed = state
+            return timestamp, state
+
+        if self._candidate is None:
+            if state != self._committed:
+                self._candidate = (timestamp, state)
+            return None
+
+        since, candidate = self._candidate
+        if state == candidate:
+            return None
+
+        dwell = timestamp - since
+        if dwell < self.min_dwell or (
+            state == self._committed and dwell < self.merge_gap
+        ):
+            # Too short to count, the committed stay carries on
+            self._candidate = None if state == self._committed else (timestamp, state)
+            return None
+
+        self._committed = candidate
+        self._candidate = (timestamp, state)
+        return since, candidate
+
+    def settle(self, now: float) -> tuple[float, str] | None:
+        """Confirm the pending stay once it can no longer be filtered out."""
+        if self._candidate is None:
+            return None
+        since, candidate = self._candidate
+        if now - since < max(self.min_dwell, self.merge_gap):
+            return None
+        self._committed = candidate
+        self._candidate = None
+        return since, candidate
+
+
+def filter_flaps(
+    transitions: Iterable[tuple[float, str]],
+    min_dwell: float,
+    merge_gap: float,
+    end: float,
+) -> Iterator[tuple[float, str]]:
+    """Yield transitions with stays shorter than the thresholds collapsed."""
+    flap_filter = FlapFilter(min_dwell, merge_gap)
+    for timestamp, state in transitions:
+        if (confirmed := flap_filter.feed(timestamp, state)) is not None:
+            yield confirmed
+    # A stay still too short at the end is treated as part of the previous one
+    if (confirmed := flap_filter.settle(end)) is not None:
+        yield confirmed
+
+
+def weekday_averages(
+    transitions: Iterable[tuple[float, str]],
+    target: str,
+    today: date,
+    timezone: tzinfo,
+) -> dict[int, float]:
+    """Return the average hours in the target state per weekday (0=Monday)."""
+    total_seconds = [0.0] * 7
+    # Days on which the target state was seen, per weekday
+    unique_days: list[set[date]] = [set() for _ in range(7)]
+
+    previous: tuple[float, str] | None = None
+    for timestamp, state in transitions:
+        if previous is not None and previous[1] == target:
+            day = datetime.fromtimestamp(previous[0], timezone).date()
+            # Exclude today to avoid skewing the average with incomplete data
+            if day != today:
+                total_seconds[day.weekday()] += timestamp - previous[0]
+                unique_days[day.weekday()].add(day)
+        previous = (timestamp, state)
+
+    return {
+        weekday: round(total_seconds[weekday] / len(days) / 3600, 2) if days else 0.0
+        for weekday, days in enumerate(unique_days)
+    }
+
+
+def weekday_averages_from_totals(
+    totals: dict[date, float], first: date, today: date
+) -> dict[int, float]:
+    """Return the average hours per weekday (0=Monday) of stored daily totals."""
+    seconds: list[list[float]] = [[] for _ in range(7)]
+    for day, total in totals.items():
+        # Like weekday_averages, only days with time in the zone are counted
+        if first <= day < today and total > 0:
+            seconds[day.weekday()].append(total)
+    return {
+        weekday: round(sum(days) / len(days) / 3600, 2) if days else 0.0
+        for weekday, days in enumerate(seconds)
+    }
+
+
+def zone_intervals(
+    transitions: Iterable[tuple[float, str]],
+    target: str,
+    start: float,
+    end: float,
+) -> list[tuple[float, float]]:
+    """Return the (start, end) stays in the target state within a range."""
+    return [
+        (stay_start, stay_end)
+        for state, stay_start, stay_end in iter_stays(transitions, start, end)
+        if state == target
+    ]
+
+
+def stays_by_zone(
+    jobs: Iterable[tuple[str, list[tuple[float, str]], str, float, float]],
+    min_dwell: float,
+    merge_gap: float,
+    end: float,
+) -> dict[str, list[tuple[float, float]]]:
+    """Return the flap-filtered stays of (zone, transitions, target, start, end) jobs.
+
+    Zones sharing a transition list are filtered once.
+    """
+    filtered: dict[int, list[tuple[float, str]]] = {}
+    stays = {}
+    for zone, transitions, target, start, stop in jobs:
+        if id(transitions) not in filtered:
+            filtered[id(transitions)] = (
+                list(filter_flaps(transitions, min_dwell, merge_gap, end))
+                if min_dwell or merge_gap
+                else transitions
+            )
+        stays[zone] = zone_intervals(filtered[id(transitions)], target, start, stop)
+    return stays
+
+
+def clipped_seconds(
+    intervals: Iterable[tuple[float, float]], start: float, end: float
+) -> float:
+    """Return the total seconds of the intervals that fall within a range."""
+    total = 0.0
+    for interval_start, interval_end in intervals:
+        overlap = min(interval_end, end) - max(interval_start, start)
+        if overlap > 0:
+            total += overlap
+    return total
+
+
+class VisitMetrics(NamedTuple):
+    """Visit statistics of a zone over a range."""
+
+    visits: int
+    longest: float
+    first_arrival: float | None
+    last_departure: float | None
+
+
+def visit_metrics(
+    intervals: Iterable[tuple[float, float]], start: float, end: float
+) -> VisitMetrics:
+    """Return the visit statistics of the stays overlapping a range.
+
+    Stays are clipped to the range. A stay already under way at its start is
+    a visit but not an arrival, one still ongoing at its end is no departure.
+    """
+    visits = 0
+    longest = 0.0
+    first_arrival = last_departure = None
+    for interval_start, interval_end in intervals:
+        if interval_end <= start or interval_start >= end:
+            continue
+        visits += 1
+        longest = max(longest, min(interval_end, end) - max(interval_start, start))
+        if first_arrival is None and interval_start > start:
+            first_arrival = interval_start
+        if interval_end < end:
+            last_departure = interval_end
+    return VisitMetrics(visits, longest, first_arrival, last_departure)
+
+
+def daily_seconds(
+    intervals: Iterable[tuple[float, float]], timezone: tzinfo
+) -> dict[date, float]:
+    """Split intervals at local midnight and total the seconds per day."""
+    totals: dict[date, float] = {}
+    for start, end in intervals:
+        while start < end:
+            day = datetime.fromtimestamp(start, timezone).date()
+            midnight = datetime.combine(
+                day + timedelta(days=1), time.min, timezone
+            ).timestamp()
+            split = min(end, midnight)
+            totals[day] = totals.get(day, 0.0) + split - start
+            start = split
+    return totals
+
+
+def splice_intervals(
+    intervals: list[tuple[float, float]],
+    start: float,
+    end: float,
+    replacement: list[tuple[float, float]],
+) -> list[tuple[float, float]]:
+    """Replace what intervals say about a range with a recalculated list."""
+    kept: list[tuple[float, float]] = []
+    for interval_start, interval_end in intervals:
+        if interval_start < start:
+            kept.append((interval_start, min(interval_end, start)))
+        if interval_end > end:
+            kept.append((max(interval_start, end), interval_end))
+    kept.extend(
+        (max(interval_start, start), min(interval_end, end))
+        for interval_start, interval_end in replacement
+    )
+    return union_intervals([kept])
+
+
+def threshold_crossing(
+    intervals: list[tuple[float, float]], start: float, threshold: float, now: float
+) -> float | None:
+    """Return when the time since start reaches threshold seconds, if it will.
+
+    A stay that is still ongoing at now is assumed to continue, so a crossing
+    may lie in the future. None means the threshold is out of reach until the
+    next transition.
+    """
+    total = 0.0
+    for interval_start, interval_end in intervals:
+        interval_start = max(interval_start, start)
+        if interval_end <= interval_start:
+            continue
+        if total + interval_end - interval_start >= threshold:
+            return interval_start + threshold - total
+        total += interval_end - interval_start
+    if intervals and intervals[-1][1] >= now:
+        return now + threshold - total
+    return None
+
+
+def sweep_intervals(
+    timelines: list[list[tuple[float, float]]], min_count: int
+) -> list[tuple[float, float]]:
+    """Return the time covered by at least min_count of the timelines."""
+    if min_count < 1:
+        return []
+
+    events: list[tuple[float, int]] = []
+    for timeline in timelines:
+        for start, end in timeline:
+            if end > start:
+                events.append((start, 1))
+                events.append((end, -1))
+    # Ends sort before starts at equal timestamps, so touching stays merge below
+    events.sort()
+
+    result: list[tuple[float, float]] = []
+    count = 0
+    since: float | None = None
+    for timestamp, delta in events:
+        count += delta
+        if since is None and count >= min_count:
+            since = timestamp
+        elif since is not None and count < min_count:
+            if result and result[-1][1] == since:
+                result[-1] = (result[-1][0], timestamp)
+            elif timestamp > since:
+                result.append((since, timestamp))
+            since = None
+    return result
+
+
+def union_intervals(
+    timelines: list[list[tuple[float, float]]],
+) -> list[tuple[float, float]]:
+    """Return the time covered by any of the timelines."""
+    return sweep_intervals(timelines, 1)
+
+
+def intersect_intervals(
+    timelines: list[list[tuple[float, float]]],
+) -> list[tuple[float, float]]:
+    """Return the time covered by all of the timelines."""
+    return sweep_intervals(timelines, len(timelines))
+
+
+class SlidingWindowAggregator:
+    """Running total of in-zone time over a trailing window."""
+
+    __slots__ = ("_closed", "_open_since", "_total", "window")
+
+    def __init__(self, window: float) -> None:
+        """Initialize the aggregator with a window length in seconds."""
+        self.window = window
+        # Closed stays as [start, end] pairs, oldest first
+        self._closed: deque[list[float]] = deque()
+        self._open_since: float | None = None
+        self._total = 0.0
+
+    def enter(self, timestamp: float) -> None:
+        """Record that the person entered the zone."""
+        if self._open_since is None:
+            self._open_since = timestamp
+
+    def exit(self, timestamp: float) -> None:
+        """Record that the person left the zone."""
+        if self._open_since is None:
+            return
+        if timestamp > self._open_since:
+            self._closed.append([self._open_since, timestamp])
+            self._total += timestamp - self._open_since
+        self._open_since = None
+
+    def advance(self, now: float) -> float:
+        """Expire time that fell out of the window and return the total seconds."""
+        cutoff = now - self.window
+        closed = self._closed
+
+        # Every stay is dropped at most once, so this is amortized O(1)
+        while closed and closed[0][1] <= cutoff:
+            start, end = closed.popleft()
+            self._total -= end - start
+
+        if not closed:
+            # Reset to shed any accumulated floating point drift
+            self._total = 0.0
+        elif closed[0][0] < cutoff:
+            self._total -= cutoff - closed[0][0]
+            closed[0][0] = cutoff
+
+        total = self._total
+        if self._open_since is not None and now > self._open_since:
+            total += now - max(self._open_since, cutoff)
+        return max(total, 0.0)
+
+
+class ZoneTimeline:
+    """A zone's stays from a start time on, extended as transitions arrive.
+
+    Matches zone_intervals over the same transitions, and passes each entry
+    and exit on to the zone's rolling window aggregators.
+    """
+
+    __slots__ = ("_open_since", "aggregators", "closed", "start")
+
+    def __init__(
+        self, start: float, aggregators: Iterable[SlidingWindowAggregator] = ()
+    ) -> None:
+        """Initialize an empty timeline."""
+        self.start = start
+        self.closed: list[tuple[float, float]] = []
+        self._open_since: float | None = None
+        self.aggregators = list(aggregators)
+
+    def feed(self, timestamp: float, inside: bool) -> None:
+        """Record whether the person is in the zone from a time on."""
+        # The state at the start may have been recorded before it
+        timestamp = max(timestamp, self.start)
+        if inside:
+            if self._open_since is None:
+                self._open_since = timestamp
+                for aggregator in self.aggregators:
+                    aggregator.enter(timestamp)
+        elif self._open_since is not None:
+            if timestamp > self._open_since:
+                self.closed.append((self._open_since, timestamp))
+            self._open_since = None
+            for aggregator in self.aggregators:
+                aggregator.exit(timestamp)
+
+    def intervals(self, now: float) -> list[tuple[float, float]]:
+        """Return the stays up to now, a stay still going on ends now."""
+        if self._open_since is not None and now > self._open_since:
+            return [*self.closed, (self._open_since, now)]
+        return list(self.closed)
+
+
+class DailySketch:
+    """Mergeable histogram of time per day, with a fixed bin width.
+
+    Days are counted in bins of equal width over a bounded range, so the
+    size stays bounded however many days are added, quantiles are exact to
+    half a bin and sketches merge by adding their counts. Days can also be
+    removed again when they expire or are recalculated.
+    """
+
+    __slots__ = ("bin_seconds", "counts")
+
+    def __init__(
+        self, bin_seconds: float, counts: dict[int, int] | None = None
+    ) -> None:
+        """Initialize the sketch with a bin width in seconds."""
+        self.bin_seconds = bin_seconds
+        self.counts: dict[int, int] = counts if counts is not None else {}
+
+    @property
+    def days(self) -> int:
+        """Return the number of days in the sketch."""
+        return sum(self.counts.values())
+
+    def add(self, seconds: float, count: int = 1) -> None:
+        """Add a day's seconds, or remove it with a negative count."""
+        # Days without any time get a bin of their own, so they read as 0
+        index = math.ceil(max(seconds, 0.0) / self.bin_seconds)
+        if (total := self.counts.get(index, 0) + count) > 0:
+            self.counts[index] = total
+        else:
+            self.counts.pop(index, None)
+
+    def merge(self, other: DailySketch) -> None:
+        """Add the days of a sketch with the same bin width."""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+
+    def quantile(self, fraction: float) -> float | None:
+        """Return the seconds below which a fraction of the days fall."""
+        if not (days := self.days):
+            return None
+        # Nearest rank, the middle of the bin it falls into
+        rank = max(1, math.ceil(fraction * days))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return max(index - 0.5, 0.0) * self.bin_seconds
+        return None
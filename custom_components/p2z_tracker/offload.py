@@ -0,0 +1,206 @@
+"""Process pool offload for heavy p2z_tracker recomputations."""
+
+from __future__ import annotations
+
+import multiprocessing
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DOMAIN,
+    LOGGER,
+    PROCESS_POOL_IDLE_TIMEOUT,
+    PROCESS_POOL_MIN_TRANSITIONS,
+)
+from .intervals import stays_by_zone, weekday_averages
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from datetime import date, tzinfo
+
+DATA_OFFLOADER = f"{DOMAIN}_offloader"
+
+
+def pack_transitions(
+    transitions: list[tuple[float, str]],
+) -> tuple[array, array, list[str]]:
+    """Pack transitions into compact arrays that pickle cheaply."""
+    vocabulary: dict[str, int] = {}
+    timestamps = array("d")
+    states = array("I")
+    for timestamp, state in transitions:
+        timestamps.append(timestamp)
+        states.append(vocabulary.setdefault(state, len(vocabulary)))
+    return timestamps, states, list(vocabulary)
+
+
+def unpack_transitions(
+    timestamps: array, states: array, vocabulary: list[str]
+) -> Iterator[tuple[float, str]]:
+    """Yield the transitions stored by pack_transitions."""
+    for timestamp, state in zip(timestamps, states, strict=True):
+        yield timestamp, vocabulary[state]
+
+
+def packed_weekday_averages(
+    timestamps: array,
+    states: array,
+    vocabulary: list[str],
+    target: str,
+    today: date,
+    timezone: tzinfo,
+) -> dict[int, float]:
+    """Calculate weekday averages from packed transitions in a worker process."""
+    return weekday_averages(
+        unpack_transitions(timestamps, states, vocabulary), target, today, timezone
+    )
+
+
+def packed_stays_by_zone(
+    timelines: list[tuple[array, array, list[str]]],
+    jobs: list[tuple[str, int, str, float, float]],
+    min_dwell: float,
+    merge_gap: float,
+    end: float,
+) -> dict[str, list[tuple[float, float]]]:
+    """Calculate the stays of packed timelines in a worker process."""
+    unpacked = [list(unpack_transitions(*timeline)) for timeline in timelines]
+    return stays_by_zone(
+        [
+            (zone, unpacked[timeline], target, start, stop)
+            for zone, timeline, target, start, stop in jobs
+        ],
+        min_dwell,
+        merge_gap,
+        end,
+    )
+
+
+@callback
+def async_get_offloader(hass: HomeAssistant) -> ProcessOffloader:
+    """Return the offloader shared by all config entries."""
+    if DATA_OFFLOADER not in hass.data:
+        hass.data[DATA_OFFLOADER] = ProcessOffloader(hass)
+    return hass.data[DATA_OFFLOADER]
+
+
+class ProcessOffloader:
+    """Run CPU-bound jobs in a worker process that is started on demand."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the offloader."""
+        self._hass = hass
+        self._pool: ProcessPoolExecutor | None = None
+        self._jobs = 0
+        self._unsub_idle: CALLBACK_TYPE | None = None
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_shutdown)
+
+    async def async_weekday_averages(
+        self,
+        transitions: list[tuple[float, str]],
+        target: str,
+        today: date,
+        timezone: tzinfo,
+    ) -> dict[int, float]:
+        """Calculate weekday averages away from the event loop."""
+        if len(transitions) < PROCESS_POOL_MIN_TRANSITIONS:
+            return await self._hass.async_add_executor_job(
+                weekday_averages, transitions, target, today, timezone
+            )
+
+        timestamps, states, vocabulary = pack_transitions(transitions)
+        try:
+            return await self._async_run(
+                packed_weekday_averages,
+                timestamps,
+                states,
+                vocabulary,
+                target,
+                today,
+                timezone,
+            )
+        except (BrokenProcessPool, OSError) as err:
+            LOGGER.warning(
+                "Worker process failed (%s), calculating averages in a thread", err
+            )
+            return await self._hass.async_add_executor_job(
+                weekday_averages, transitions, target, today, timezone
+            )
+
+    async def async_stays_by_zone(
+        self,
+        jobs: list[tuple[str, list[tuple[float, str]], str, float, float]],
+        min_dwell: float,
+        merge_gap: float,
+        end: float,
+    ) -> dict[str, list[tuple[float, float]]]:
+        """Calculate the stays of backfills and rebuilds away from the event loop."""
+        # Zones of a person share the list of its states, it is sent once
+        timelines: dict[int, int] = {}
+        distinct: list[list[tuple[float, str]]] = []
+        for _zone, transitions, _target, _start, _stop in jobs:
+            if id(transitions) not in timelines:
+                timelines[id(transitions)] = len(distinct)
+                distinct.append(transitions)
+        if sum(map(len, distinct)) < PROCESS_POOL_MIN_TRANSITIONS:
+            return await self._hass.async_add_executor_job(
+                stays_by_zone, jobs, min_dwell, merge_gap, end
+            )
+
+        try:
+            return await self._async_run(
+                packed_stays_by_zone,
+                [pack_transitions(transitions) for transitions in distinct],
+                [
+                    (zone, timelines[id(transitions)], target, start, stop)
+                    for zone, transitions, target, start, stop in jobs
+                ],
+                min_dwell,
+                merge_gap,
+                end,
+            )
+        except (BrokenProcessPool, OSError) as err:
+            LOGGER.warning(
+                "Worker process failed (%s), calculating stays in a thread", err
+            )
+            return await self._hass.async_add_executor_job(
+                stays_by_zone, jobs, min_dwell, merge_gap, end
+            )
+
+    async def _async_run(self, target: Callable[..., Any], *args: Any) -> Any:
+        """Run a job in the worker process, starting it if needed."""
+        if self._unsub_idle is not None:
+            self._unsub_idle()
+            self._unsub_idle = None
+        if self._pool is None:
+            # Forking a process with running threads is unsafe, spawn a fresh one
+            self._pool = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            )
+
+        self._jobs += 1
+        try:
+            return await self._hass.loop.run_in_executor(self._pool, target, *args)
+        except BrokenProcessPool:
+            self._pool = None
+            raise
+        finally:
+            self._jobs -= 1
+            if self._jobs == 0 and self._pool is not None:
+                self._unsub_idle = async_call_later(
+                    self._hass, PROCESS_POOL_IDLE_TIMEOUT, self._async_shutdown
+                )
+
+    @callback
+    def _async_shutdown(self, _event: Event | Any = None) -> None:
+        """Stop the worker process."""
+        self._unsub_idle = None
+        if self._pool is not None and self._jobs == 0:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
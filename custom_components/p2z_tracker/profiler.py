@@ -0,0 +1,125 @@
+"""Refresh profiling for p2z_tracker."""
+
+from __future__ import annotations
+
+import cProfile
+import os
+import pstats
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from .const import PROFILE_TOP_FUNCTIONS
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine, Generator
+
+
+class RefreshProfiler:
+    """Collect cProfile data over a number of coordinator refreshes."""
+
+    def __init__(self, runs: int, path: str) -> None:
+        """Initialize the profiler, writing to path with .prof/.txt suffixes."""
+        self.remaining = runs
+        self.path = path
+        self._profiles: list[cProfile.Profile] = []
+        self._durations: list[float] = []
+        self._lock = threading.Lock()
+
+    def _add(self, profile: cProfile.Profile) -> None:
+        """Keep a finished profile, which may come from any thread."""
+        with self._lock:
+            self._profiles.append(profile)
+
+    async def async_run(self, job: Callable[[], Coroutine[Any, Any, Any]]) -> Any:
+        """Run one refresh under the profiler."""
+        self.remaining -= 1
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            return await _ProfiledSteps(job(), profile)
+        finally:
+            self._add(profile)
+            self._durations.append(time.perf_counter() - started)
+
+    def run_profiled(self, target: Callable[..., Any], *args: Any) -> Any:
+        """Run an executor job under its own profile."""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Since Python 3.12 a single profiler sees every thread, and the
+            # refresh profile running in the event loop already covers this job
+            return target(*args)
+        try:
+            return target(*args)
+        finally:
+            profile.disable()
+            self._add(profile)
+
+    def write(self) -> str:
+        """Write the combined profile and a summary, returning the summary path."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        summary_path = f"{self.path}.txt"
+        with open(summary_path, "w", encoding="utf-8") as file:
+            file.write(
+                f"Profiled {len(self._durations)} refreshes, durations (s): "
+                f"{', '.join(f'{duration:.3f}' for duration in self._durations)}\n\n"
+            )
+            if not self._profiles:
+                file.write("No profile data was collected.\n")
+                return summary_path
+
+            stats = pstats.Stats(self._profiles[0], stream=file)
+            for profile in self._profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(f"{self.path}.prof")
+
+            file.write("Top functions by cumulative time:\n")
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+                PROFILE_TOP_FUNCTIONS
+            )
+            file.write("Top functions by own time:\n")
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(PROFILE_TOP_FUNCTIONS)
+        return summary_path
+
+
+class _ProfiledSteps:
+    """Await a coroutine, profiling only while it runs.
+
+    The profile is off while the coroutine waits, so the other tasks the
+    event loop runs in the meantime are not counted as part of the refresh.
+    """
+
+    def __init__(self, coro: Coroutine[Any, Any, Any], profile: cProfile.Profile):
+        """Initialize the wrapper."""
+        self._coro = coro
+        self._profile = profile
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        """Step the coroutine, enabling the profile around each step."""
+        value: Any = None
+        error: BaseException | None = None
+        while True:
+            try:
+                self._profile.enable()
+                enabled = True
+            except ValueError:
+                # Another profiler is active, e.g. an executor job's, and it
+                # already sees this thread
+                enabled = False
+            try:
+                if error is None:
+                    future = self._coro.send(value)
+                else:
+                    future = self._coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                if enabled:
+                    self._profile.disable()
+            try:
+                value, error = (yield future), None
+            except BaseException as err:
+                # Cancellations and errors are passed on to the coroutine
+                value, error = None, err
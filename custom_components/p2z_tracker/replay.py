@@ -0,0 +1,322 @@
+"""Offline replay of p2z_tracker metrics from a copy of the recorder database.
+
+Runs the same aggregation engine as the coordinator against a copied
+``home-assistant_v2.db`` without a running Home Assistant, e.g.:
+
+    scripts/replay home-assistant_v2.db --zone zone.work --date 2025-01-31
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta, tzinfo
+from typing import TYPE_CHECKING, Any
+from zoneinfo import ZoneInfo
+
+try:
+    from .const import (
+        DEFAULT_RETENTION_DAYS,
+        PERIOD_FRIDAY,
+        PERIOD_MONDAY,
+        PERIOD_MONTH,
+        PERIOD_SATURDAY,
+        PERIOD_SUNDAY,
+        PERIOD_THURSDAY,
+        PERIOD_TODAY,
+        PERIOD_TUESDAY,
+        PERIOD_WEDNESDAY,
+        PERIOD_WEEK,
+    )
+    from .intervals import (
+        clipped_seconds,
+        filter_flaps,
+        weekday_averages,
+        zone_intervals,
+    )
+except ImportError:  # Run as a script, outside of Home Assistant
+    from const import (
+        DEFAULT_RETENTION_DAYS,
+        PERIOD_FRIDAY,
+        PERIOD_MONDAY,
+        PERIOD_MONTH,
+        PERIOD_SATURDAY,
+        PERIOD_SUNDAY,
+        PERIOD_THURSDAY,
+        PERIOD_TODAY,
+        PERIOD_TUESDAY,
+        PERIOD_WEDNESDAY,
+        PERIOD_WEEK,
+    )
+    from intervals import (
+        clipped_seconds,
+        filter_flaps,
+        weekday_averages,
+        zone_intervals,
+    )
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+WEEKDAY_PERIODS = [
+    PERIOD_MONDAY,
+    PERIOD_TUESDAY,
+    PERIOD_WEDNESDAY,
+    PERIOD_THURSDAY,
+    PERIOD_FRIDAY,
+    PERIOD_SATURDAY,
+    PERIOD_SUNDAY,
+]
+DEFAULT_CHUNK_SIZE = 10000
+STATE_HOME = "home"
+ZONE_HOME = "zone.home"
+
+
+class RecorderReader:
+    """Stream state rows from a recorder database file."""
+
+    def __init__(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """Open the database read-only."""
+        self._connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self._chunk_size = chunk_size
+        self.rows_read = 0
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def _metadata_id(self, entity_id: str) -> int | None:
+        """Return the recorder's numeric ID of an entity."""
+        row = self._connection.execute(
+            "SELECT metadata_id FROM states_meta WHERE entity_id = ?", (entity_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def persons(self) -> list[str]:
+        """Return every person entity with recorded states."""
+        return [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT entity_id FROM states_meta WHERE entity_id LIKE 'person.%' "
+                "ORDER BY entity_id"
+            )
+        ]
+
+    def zone_names(self, zone_entity_id: str) -> set[str]:
+        """Return every person state that meant the zone, across renames."""
+        # Persons in the home zone are "home", whatever the zone is called
+        if zone_entity_id == ZONE_HOME:
+            return {STATE_HOME}
+        names = {zone_entity_id.replace("zone.", "")}
+        metadata_id = self._metadata_id(zone_entity_id)
+        if metadata_id is None:
+            return names
+        for (shared_attrs,) in self._connection.execute(
+            "SELECT DISTINCT state_attributes.shared_attrs FROM states "
+            "JOIN state_attributes "
+            "ON states.attributes_id = state_attributes.attributes_id "
+            "WHERE states.metadata_id = ?",
+            (metadata_id,),
+        ):
+            if shared_attrs and (name := json.loads(shared_attrs).get("friendly_name")):
+                names.add(name)
+        return names
+
+    def transitions(
+        self, entity_id: str, start: float, end: float
+    ) -> Iterator[tuple[float, str]]:
+        """Yield an entity's state changes in a range, one chunk at a time."""
+        metadata_id = self._metadata_id(entity_id)
+        if metadata_id is None:
+            return
+
+        # The state at the start of the range, like include_start_time_state
+        row = self._connection.execute(
+            "SELECT state FROM states WHERE metadata_id = ? AND last_updated_ts <= ? "
+            "ORDER BY last_updated_ts DESC LIMIT 1",
+            (metadata_id, start),
+        ).fetchone()
+        if row:
+            self.rows_read += 1
+            yield start, row[0]
+
+        # Only state changes, like significant_changes_only for persons
+        cursor = self._connection.execute(
+            "SELECT last_updated_ts, state FROM states "
+            "WHERE metadata_id = ? AND last_updated_ts > ? AND last_updated_ts < ? "
+            "AND (last_changed_ts IS NULL OR last_changed_ts = last_updated_ts) "
+            "ORDER BY last_updated_ts",
+            (metadata_id, start, end),
+        )
+        while rows := cursor.fetchmany(self._chunk_size):
+            self.rows_read += len(rows)
+            yield from rows
+
+
+def period_starts(day: date, timezone: tzinfo) -> dict[str, datetime]:
+    """Return the start of each standard period containing a day."""
+    return {
+        PERIOD_TODAY: datetime.combine(day, datetime.min.time(), timezone),
+        PERIOD_WEEK: datetime.combine(
+            day - timedelta(days=day.weekday()), datetime.min.time(), timezone
+        ),
+        PERIOD_MONTH: datetime.combine(
+            day.replace(day=1), datetime.min.time(), timezone
+        ),
+    }
+
+
+def replay(
+    reader: RecorderReader,
+    person: str,
+    zones: list[str],
+    day: date,
+    timezone: tzinfo,
+    min_dwell: float = 0,
+    merge_gap: float = 0,
+    average_days: int = DEFAULT_RETENTION_DAYS,
+) -> dict[str, dict[str, float]]:
+    """Compute the coordinator's metrics for a person as of the end of a day."""
+    starts = period_starts(day, timezone)
+    end = min(starts[PERIOD_TODAY] + timedelta(days=1), datetime.now(timezone))
+    end_ts = end.timestamp()
+    # Map every name a zone had to its entity ID, like the integration does
+    aliases = {name: zone for zone in zones for name in reader.zone_names(zone)}
+
+    def filtered(stream: Iterable[tuple[float, str]]) -> list[tuple[float, str]]:
+        resolved = (
+            (timestamp, aliases.get(state, state)) for timestamp, state in stream
+        )
+        if not min_dwell and not merge_gap:
+            return list(resolved)
+        return list(filter_flaps(resolved, min_dwell, merge_gap, end_ts))
+
+    window_start = min(starts.values()).timestamp()
+    transitions = filtered(reader.transitions(person, window_start, end_ts))
+    results: dict[str, dict[str, float]] = {}
+    for zone in zones:
+        intervals = zone_intervals(transitions, zone, window_start, end_ts)
+        results[zone] = {
+            period: round(
+                clipped_seconds(intervals, start.timestamp(), end_ts) / 3600, 2
+            )
+            for period, start in starts.items()
+        }
+
+    if average_days > 0:
+        transitions = filtered(
+            reader.transitions(
+                person, (end - timedelta(days=average_days)).timestamp(), end_ts
+            )
+        )
+        for zone in zones:
+            averages = weekday_averages(transitions, zone, day, timezone)
+            results[zone].update(
+                {WEEKDAY_PERIODS[weekday]: hours for weekday, hours in averages.items()}
+            )
+
+    return results
+
+
+def _write_results(
+    results: dict[str, dict[str, dict[str, float]]], output_format: str, file: Any
+) -> None:
+    """Write replay results in the requested format."""
+    if output_format == "json":
+        json.dump(results, file, indent=2)
+        file.write("\n")
+        return
+
+    if output_format == "csv":
+        writer = csv.writer(file)
+        writer.writerow(["person", "zone", "period", "hours"])
+        for person, zones in results.items():
+            for zone, periods in zones.items():
+                for period, hours in periods.items():
+                    writer.writerow([person, zone, period, hours])
+        return
+
+    for person, zones in results.items():
+        for zone, periods in zones.items():
+            file.write(f"{person} in {zone}\n")
+            for period, hours in periods.items():
+                file.write(f"  {period:<10} {hours:>8.2f} h\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the replay command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("database", help="path to a copy of home-assistant_v2.db")
+    parser.add_argument(
+        "--zone", action="append", required=True, help="zone entity ID, repeatable"
+    )
+    parser.add_argument(
+        "--person",
+        action="append",
+        help="person entity ID, repeatable (default: every person in the database)",
+    )
+    parser.add_argument(
+        "--date",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="day to report on, YYYY-MM-DD (default: today)",
+    )
+    parser.add_argument(
+        "--time-zone", help="IANA time zone of the install (default: system zone)"
+    )
+    parser.add_argument("--min-dwell", type=float, default=0, help="minutes")
+    parser.add_argument("--merge-gap", type=float, default=0, help="minutes")
+    parser.add_argument(
+        "--average-days",
+        type=int,
+        default=DEFAULT_RETENTION_DAYS,
+        help="days of history for weekday averages, 0 to skip",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--format", choices=["text", "json", "csv"], default="text")
+    parser.add_argument("--output", help="file to write instead of stdout")
+    args = parser.parse_args(argv)
+
+    timezone = (
+        ZoneInfo(args.time_zone)
+        if args.time_zone
+        else datetime.now().astimezone().tzinfo
+    )
+    reader = RecorderReader(args.database, args.chunk_size)
+    started = time.perf_counter()
+    try:
+        results = {
+            person: replay(
+                reader,
+                person,
+                args.zone,
+                args.date,
+                timezone,
+                args.min_dwell * 60,
+                args.merge_gap * 60,
+                args.average_days,
+            )
+            for person in args.person or reader.persons()
+        }
+    finally:
+        reader.close()
+    elapsed = time.perf_counter() - started
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as file:
+            _write_results(results, args.format, file)
+    else:
+        _write_results(results, args.format, sys.stdout)
+    print(
+        f"Processed {reader.rows_read} state rows in {elapsed:.2f} s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Domain-wide refresh scheduler for p2z_tracker."""
+
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
+
+from .const import (
+    DEFAULT_MAX_CONCURRENT_REFRESHES,
+    DEFAULT_UPDATE_INTERVAL,
+    DOMAIN,
+    LOGGER,
+    PRIORITY_REFRESH_DELAY,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> RefreshScheduler:
+    """Return the scheduler shared by all config entries."""
+    if DATA_SCHEDULER not in hass.data:
+        hass.data[DATA_SCHEDULER] = RefreshScheduler(
+            hass, DEFAULT_UPDATE_INTERVAL, DEFAULT_MAX_CONCURRENT_REFRESHES
+        )
+    return hass.data[DATA_SCHEDULER]
+
+
+class RefreshScheduler:
+    """Spread coordinator refreshes evenly across the update interval."""
+
+    def __init__(
+        self, hass: HomeAssistant, interval: float, max_concurrent: int
+    ) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._interval = interval
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._coordinators: dict[str, DataUpdateCoordinator[Any]] = {}
+        # Each entry refreshes at its own offset into the interval
+        self._offsets: dict[str, float] = {}
+        self._due: dict[str, float] = {}
+        self._priority: set[str] = set()
+        self._running: set[str] = set()
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._unsub_state: dict[str, CALLBACK_TYPE] = {}
+
+    @property
+    def busy(self) -> bool:
+        """Return whether any scheduled refresh is running."""
+        return bool(self._running)
+
+    async def async_run_limited(self, job: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a refresh job within the concurrency limit."""
+        async with self._semaphore:
+            return await job()
+
+    @callback
+    def async_register(
+        self,
+        entry_id: str,
+        coordinator: DataUpdateCoordinator[Any],
+        person_entity: str | None = None,
+    ) -> CALLBACK_TYPE:
+        """Start scheduling refreshes for a coordinator."""
+        self._coordinators[entry_id] = coordinator
+        if person_entity is not None:
+            self._unsub_state[entry_id] = async_track_state_change_event(
+                self._hass,
+                [person_entity],
+                partial(self._async_handle_person_change, entry_id),
+            )
+        self._restagger()
+        return partial(self._async_unregister, entry_id)
+
+    @callback
+    def _async_unregister(self, entry_id: str) -> None:
+        """Stop scheduling refreshes for a coordinator."""
+        self._coordinators.pop(entry_id, None)
+        self._due.pop(entry_id, None)
+        self._priority.discard(entry_id)
+        if unsub := self._unsub_state.pop(entry_id, None):
+            unsub()
+        self._restagger()
+
+    @callback
+    def _restagger(self) -> None:
+        """Give every coordinator an evenly spaced slot in the interval."""
+        count = len(self._coordinators)
+        now = self._hass.loop.time()
+        self._offsets = {
+            entry_id: self._interval * index / count
+            for index, entry_id in enumerate(sorted(self._coordinators))
+        }
+        for entry_id in self._coordinators:
+            self._due[entry_id] = self._next_slot(entry_id, now)
+        self._schedule()
+
+    def _next_slot(self, entry_id: str, now: float) -> float:
+        """Return the next time after now that falls on the entry's slot."""
+        wait = (self._offsets[entry_id] - now) % self._interval
+        # Don't refresh twice in a row when a priority refresh just ran
+        if wait < self._interval / 2 and entry_id in self._running:
+            wait += self._interval
+        return now + (wait or self._interval)
+
+    @callback
+    def _schedule(self) -> None:
+        """Arm a single timer for the earliest due refresh."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if not self._due:
+            return
+        delay = min(self._due.values()) - self._hass.loop.time()
+        self._unsub_timer = async_call_later(
+            self._hass, max(delay, 0), self._async_handle_timer
+        )
+
+    @callback
+    def _async_handle_timer(self, _now: Any) -> None:
+        """Start every refresh that is due."""
+        self._unsub_timer = None
+        now = self._hass.loop.time()
+        due = [
+            entry_id
+            for entry_id, due_time in self._due.items()
+            if due_time <= now and entry_id not in self._running
+        ]
+        # Entries whose person recently changed state go first
+        due.sort(
+            key=lambda entry_id: (entry_id not in self._priority, self._due[entry_id])
+        )
+        for entry_id in due:
+            self._running.add(entry_id)
+            self._due[entry_id] = self._next_slot(entry_id, now)
+            self._hass.async_create_background_task(
+                self._async_refresh(entry_id), f"{DOMAIN} refresh {entry_id}"
+            )
+        self._schedule()
+
+    async def _async_refresh(self, entry_id: str) -> None:
+        """Refresh a coordinator within the concurrency limit."""
+        try:
+            async with self._semaphore:
+                self._priority.discard(entry_id)
+                if (coordinator := self._coordinators.get(entry_id)) is not None:
+                    await coordinator.async_refresh()
+        finally:
+            self._running.discard(entry_id)
+
+    @callback
+    def _async_handle_person_change(self, entry_id: str, event: Event) -> None:
+        """Move an entry up the queue when its person changes zone."""
+        old_state = event.data["old_state"]
+        new_state = event.data["new_state"]
+        if (
+            entry_id not in self._due
+            or new_state is None
+            or (old_state is not None and old_state.state == new_state.state)
+        ):
+            return
+
+        LOGGER.debug("Prioritizing refresh of %s after zone change", entry_id)
+        self._priority.add(entry_id)
+        soon = self._hass.loop.time() + PRIORITY_REFRESH_DELAY
+        if self._due[entry_id] > soon:
+            self._due[entry_id] = soon
+            self._schedule()
@@ -0,0 +1,196 @@
+"""Per-zone selection of the values p2z_tracker exposes."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from homeassistant.util import slugify
+
+from .const import (
+    AWAY,
+    CONF_ENABLE_AVERAGES,
+    CONF_ENABLE_AWAY,
+    CONF_ENTRY_TYPE,
+    CONF_HOUSEHOLD_NAME,
+    CONF_PERIODS,
+    CONF_PERSON_ENTITY,
+    CONF_DAILY_QUANTILES,
+    CONF_ROLLING_WINDOWS,
+    CONF_TRACKED_ZONES,
+    CONF_VISIT_METRICS,
+    CONF_WEEKDAYS,
+    CONF_ZONE_NAME,
+    DAILY_QUANTILES,
+    DOMAIN,
+    ENTRY_TYPE_HOUSEHOLD,
+    METRIC_CURRENT_STAY,
+    METRIC_FIRST_ARRIVAL,
+    METRIC_LAST_DEPARTURE,
+    METRIC_LONGEST_STAY,
+    METRIC_VISITS,
+    OCCUPANCY_ALL,
+    OCCUPANCY_ANY,
+    PERIOD_FRIDAY,
+    PERIOD_MONDAY,
+    PERIOD_MONTH,
+    PERIOD_SATURDAY,
+    PERIOD_SUNDAY,
+    PERIOD_THURSDAY,
+    PERIOD_TODAY,
+    PERIOD_TUESDAY,
+    PERIOD_WEDNESDAY,
+    PERIOD_WEEK,
+)
+
+if TYPE_CHECKING:
+    from .data import P2ZTrackerConfigEntry
+
+PERIODS = [PERIOD_TODAY, PERIOD_WEEK, PERIOD_MONTH]
+WEEKDAY_PERIODS = [
+    PERIOD_MONDAY,
+    PERIOD_TUESDAY,
+    PERIOD_WEDNESDAY,
+    PERIOD_THURSDAY,
+    PERIOD_FRIDAY,
+    PERIOD_SATURDAY,
+    PERIOD_SUNDAY,
+]
+OCCUPANCY_MODES = [OCCUPANCY_ANY, OCCUPANCY_ALL]
+# Reported per selected period, the current stay has none
+VISIT_METRICS = [
+    METRIC_VISITS,
+    METRIC_LONGEST_STAY,
+    METRIC_FIRST_ARRIVAL,
+    METRIC_LAST_DEPARTURE,
+    METRIC_CURRENT_STAY,
+]
+
+
+class ZoneSelection(NamedTuple):
+    """The periods and metrics a zone's sensors expose."""
+
+    periods: list[str]
+    rolling_windows: list[str]
+    weekdays: list[str]  # weekday averages, empty when averages are off
+    visit_metrics: list[str]
+    daily_quantiles: list[str]
+
+    @property
+    def keys(self) -> list[str]:
+        """Return the coordinator data keys of everything selected."""
+        return [
+            *self.periods,
+            *self.rolling_windows,
+            *self.weekdays,
+            *self.visit_keys,
+            *self.daily_quantiles,
+        ]
+
+    @property
+    def visit_keys(self) -> list[str]:
+        """Return the coordinator data keys of the selected visit metrics."""
+        keys = []
+        for metric in self.visit_metrics:
+            if metric == METRIC_CURRENT_STAY:
+                keys.append(metric)
+            else:
+                keys.extend(f"{metric}_{period}" for period in self.periods)
+        return keys
+
+
+def zone_selection(zone_config: dict[str, Any]) -> ZoneSelection:
+    """Return what a tracked zone exposes, everything when nothing was picked."""
+    periods = zone_config.get(CONF_PERIODS, PERIODS)
+    weekdays = zone_config.get(CONF_WEEKDAYS, WEEKDAY_PERIODS)
+    visit_metrics = zone_config.get(CONF_VISIT_METRICS, [])
+    # Listed in the canonical order, whatever order they were picked in
+    return ZoneSelection(
+        periods=[period for period in PERIODS if period in periods],
+        rolling_windows=zone_config.get(CONF_ROLLING_WINDOWS, []),
+        weekdays=(
+            [period for period in WEEKDAY_PERIODS if period in weekdays]
+            if zone_config.get(CONF_ENABLE_AVERAGES, False)
+            else []
+        ),
+        visit_metrics=[metric for metric in VISIT_METRICS if metric in visit_metrics],
+        daily_quantiles=[
+            metric
+            for metric in DAILY_QUANTILES
+            if metric in zone_config.get(CONF_DAILY_QUANTILES, [])
+        ],
+    )
+
+
+def zone_slug(zone_entity_id: str) -> str:
+    """Return the slug of a zone used in unique IDs."""
+    return slugify(zone_entity_id.replace("zone.", ""))
+
+
+def expected_unique_ids(entry: P2ZTrackerConfigEntry) -> set[str]:
+    """Return the unique IDs of the sensors an entry creates."""
+    tracked_zones = entry.options.get(CONF_TRACKED_ZONES, [])
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_HOUSEHOLD:
+        household_slug = slugify(entry.data[CONF_HOUSEHOLD_NAME])
+        return {
+            f"p2z_{household_slug}_{zone_slug(zone_config[CONF_ZONE_NAME])}"
+            f"_{mode}_{period}"
+            for zone_config in tracked_zones
+            for mode in OCCUPANCY_MODES
+            for period in zone_selection(zone_config).periods
+        }
+
+    person_name = entry.data[CONF_PERSON_ENTITY].replace("person.", "")
+    unique_ids = set()
+    for zone_config in tracked_zones:
+        selection = zone_selection(zone_config)
+        prefix = f"p2z_{person_name}_{zone_slug(zone_config[CONF_ZONE_NAME])}"
+        unique_ids.update(
+            f"{prefix}_{key}"
+            for key in (
+                *selection.periods,
+                *selection.rolling_windows,
+                *(f"{period}_avg" for period in selection.weekdays),
+                *selection.visit_keys,
+                *selection.daily_quantiles,
+            )
+        )
+    if entry.options.get(CONF_ENABLE_AWAY, False):
+        unique_ids.update(f"p2z_{person_name}_{AWAY}_{period}" for period in PERIODS)
+    return unique_ids
+
+
+def totals_keys(entry: P2ZTrackerConfigEntry) -> list[tuple[str, str]]:
+    """Return the (zone, key) pairs of the values an entry's refreshes produce."""
+    tracked_zones = entry.options.get(CONF_TRACKED_ZONES, [])
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_HOUSEHOLD:
+        return [
+            (zone_config[CONF_ZONE_NAME], f"{mode}_{period}")
+            for zone_config in tracked_zones
+            for mode in OCCUPANCY_MODES
+            for period in zone_selection(zone_config).periods
+        ]
+
+    keys = [
+        (zone_config[CONF_ZONE_NAME], key)
+        for zone_config in tracked_zones
+        for key in zone_selection(zone_config).keys
+    ]
+    if entry.options.get(CONF_ENABLE_AWAY, False):
+        keys.extend((AWAY, period) for period in PERIODS)
+    return keys
+
+
+def expected_device_identifiers(entry: P2ZTrackerConfigEntry) -> set[tuple[str, str]]:
+    """Return the identifiers of the devices an entry's sensors belong to."""
+    tracked_zones = entry.options.get(CONF_TRACKED_ZONES, [])
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_HOUSEHOLD:
+        owner = slugify(entry.data[CONF_HOUSEHOLD_NAME])
+    else:
+        owner = entry.data[CONF_PERSON_ENTITY]
+    identifiers = {
+        (DOMAIN, f"{owner}_{zone_slug(zone_config[CONF_ZONE_NAME])}")
+        for zone_config in tracked_zones
+    }
+    if entry.options.get(CONF_ENABLE_AWAY, False):
+        identifiers.add((DOMAIN, f"{owner}_{AWAY}"))
+    return identifiers
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -13,51 +13,46 @@ from homeassistant.const import UnitOfTime
 from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 from homeassistant.util import slugify
 
 from .const import (
     ATTR_BACKFILLED,
+    ATTR_DAYS,
     ATTR_LAST_UPDATED,
+    ATTR_MEMBERS,
     ATTR_PERIOD,
     ATTR_PERSON_ENTITY,
     ATTR_ZONE_NAME,
+    AWAY,
     CONF_DISPLAY_NAME,
-    CONF_ENABLE_AVERAGES,
+    CONF_ENABLE_AWAY,
     CONF_ENABLE_BACKFILL,
+    CONF_ENTRY_TYPE,
+    CONF_HOUSEHOLD_NAME,
+    CONF_MEMBERS,
     CONF_PERSON_ENTITY,
     CONF_TRACKED_ZONES,
     CONF_ZONE_NAME,
     DOMAIN,
-    PERIOD_MONTH,
-    PERIOD_TODAY,
-    PERIOD_WEEK,
-    PERIOD_MONDAY,
-    PERIOD_TUESDAY,
-    PERIOD_WEDNESDAY,
-    PERIOD_THURSDAY,
-    PERIOD_FRIDAY,
-    PERIOD_SATURDAY,
-    PERIOD_SUNDAY,
+    ENTRY_TYPE_HOUSEHOLD,
+    METRIC_CURRENT_STAY,
+    METRIC_FIRST_ARRIVAL,
+    METRIC_LAST_DEPARTURE,
+    METRIC_VISITS,
+    OCCUPANCY_ANY,
+    ROLLING_WINDOW_SECONDS,
 )
 from .coordinator import P2ZDataUpdateCoordinator
+from .household import P2ZHouseholdCoordinator
+from .selection import OCCUPANCY_MODES, PERIODS, WEEKDAY_PERIODS, zone_selection
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
     from .data import P2ZTrackerConfigEntry
-
-
-PERIODS = [PERIOD_TODAY, PERIOD_WEEK, PERIOD_MONTH]
-WEEKDAY_PERIODS = [
-    PERIOD_MONDAY,
-    PERIOD_TUESDAY,
-    PERIOD_WEDNESDAY,
-    PERIOD_THURSDAY,
-    PERIOD_FRIDAY,
-    PERIOD_SATURDAY,
-    PERIOD_SUNDAY,
-]
+    from .totals import Totals
 
 
 async def async_setup_entry(
@@ -66,6 +61,10 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the sensor platform."""
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_HOUSEHOLD:
+        _async_setup_household_sensors(entry, async_add_entities)
+        return
+
     coordinator = entry.runtime_data.coordinator
     person_entity = entry.data[CONF_PERSON_ENTITY]
     tracked_zones = entry.options.get(CONF_TRACKED_ZONES, [])
@@ -86,12 +85,12 @@ async def async_setup_entry(
         if not display_name:
             display_name = zone_name
         backfilled = zone_config.get(CONF_ENABLE_BACKFILL, False)
-        enable_averages = zone_config.get(CONF_ENABLE_AVERAGES, False)
+        selection = zone_selection(zone_config)
 
         LOGGER.debug("Creating sensors for zone: %s", zone_name)
 
-        # Create standard sensors (today, week, month)
-        for period in PERIODS:
+        # Create standard sensors for the selected periods (today, week, month)
+        for period in selection.periods:
             sensors.append(
                 ZoneTimeSensor(
                     coordinator=coordinator,
@@ -104,26 +103,168 @@ async def async_setup_entry(
                 )
             )
 
-        # Create average sensors if enabled
-        if enable_averages:
-            for period in WEEKDAY_PERIODS:
-                sensors.append(
-                    ZoneTimeSensor(
-                        coordinator=coordinator,
-                        person_entity=person_entity,
-                        zone_entity_id=zone_name,
-                        display_name=display_name,
-                        period=period,
-                        backfilled=backfilled,
-                        is_average=True,
-                    )
+        # Create rolling window sensors
+        for period in selection.rolling_windows:
+            sensors.append(
+                ZoneTimeSensor(
+                    coordinator=coordinator,
+                    person_entity=person_entity,
+                    zone_entity_id=zone_name,
+                    display_name=display_name,
+                    period=period,
+                    backfilled=backfilled,
+                    is_average=False,
                 )
+            )
+
+        # Create average sensors for the selected weekdays if enabled
+        for period in selection.weekdays:
+            sensors.append(
+                ZoneTimeSensor(
+                    coordinator=coordinator,
+                    person_entity=person_entity,
+                    zone_entity_id=zone_name,
+                    display_name=display_name,
+                    period=period,
+                    backfilled=backfilled,
+                    is_average=True,
+                )
+            )
+
+        # Create the selected visit metric sensors
+        for metric in selection.visit_metrics:
+            sensors.extend(
+                ZoneVisitSensor(
+                    coordinator=coordinator,
+                    person_entity=person_entity,
+                    zone_entity_id=zone_name,
+                    display_name=display_name,
+                    metric=metric,
+                    period=period,
+                )
+                for period in (
+                    selection.periods if metric != METRIC_CURRENT_STAY else [None]
+                )
+            )
+
+        # Create the selected quantiles of the time per day
+        sensors.extend(
+            ZoneQuantileSensor(
+                coordinator=coordinator,
+                person_entity=person_entity,
+                zone_entity_id=zone_name,
+                display_name=display_name,
+                metric=metric,
+            )
+            for metric in selection.daily_quantiles
+        )
+
+    # Create away sensors if enabled
+    if entry.options.get(CONF_ENABLE_AWAY, False):
+        sensors.extend(
+            AwaySensor(
+                coordinator=coordinator,
+                person_entity=person_entity,
+                period=period,
+            )
+            for period in PERIODS
+        )
 
     LOGGER.info("Adding %d sensors to Home Assistant", len(sensors))
     async_add_entities(sensors)
 
 
-class ZoneTimeSensor(CoordinatorEntity[P2ZDataUpdateCoordinator], SensorEntity):
+def _async_setup_household_sensors(
+    entry: P2ZTrackerConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the combined occupancy sensors of a household."""
+    coordinator = entry.runtime_data.coordinator
+    household_name = entry.data[CONF_HOUSEHOLD_NAME]
+    members = entry.data[CONF_MEMBERS]
+
+    sensors = [
+        HouseholdZoneSensor(
+            coordinator=coordinator,
+            household_name=household_name,
+            members=members,
+            zone_entity_id=zone_config[CONF_ZONE_NAME],
+            display_name=zone_config.get(CONF_DISPLAY_NAME)
+            or zone_config[CONF_ZONE_NAME],
+            mode=mode,
+            period=period,
+        )
+        for zone_config in entry.options.get(CONF_TRACKED_ZONES, [])
+        for mode in OCCUPANCY_MODES
+        for period in zone_selection(zone_config).periods
+    ]
+    async_add_entities(sensors)
+
+
+class SlotSensor(CoordinatorEntity[P2ZDataUpdateCoordinator], SensorEntity):
+    """Sensor showing one slot of its coordinator's refresh results.
+
+    The value and attributes are only set again when the slot changed, so a
+    refresh writes the states of the sensors whose values changed and leaves
+    the others alone.
+    """
+
+    def __init__(
+        self,
+        coordinator: P2ZDataUpdateCoordinator | P2ZHouseholdCoordinator,
+        zone: str,
+        key: str,
+        attributes: dict[str, Any],
+    ) -> None:
+        """Initialize the sensor with its slot and its fixed attributes."""
+        super().__init__(coordinator)
+        self._slot = coordinator.layout.slot(zone, key)
+        self._static_attributes = attributes
+        self._totals: Totals | None = None
+        self._written_available: bool | None = None
+        self._set_state()
+
+    def _convert(self, value: Any) -> Any:
+        """Return the native value of a slot's value."""
+        return value
+
+    def _dynamic_attributes(self) -> dict[str, Any]:
+        """Return the attributes that change with the value."""
+        last_updated = self.coordinator.last_update_success_time
+        return {ATTR_LAST_UPDATED: last_updated.isoformat() if last_updated else None}
+
+    def _slot_changed(self, totals: Totals) -> bool:
+        """Return whether a refresh changed what the sensor shows."""
+        return self._slot in totals.changed
+
+    def _set_state(self) -> None:
+        """Set the value and attributes from the current refresh results."""
+        totals = self.coordinator.data
+        self._totals = totals
+        self._attr_native_value = (
+            self._convert(totals[self._slot]) if totals is not None else None
+        )
+        self._attr_extra_state_attributes = {
+            **self._static_attributes,
+            **self._dynamic_attributes(),
+        }
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if the sensor's slot or availability changed."""
+        totals = self.coordinator.data
+        available = self.available
+        if available == self._written_available and (
+            totals is None or totals is self._totals or not self._slot_changed(totals)
+        ):
+            self._totals = totals
+            return
+        self._set_state()
+        self._written_available = available
+        self.async_write_ha_state()
+
+
+class ZoneTimeSensor(SlotSensor):
     """Sensor tracking time spent in a zone."""
 
     _attr_device_class = SensorDeviceClass.DURATION
@@ -141,14 +282,22 @@ class ZoneTimeSensor(CoordinatorEntity[P2ZDataUpdateCoordinator], SensorEntity):
         is_average: bool = False,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        # Weekday averages are pre-calculated in the coordinator
+        super().__init__(
+            coordinator,
+            zone_entity_id,
+            period,
+            {
+                ATTR_ZONE_NAME: display_name or zone_entity_id,
+                ATTR_PERSON_ENTITY: person_entity,
+                ATTR_PERIOD: period,
+                ATTR_BACKFILLED: backfilled,
+            },
+        )
 
-        self._person_entity = person_entity
-        self._zone_entity_id = zone_entity_id
-        self._display_name = display_name
-        self._period = period
-        self._backfilled = backfilled
-        self._is_average = is_average
+        # Rolling totals drop as old time leaves the window
+        if period in ROLLING_WINDOW_SECONDS:
+            self._attr_state_class = SensorStateClass.MEASUREMENT
 
         # Generate entity ID
         person_name = person_entity.replace("person.", "")
@@ -158,14 +307,11 @@ class ZoneTimeSensor(CoordinatorEntity[P2ZDataUpdateCoordinator], SensorEntity):
         self.entity_id = f"sensor.p2z_{person_name}_{zone_slug}_{period}{avg_suffix}"
 
         # Format period name for display
-        period_name = self._period.replace("_", " ").title()
-
-        if self._period in WEEKDAY_PERIODS:
-            period_name = f"{period_name} Average"
-        elif self._is_average:
+        period_name = period.replace("_", " ").title()
+        if period in WEEKDAY_PERIODS or is_average:
             period_name = f"{period_name} Average"
 
-        self._attr_name = f"{self._display_name} {period_name}"
+        self._attr_name = f"{display_name} {period_name}"
 
         # Set device info to group sensors for this zone under one device
         self._attr_device_info = DeviceInfo(
@@ -176,55 +322,213 @@ class ZoneTimeSensor(CoordinatorEntity[P2ZDataUpdateCoordinator], SensorEntity):
             entry_type=None,
         )
 
-    @property
-    def native_value(self) -> float | None:
-        """Return the state of the sensor."""
-        if not self.coordinator.data:
-            return None
-
-        zone_data = self.coordinator.data.get(self._zone_entity_id)
-        if not zone_data:
-            return None
-
-        total_hours = zone_data.get(self._period, 0.0)
-
-        # If this is an average sensor, calculate daily average
-        if self._is_average:
-            from homeassistant.util import dt as dt_util
-
-            now = dt_util.now()
-
-            if self._period == PERIOD_TODAY:
-                # Today average is just the total (1 day)
-                return total_hours
-            elif self._period == PERIOD_WEEK:
-                # Days elapsed this week (Monday = 0)
-                days_elapsed = now.weekday() + 1
-                return round(total_hours / days_elapsed, 2) if days_elapsed > 0 else 0.0
-            elif self._period == PERIOD_MONTH:
-                # Days elapsed this month
-                days_elapsed = now.day
-                return round(total_hours / days_elapsed, 2) if days_elapsed > 0 else 0.0
-            elif self._period in WEEKDAY_PERIODS:
-                # Weekday averages are pre-calculated in coordinator
-                return total_hours
-
-        return total_hours
-
-    @property
-    def extra_state_attributes(self) -> dict[str, str]:
-        """Return additional attributes."""
+
+class ZoneVisitSensor(SlotSensor):
+    """Sensor reporting a visit statistic of a zone."""
+
+    def __init__(
+        self,
+        coordinator: P2ZDataUpdateCoordinator,
+        person_entity: str,
+        zone_entity_id: str,
+        display_name: str,
+        metric: str,
+        period: str | None,
+    ) -> None:
+        """Initialize the sensor."""
+        # The current stay has no period, the others are keyed per period
+        key = f"{metric}_{period}" if period else metric
+        self._is_timestamp = metric in (METRIC_FIRST_ARRIVAL, METRIC_LAST_DEPARTURE)
+        super().__init__(
+            coordinator,
+            zone_entity_id,
+            key,
+            {
+                ATTR_ZONE_NAME: display_name or zone_entity_id,
+                ATTR_PERSON_ENTITY: person_entity,
+                ATTR_PERIOD: period,
+            },
+        )
+
+        if metric == METRIC_VISITS:
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        elif self._is_timestamp:
+            self._attr_device_class = SensorDeviceClass.TIMESTAMP
+        else:
+            self._attr_device_class = SensorDeviceClass.DURATION
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+            self._attr_native_unit_of_measurement = UnitOfTime.HOURS
+
+        person_name = person_entity.replace("person.", "")
+        zone_slug = slugify(zone_entity_id.replace("zone.", ""))
+        self._attr_unique_id = f"p2z_{person_name}_{zone_slug}_{key}"
+        self.entity_id = f"sensor.p2z_{person_name}_{zone_slug}_{key}"
+
+        metric_name = metric.replace("_", " ").title()
+        self._attr_name = (
+            f"{display_name} {metric_name} {period.title()}"
+            if period
+            else f"{display_name} {metric_name}"
+        )
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{person_entity}_{zone_slug}")},
+            name=f"{display_name} Tracking",
+            manufacturer="Person Zone Time Tracker",
+            model="Zone Time Tracking",
+            entry_type=None,
+        )
+
+    def _convert(self, value: Any) -> Any:
+        """Return arrival and departure times as datetimes."""
+        if self._is_timestamp and value is not None:
+            return dt_util.utc_from_timestamp(value)
+        return value
+
+
+class ZoneQuantileSensor(SlotSensor):
+    """Sensor reporting a quantile of the time per day spent in a zone."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.HOURS
+
+    def __init__(
+        self,
+        coordinator: P2ZDataUpdateCoordinator,
+        person_entity: str,
+        zone_entity_id: str,
+        display_name: str,
+        metric: str,
+    ) -> None:
+        """Initialize the sensor."""
+        self._zone_entity_id = zone_entity_id
+        self._metric = metric
+        self._weekdays: dict[str, float | None] = {}
+        super().__init__(
+            coordinator,
+            zone_entity_id,
+            metric,
+            {
+                ATTR_ZONE_NAME: display_name or zone_entity_id,
+                ATTR_PERSON_ENTITY: person_entity,
+            },
+        )
+
+        person_name = person_entity.replace("person.", "")
+        zone_slug = slugify(zone_entity_id.replace("zone.", ""))
+        self._attr_unique_id = f"p2z_{person_name}_{zone_slug}_{metric}"
+        self.entity_id = f"sensor.p2z_{person_name}_{zone_slug}_{metric}"
+        self._attr_name = f"{display_name} {metric.replace('_', ' ').title()}"
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{person_entity}_{zone_slug}")},
+            name=f"{display_name} Tracking",
+            manufacturer="Person Zone Time Tracker",
+            model="Zone Time Tracking",
+            entry_type=None,
+        )
+
+    def _current_weekdays(self) -> dict[str, float | None]:
+        """Return the quantile per weekday from the last refresh."""
+        return self.coordinator.weekday_quantiles.get(self._zone_entity_id, {}).get(
+            self._metric, {}
+        )
+
+    def _slot_changed(self, totals: Totals) -> bool:
+        """Return whether the quantile of all days or of a weekday changed."""
+        return super()._slot_changed(totals) or (
+            self._current_weekdays() != self._weekdays
+        )
+
+    def _dynamic_attributes(self) -> dict[str, Any]:
+        """Return the number of days and the quantile per weekday."""
+        self._weekdays = self._current_weekdays()
         return {
-            ATTR_ZONE_NAME: self._display_name or self._zone_entity_id,
-            ATTR_PERSON_ENTITY: self._person_entity,
-            ATTR_PERIOD: self._period,
-            ATTR_BACKFILLED: self._backfilled,
-            ATTR_LAST_UPDATED: self.coordinator.last_update_success_time.isoformat()
-            if self.coordinator.last_update_success_time
-            else None,
+            ATTR_DAYS: self.coordinator.store.sketch(self._zone_entity_id).days,
+            # The same quantile per weekday
+            **self._weekdays,
+            **super()._dynamic_attributes(),
         }
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self.async_write_ha_state()
+
+class AwaySensor(SlotSensor):
+    """Sensor tracking time spent outside every tracked zone."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_native_unit_of_measurement = UnitOfTime.HOURS
+
+    def __init__(
+        self,
+        coordinator: P2ZDataUpdateCoordinator,
+        person_entity: str,
+        period: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(
+            coordinator,
+            AWAY,
+            period,
+            {ATTR_PERSON_ENTITY: person_entity, ATTR_PERIOD: period},
+        )
+
+        person_name = person_entity.replace("person.", "")
+        self._attr_unique_id = f"p2z_{person_name}_{AWAY}_{period}"
+        self.entity_id = f"sensor.p2z_{person_name}_{AWAY}_{period}"
+        self._attr_name = f"Away {period.title()}"
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{person_entity}_{AWAY}")},
+            name="Away Tracking",
+            manufacturer="Person Zone Time Tracker",
+            model="Away Time Tracking",
+            entry_type=None,
+        )
+
+
+class HouseholdZoneSensor(SlotSensor):
+    """Sensor tracking combined household time spent in a zone."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_native_unit_of_measurement = UnitOfTime.HOURS
+
+    def __init__(
+        self,
+        coordinator: P2ZHouseholdCoordinator,
+        household_name: str,
+        members: list[str],
+        zone_entity_id: str,
+        display_name: str,
+        mode: str,
+        period: str,
+    ) -> None:
+        """Initialize the sensor."""
+        key = f"{mode}_{period}"
+        super().__init__(
+            coordinator,
+            zone_entity_id,
+            key,
+            {
+                ATTR_ZONE_NAME: display_name,
+                ATTR_MEMBERS: members,
+                ATTR_PERIOD: period,
+            },
+        )
+
+        household_slug = slugify(household_name)
+        zone_slug = slugify(zone_entity_id.replace("zone.", ""))
+        self._attr_unique_id = f"p2z_{household_slug}_{zone_slug}_{key}"
+        self.entity_id = f"sensor.p2z_{household_slug}_{zone_slug}_{key}"
+
+        who = "Anyone" if mode == OCCUPANCY_ANY else "Everyone"
+        self._attr_name = f"{display_name} {who} {period.title()}"
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{household_slug}_{zone_slug}")},
+            name=f"{household_name} {display_name} Tracking",
+            manufacturer="Person Zone Time Tracker",
+            model="Household Zone Time Tracking",
+            entry_type=None,
+        )
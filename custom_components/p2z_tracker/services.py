@@ -0,0 +1,355 @@
+"""Services for p2z_tracker."""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+from xml.etree import ElementTree
+
+import voluptuous as vol
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_END,
+    ATTR_FILENAME,
+    ATTR_FORMAT,
+    ATTR_PERSON_ENTITY,
+    ATTR_RUNS,
+    ATTR_START,
+    ATTR_ZONES,
+    CONF_PERSON_ENTITY,
+    DOMAIN,
+    EXPORT_CHUNK_DAYS,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_JSONL,
+    LOGGER,
+    SERVICE_EXPORT_INTERVALS,
+    SERVICE_IMPORT_HISTORY,
+    SERVICE_PROFILE,
+)
+from .coordinator import P2ZDataUpdateCoordinator
+from .importer import IMPORT_FORMATS, detect_format
+from .intervals import iter_stays
+from .profiler import RefreshProfiler
+from .zones import async_get_zone_resolver
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from .zones import ZoneResolver
+
+EXPORT_FIELDS = ["person", "zone", "start", "end", "duration_hours"]
+_CHUNK_OVERLAP = timedelta(seconds=1)
+
+EXPORT_INTERVALS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_PERSON_ENTITY): cv.entity_ids,
+        vol.Optional(ATTR_ZONES): cv.entity_ids,
+        vol.Optional(ATTR_FORMAT, default=EXPORT_FORMAT_CSV): vol.In(
+            [EXPORT_FORMAT_CSV, EXPORT_FORMAT_JSONL]
+        ),
+        vol.Optional(ATTR_FILENAME): cv.string,
+    }
+)
+
+IMPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_FILENAME): cv.string,
+        vol.Optional(ATTR_FORMAT): vol.In(IMPORT_FORMATS),
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_RUNS, default=1): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=20)
+        ),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_handle_export_intervals(call: ServiceCall) -> ServiceResponse:
+        """Export zone visits for a date range to a file in the config dir."""
+        return await _async_export_intervals(hass, call.data)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_INTERVALS,
+        async_handle_export_intervals,
+        schema=EXPORT_INTERVALS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_handle_import_history(call: ServiceCall) -> ServiceResponse:
+        """Import a location history file into a person's stored history."""
+        return await _async_import_history(hass, call.data)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_HISTORY,
+        async_handle_import_history,
+        schema=IMPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_handle_profile(call: ServiceCall) -> None:
+        """Profile the next refreshes of the tracked persons."""
+        _async_arm_profilers(hass, call.data)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_handle_profile, schema=PROFILE_SCHEMA
+    )
+
+
+def _as_local(value: datetime) -> datetime:
+    """Interpret naive datetimes in the configured time zone."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_util.get_default_time_zone())
+    return dt_util.as_local(value)
+
+
+@callback
+def _async_arm_profilers(hass: HomeAssistant, data: dict[str, Any]) -> None:
+    """Attach a profiler to the selected person coordinators."""
+    entries = [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+        and isinstance(entry.runtime_data.coordinator, P2ZDataUpdateCoordinator)
+        and data.get(ATTR_CONFIG_ENTRY_ID, entry.entry_id) == entry.entry_id
+    ]
+    if not entries:
+        raise ServiceValidationError("No loaded person entry to profile")
+
+    stamp = dt_util.now().strftime("%Y%m%d_%H%M%S")
+    for entry in entries:
+        person = entry.data[CONF_PERSON_ENTITY].replace("person.", "")
+        path = hass.config.path(DOMAIN, f"profile_{person}_{stamp}")
+        entry.runtime_data.coordinator.profiler = RefreshProfiler(data[ATTR_RUNS], path)
+        LOGGER.info(
+            "Profiling the next %d refreshes of %s into %s",
+            data[ATTR_RUNS],
+            entry.title,
+            path,
+        )
+
+
+async def _async_import_history(
+    hass: HomeAssistant, data: dict[str, Any]
+) -> ServiceResponse:
+    """Validate an import request and hand the file to the person's coordinator."""
+    entry = hass.config_entries.async_get_entry(data[ATTR_CONFIG_ENTRY_ID])
+    if (
+        entry is None
+        or entry.domain != DOMAIN
+        or entry.state is not ConfigEntryState.LOADED
+        or not isinstance(entry.runtime_data.coordinator, P2ZDataUpdateCoordinator)
+    ):
+        raise ServiceValidationError("No loaded person entry to import into")
+
+    filename = data[ATTR_FILENAME]
+    if os.path.basename(filename) != filename or filename in ("", ".", ".."):
+        raise ServiceValidationError("Import filename must not contain a path")
+    # Files are read from the same folder exports are written to
+    path = hass.config.path(DOMAIN, filename)
+    if not await hass.async_add_executor_job(os.path.isfile, path):
+        raise ServiceValidationError(f"File {filename} not found in {DOMAIN} folder")
+    try:
+        file_format = data.get(ATTR_FORMAT) or detect_format(filename)
+    except ValueError as err:
+        raise ServiceValidationError(str(err)) from err
+
+    start = (
+        _as_local(data[ATTR_START])
+        if ATTR_START in data
+        else dt_util.utc_from_timestamp(0)
+    )
+    end = _as_local(data[ATTR_END]) if ATTR_END in data else dt_util.now()
+    if start >= end:
+        raise ServiceValidationError("Import start must be before its end")
+
+    LOGGER.info("Importing %s into %s", path, entry.title)
+    try:
+        return await entry.runtime_data.coordinator.async_import_history(
+            path, file_format, start, end
+        )
+    except (OSError, ValueError, ElementTree.ParseError) as err:
+        raise HomeAssistantError(f"Could not import {filename}: {err}") from err
+
+
+async def _async_export_intervals(
+    hass: HomeAssistant, data: dict[str, Any]
+) -> ServiceResponse:
+    """Validate an export request and stream it to disk in the executor."""
+    start = _as_local(data[ATTR_START])
+    end = _as_local(data[ATTR_END]) if ATTR_END in data else dt_util.now()
+    if start >= end:
+        raise ServiceValidationError("Export start must be before its end")
+
+    persons = data.get(ATTR_PERSON_ENTITY) or sorted(
+        {
+            entry.data[CONF_PERSON_ENTITY]
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if CONF_PERSON_ENTITY in entry.data
+        }
+    )
+    if not persons:
+        raise ServiceValidationError("No person entities to export")
+
+    # Person states are resolved to zone entity IDs while exporting
+    resolver = async_get_zone_resolver(hass)
+    zone_ids: set[str] | None = None
+    if ATTR_ZONES in data:
+        zone_ids = set()
+        for zone_entity_id in data[ATTR_ZONES]:
+            if not resolver.knows(zone_entity_id):
+                raise ServiceValidationError(f"Zone {zone_entity_id} not found")
+            zone_ids.add(resolver.canonical(zone_entity_id))
+
+    export_format = data[ATTR_FORMAT]
+    filename = data.get(ATTR_FILENAME) or (
+        f"intervals_{start:%Y%m%d}_{end:%Y%m%d}.{export_format}"
+    )
+    if os.path.basename(filename) != filename or filename in ("", ".", ".."):
+        raise ServiceValidationError("Export filename must not contain a path")
+    path = hass.config.path(DOMAIN, filename)
+
+    LOGGER.info(
+        "Exporting intervals for %s from %s to %s into %s",
+        persons,
+        start,
+        end,
+        path,
+    )
+    rows = await get_instance(hass).async_add_executor_job(
+        _write_export,
+        hass,
+        resolver,
+        path,
+        export_format,
+        persons,
+        zone_ids,
+        start,
+        end,
+    )
+    LOGGER.info("Exported %d intervals to %s", rows, path)
+    return {"path": path, "rows": rows}
+
+
+def _write_export(
+    hass: HomeAssistant,
+    resolver: ZoneResolver,
+    path: str,
+    export_format: str,
+    persons: list[str],
+    zone_ids: set[str] | None,
+    start: datetime,
+    end: datetime,
+) -> int:
+    """Write the export file, streaming one history chunk at a time."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if export_format == EXPORT_FORMAT_CSV:
+            writer = csv.writer(file)
+            writer.writerow(EXPORT_FIELDS)
+        for row in _iter_export_rows(hass, resolver, persons, zone_ids, start, end):
+            if export_format == EXPORT_FORMAT_CSV:
+                writer.writerow(row)
+            else:
+                file.write(json.dumps(dict(zip(EXPORT_FIELDS, row, strict=True))))
+                file.write("\n")
+            rows += 1
+    return rows
+
+
+def _iter_export_rows(
+    hass: HomeAssistant,
+    resolver: ZoneResolver,
+    persons: list[str],
+    zone_ids: set[str] | None,
+    start: datetime,
+    end: datetime,
+) -> Iterator[list[Any]]:
+    """Yield one export row per zone visit."""
+    timezone = dt_util.get_default_time_zone()
+    for person in persons:
+        stays = iter_stays(
+            _iter_transitions(hass, resolver, person, start, end),
+            start.timestamp(),
+            end.timestamp(),
+        )
+        for zone, stay_start, stay_end in stays:
+            # States that match no zone, like not_home or unavailable, are
+            # left as they are by the resolver and are not zone visits
+            if not zone.startswith("zone."):
+                continue
+            if zone_ids is not None and zone not in zone_ids:
+                continue
+            yield [
+                person,
+                zone,
+                datetime.fromtimestamp(stay_start, timezone).isoformat(),
+                datetime.fromtimestamp(stay_end, timezone).isoformat(),
+                round((stay_end - stay_start) / 3600, 4),
+            ]
+
+
+def _iter_transitions(
+    hass: HomeAssistant,
+    resolver: ZoneResolver,
+    person: str,
+    start: datetime,
+    end: datetime,
+) -> Iterator[tuple[float, str]]:
+    """Yield a person's resolved state changes, one recorder chunk at a time."""
+    chunk = timedelta(days=EXPORT_CHUNK_DAYS)
+    chunk_start = start
+    previous = float("-inf")
+    while chunk_start < end:
+        chunk_end = min(chunk_start + chunk, end)
+        # Chunks overlap by a second, so a state exactly on a boundary is
+        # read whether the recorder's bounds are inclusive or not
+        states = history.get_significant_states(
+            hass,
+            chunk_start if chunk_start == start else chunk_start - _CHUNK_OVERLAP,
+            chunk_end,
+            [person],
+            None,
+            chunk_start == start,  # include_start_time_state
+            True,  # significant_changes_only
+        )
+        last = previous
+        for state in (states or {}).get(person, []):
+            timestamp = state.last_updated.timestamp()
+            # States the previous chunk already yielded
+            if timestamp <= previous:
+                continue
+            last = max(last, timestamp)
+            yield timestamp, resolver.resolve(state.state, timestamp)
+        previous = last
+        chunk_start = chunk_end
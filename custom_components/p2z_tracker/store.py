@@ -0,0 +1,426 @@
+"""Persistent interval store for p2z_tracker."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    LOGGER,
+    SKETCH_BIN_SECONDS,
+    STORE_RAW_DAYS,
+    STORE_SAVE_DELAY,
+)
+from .intervals import (
+    DailySketch,
+    clipped_seconds,
+    daily_seconds,
+    splice_intervals,
+    union_intervals,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from datetime import tzinfo
+
+    from homeassistant.core import HomeAssistant
+
+STORAGE_VERSION = 1
+
+
+class IntervalStore:
+    """Raw zone intervals for recent days and daily totals for older ones."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store of one config entry."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}"
+        )
+        # Intervals are complete up to the watermark
+        self.watermark: float | None = None
+        # Per zone, data is complete from this timestamp on
+        self.covered_since: dict[str, float] = {}
+        self._intervals: dict[str, list[tuple[float, float]]] = {}
+        self._days: dict[str, dict[str, float]] = {}
+        self._compacted: date | None = None
+        # Per kind, the known holes in the recorded history
+        self.gaps: dict[str, list[tuple[float, float]]] = {}
+        # The gap policy the stored intervals were calculated with
+        self.gap_policy: str | None = None
+        # Local days to recalculate because of a gap, as ISO dates
+        self.dirty: set[str] = set()
+        # Per zone and weekday, the time per day of the whole days in _sketched
+        self._sketches: dict[str, dict[int, DailySketch]] = {}
+        self._sketched: dict[str, tuple[date, date]] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored data."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        self.watermark = data.get("watermark")
+        self.gaps = {
+            kind: [tuple(pair) for pair in spans]
+            for kind, spans in data.get("gaps", {}).items()
+        }
+        self.gap_policy = data.get("gap_policy")
+        self.dirty = set(data.get("dirty", []))
+        for zone, stored in data.get("zones", {}).items():
+            if stored.get("covered_since") is not None:
+                self.covered_since[zone] = stored["covered_since"]
+            self._intervals[zone] = [tuple(pair) for pair in stored["intervals"]]
+            self._days[zone] = stored["days"]
+            # Stores without sketches get them on the next compaction
+            if (sketch := stored.get("sketch")) is not None:
+                self._sketched[zone] = (
+                    date.fromisoformat(sketch["first"]),
+                    date.fromisoformat(sketch["last"]),
+                )
+                self._sketches[zone] = {
+                    int(weekday): DailySketch(
+                        SKETCH_BIN_SECONDS,
+                        {int(index): count for index, count in counts.items()},
+                    )
+                    for weekday, counts in sketch["weekdays"].items()
+                }
+
+    async def async_remove(self) -> None:
+        """Delete the stored data."""
+        await self._store.async_remove()
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to write to disk."""
+        return {
+            "watermark": self.watermark,
+            "gaps": self.gaps,
+            "gap_policy": self.gap_policy,
+            "dirty": sorted(self.dirty),
+            "zones": {
+                zone: {
+                    "covered_since": self.covered_since.get(zone),
+                    "intervals": self._intervals.get(zone, []),
+                    "days": self._days.get(zone, {}),
+                    "sketch": self._sketch_to_save(zone),
+                }
+                for zone in self._intervals.keys() | self._days.keys()
+            },
+        }
+
+    def _sketch_to_save(self, zone: str) -> dict[str, Any] | None:
+        """Return a zone's sketches in the stored format."""
+        if (sketched := self._sketched.get(zone)) is None:
+            return None
+        return {
+            "first": sketched[0].isoformat(),
+            "last": sketched[1].isoformat(),
+            "weekdays": {
+                weekday: sketch.counts
+                for weekday, sketch in self._sketches.get(zone, {}).items()
+            },
+        }
+
+    def async_schedule_save(self) -> None:
+        """Write the data to disk after a delay, batching frequent updates."""
+        self._store.async_delay_save(self._data_to_save, STORE_SAVE_DELAY)
+
+    @property
+    def zones(self) -> set[str]:
+        """Return the zones with stored data."""
+        return self._intervals.keys() | self._days.keys()
+
+    def replace(
+        self,
+        zone: str,
+        start: float,
+        end: float,
+        intervals: list[tuple[float, float]],
+    ) -> None:
+        """Replace a zone's raw intervals within a range."""
+        changed = self._changed_sketched_days(zone, start, end, intervals)
+        before = {day: self.day_seconds(zone, day) for day in changed}
+        self._splice(zone, start, end, intervals)
+        for day, seconds in before.items():
+            self._resketch(zone, day, seconds, self.day_seconds(zone, day))
+
+    def _splice(
+        self,
+        zone: str,
+        start: float,
+        end: float,
+        intervals: list[tuple[float, float]],
+    ) -> None:
+        """Replace a zone's raw intervals within a range, leaving the sketches."""
+        self._intervals[zone] = splice_intervals(
+            self._intervals.get(zone, []), start, end, intervals
+        )
+        # Coverage only moves back over ranges that reach it, so a range
+        # before a hole does not claim the hole as known
+        covered_since = self.covered_since.get(zone)
+        if covered_since is None or start < covered_since <= end:
+            self.covered_since[zone] = start
+
+    def intervals(
+        self, zone: str, start: float, end: float
+    ) -> list[tuple[float, float]]:
+        """Return a zone's raw intervals that overlap a range."""
+        return [
+            interval
+            for interval in self._intervals.get(zone, [])
+            if interval[1] > start and interval[0] < end
+        ]
+
+    def daily_totals(self, zone: str) -> dict[date, float]:
+        """Return a zone's seconds per local day, compacted and raw alike."""
+        totals = {
+            date.fromisoformat(day): seconds
+            for day, seconds in self._days.get(zone, {}).items()
+        }
+        for day, seconds in daily_seconds(
+            self._intervals.get(zone, []), dt_util.get_default_time_zone()
+        ).items():
+            totals[day] = totals.get(day, 0.0) + seconds
+        return totals
+
+    def day_seconds(self, zone: str, day: date) -> float:
+        """Return a zone's seconds on one local day, compacted and raw alike."""
+        timezone = dt_util.get_default_time_zone()
+        start = _start_of_day(day, timezone)
+        end = _start_of_day(day + timedelta(days=1), timezone)
+        compacted = self._days.get(zone, {}).get(day.isoformat(), 0.0)
+        return compacted + clipped_seconds(self.intervals(zone, start, end), start, end)
+
+    def heal(
+        self,
+        zone: str,
+        day: date,
+        intervals: list[tuple[float, float]],
+    ) -> None:
+        """Replace a zone's data of one local day with recomputed intervals."""
+        timezone = dt_util.get_default_time_zone()
+        before = self.day_seconds(zone, day)
+        # A compacted day goes back to raw, the next compaction rolls it up again
+        self._days.get(zone, {}).pop(day.isoformat(), None)
+        self._splice(
+            zone,
+            _start_of_day(day, timezone),
+            _start_of_day(day + timedelta(days=1), timezone),
+            intervals,
+        )
+        if self._is_sketched(zone, day):
+            self._resketch(zone, day, before, self.day_seconds(zone, day))
+
+    def sketch(self, zone: str, weekdays: Iterable[int] = range(7)) -> DailySketch:
+        """Return the time per day of a zone's whole days on some weekdays."""
+        merged = DailySketch(SKETCH_BIN_SECONDS)
+        for weekday in weekdays:
+            if (sketch := self._sketches.get(zone, {}).get(weekday)) is not None:
+                merged.merge(sketch)
+        return merged
+
+    def _is_sketched(self, zone: str, day: date) -> bool:
+        """Return whether a day of a zone is counted in its sketches."""
+        sketched = self._sketched.get(zone)
+        return sketched is not None and sketched[0] <= day <= sketched[1]
+
+    def _resketch(self, zone: str, day: date, before: float, after: float) -> None:
+        """Move a sketched day from its old total to its new one."""
+        sketch = self._sketches.setdefault(zone, {}).setdefault(
+            day.weekday(), DailySketch(SKETCH_BIN_SECONDS)
+        )
+        sketch.add(before, -1)
+        sketch.add(after)
+
+    def _sketch_days(self, zone: str, first: date, last: date, count: int) -> None:
+        """Add the days of a range to a zone's sketches, or remove them."""
+        sketches = self._sketches.setdefault(zone, {})
+        day = first
+        while day <= last:
+            sketches.setdefault(day.weekday(), DailySketch(SKETCH_BIN_SECONDS)).add(
+                self.day_seconds(zone, day), count
+            )
+            day += timedelta(days=1)
+
+    def _changed_sketched_days(
+        self,
+        zone: str,
+        start: float,
+        end: float,
+        intervals: list[tuple[float, float]],
+    ) -> list[date]:
+        """Return the sketched days a replacement would change."""
+        if zone not in self._sketched:
+            return []
+        timezone = dt_util.get_default_time_zone()
+        old = daily_seconds(
+            [
+                (max(interval_start, start), min(interval_end, end))
+                for interval_start, interval_end in self.intervals(zone, start, end)
+            ],
+            timezone,
+        )
+        new = daily_seconds(
+            [
+                (max(interval_start, start), min(interval_end, end))
+                for interval_start, interval_end in intervals
+                if interval_end > start and interval_start < end
+            ],
+            timezone,
+        )
+        return [
+            day
+            for day in old.keys() | new.keys()
+            if self._is_sketched(zone, day)
+            and abs(old.get(day, 0.0) - new.get(day, 0.0)) >= 1
+        ]
+
+    def _extend_sketches(self, zone: str, today: date) -> bool:
+        """Add the whole days a zone gained since its sketches were updated."""
+        if (covered_since := self.covered_since.get(zone)) is None:
+            return False
+        timezone = dt_util.get_default_time_zone()
+        first = datetime.fromtimestamp(covered_since, timezone).date()
+        # The day coverage starts in is only partly known
+        if _start_of_day(first, timezone) < covered_since:
+            first += timedelta(days=1)
+        last = today - timedelta(days=1)
+        sketched = self._sketched.get(zone)
+        if first > last or sketched == (first, last):
+            return False
+        if sketched is None:
+            self._sketch_days(zone, first, last, 1)
+        else:
+            # Backfills extend the coverage back, refreshes forward
+            self._sketch_days(zone, first, sketched[0] - timedelta(days=1), 1)
+            self._sketch_days(zone, sketched[1] + timedelta(days=1), last, 1)
+            first = min(first, sketched[0])
+        self._sketched[zone] = (first, last)
+        return True
+
+    def _expire_sketches(self, zone: str, oldest: date) -> None:
+        """Remove the days before a date from a zone's sketches."""
+        if (sketched := self._sketched.get(zone)) is None or sketched[0] >= oldest:
+            return
+        self._sketch_days(
+            zone, sketched[0], min(sketched[1], oldest - timedelta(days=1)), -1
+        )
+        if oldest > sketched[1]:
+            del self._sketched[zone]
+            self._sketches.pop(zone, None)
+        else:
+            self._sketched[zone] = (oldest, sketched[1])
+
+    def add_gaps(
+        self, kind: str, spans: list[tuple[float, float]]
+    ) -> list[tuple[float, float]]:
+        """Index gaps of a kind, returning the ones that weren't known yet."""
+        known = self.gaps.get(kind, [])
+        # Gaps older than the raw intervals are pruned, so they stay unknown
+        horizon = _raw_cutoff(dt_util.now().date(), dt_util.get_default_time_zone())
+        new = [
+            (start, end)
+            for start, end in spans
+            # Gaps found again from a later window start are not new
+            if end > horizon and clipped_seconds(known, start, end) < end - start - 1
+        ]
+        if new:
+            self.gaps[kind] = union_intervals([known, new])
+        return new
+
+    def mark_dirty(self, spans: list[tuple[float, float]], before: float) -> None:
+        """Queue the local days the spans touch that start before a timestamp."""
+        timezone = dt_util.get_default_time_zone()
+        for start, end in spans:
+            day = datetime.fromtimestamp(start, timezone).date()
+            while day <= datetime.fromtimestamp(end, timezone).date() and (
+                _start_of_day(day, timezone) < before
+            ):
+                self.dirty.add(day.isoformat())
+                day += timedelta(days=1)
+
+    def remove_zones(self, keep: set[str]) -> None:
+        """Drop the data of zones that are no longer tracked."""
+        for zone in self.zones - keep:
+            self._intervals.pop(zone, None)
+            self._days.pop(zone, None)
+            self.covered_since.pop(zone, None)
+            self._sketches.pop(zone, None)
+            self._sketched.pop(zone, None)
+
+    def compact(
+        self, today: date, retention: dict[str, int], force: bool = False
+    ) -> bool:
+        """Roll old intervals into daily totals and drop expired days.
+
+        Runs at most once a day unless forced, and returns whether anything
+        changed. Retention is in days per zone, 0 keeps everything.
+        """
+        if self._compacted == today and not force:
+            return False
+        self._compacted = today
+        timezone = dt_util.get_default_time_zone()
+        cutoff = _raw_cutoff(today, timezone)
+        changed = False
+
+        # Gaps only matter to days that are still kept as intervals
+        for kind, spans in self.gaps.items():
+            kept_gaps = [(start, end) for start, end in spans if end > cutoff]
+            changed |= len(kept_gaps) != len(spans)
+            self.gaps[kind] = kept_gaps
+
+        for zone, intervals in self._intervals.items():
+            old = [
+                (start, min(end, cutoff)) for start, end in intervals if start < cutoff
+            ]
+            if not old:
+                continue
+            self._intervals[zone] = [
+                (max(start, cutoff), end) for start, end in intervals if end > cutoff
+            ]
+            days = self._days.setdefault(zone, {})
+            for day, seconds in daily_seconds(old, timezone).items():
+                days[day.isoformat()] = days.get(day.isoformat(), 0.0) + seconds
+            changed = True
+
+        for zone in self.zones:
+            if not (retention_days := retention.get(zone, 0)):
+                continue
+            oldest = today - timedelta(days=retention_days)
+            # Expiring days leave the sketches while their totals are known
+            self._expire_sketches(zone, oldest)
+            days = self._days.get(zone, {})
+            expired = [day for day in days if day < oldest.isoformat()]
+            for day in expired:
+                del days[day]
+            # Short retentions can expire intervals that are still raw
+            oldest_ts = _start_of_day(oldest, timezone)
+            intervals = self._intervals.get(zone, [])
+            kept = [
+                (max(start, oldest_ts), end)
+                for start, end in intervals
+                if end > oldest_ts
+            ]
+            changed |= bool(expired) or kept != intervals
+            self._intervals[zone] = kept
+            if zone in self.covered_since:
+                self.covered_since[zone] = max(self.covered_since[zone], oldest_ts)
+
+        for zone in self.zones:
+            changed |= self._extend_sketches(zone, today)
+
+        if changed:
+            LOGGER.debug("Compacted interval store %s", self._store.key)
+        return changed
+
+
+def _start_of_day(day: date, timezone: tzinfo) -> float:
+    """Return the timestamp of a day's local midnight."""
+    return datetime.combine(day, time.min, timezone).timestamp()
+
+
+def _raw_cutoff(today: date, timezone: tzinfo) -> float:
+    """Return the timestamp before which intervals are rolled into daily totals."""
+    return _start_of_day(today - timedelta(days=STORE_RAW_DAYS), timezone)
@@ -0,0 +1,194 @@
+"""Threshold events for p2z_tracker."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+from homeassistant.const import ATTR_LATITUDE, ATTR_LONGITUDE
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_PERIOD,
+    ATTR_PERSON_ENTITY,
+    ATTR_REACHED_AT,
+    ATTR_THRESHOLD,
+    ATTR_ZONE,
+    EVENT_THRESHOLD_REACHED,
+    LOGGER,
+)
+from .intervals import threshold_crossing
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from datetime import datetime
+
+    from .geometry import ZoneIndex
+
+# Timers may run a little early, crossings this close count as reached
+FIRE_TOLERANCE = 1.0  # seconds
+
+
+class Threshold(NamedTuple):
+    """A threshold on one zone and period, with the period's bounds."""
+
+    zone: str
+    period: str
+    hours: float
+    start: float
+    end: float
+
+
+class ThresholdTracker:
+    """Fire an event at the moment a zone's time passes a threshold."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        person_entity: str,
+        watch_position: bool,
+    ) -> None:
+        """Initialize the tracker, watching coordinates as well when asked."""
+        self._hass = hass
+        self._person_entity = person_entity
+        self._watch_position = watch_position
+        self._pending: dict[Threshold, float] = {}
+        # Reached thresholds, by zone, period and period start
+        self._reached: set[tuple[str, str, float]] = set()
+        self._evaluated_at: float | None = None
+        # In geometry mode, the zones the person was in when last evaluated
+        self._zone_index: ZoneIndex | None = None
+        self._members: frozenset[str] | None = None
+        self._scheduled: float | None = None
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_update(
+        self,
+        thresholds: Iterable[Threshold],
+        intervals: dict[str, list[tuple[float, float]]],
+        now: float,
+        zone_index: ZoneIndex | None = None,
+    ) -> None:
+        """Recalculate crossing times from a refresh's intervals."""
+        first = self._evaluated_at is None
+        self._evaluated_at = now
+        if self._watch_position:
+            self._zone_index = zone_index
+            self._members = self._zones_at(self._hass.states.get(self._person_entity))
+        self._pending = {}
+        current: set[tuple[str, str, float]] = set()
+        for threshold in thresholds:
+            key = (threshold.zone, threshold.period, threshold.start)
+            current.add(key)
+            if key in self._reached:
+                continue
+            crossing = threshold_crossing(
+                intervals.get(threshold.zone, []),
+                threshold.start,
+                threshold.hours * 3600,
+                now,
+            )
+            if crossing is None or crossing >= threshold.end:
+                continue
+            if crossing > now:
+                self._pending[threshold] = crossing
+            elif first:
+                # Reached before we started watching, e.g. before a restart
+                self._reached.add(key)
+            else:
+                self._async_fire(threshold, crossing)
+        # Forget thresholds of past periods
+        self._reached &= current
+        self._async_schedule()
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel the pending timer."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._scheduled = None
+
+    @callback
+    def _async_schedule(self) -> None:
+        """Arm a single timer for the earliest pending crossing."""
+        if not self._pending:
+            self.async_cancel()
+            return
+        next_crossing = min(self._pending.values())
+        # While the person stays put the crossing doesn't move, keep the timer
+        if (
+            self._scheduled is not None
+            and abs(next_crossing - self._scheduled) < FIRE_TOLERANCE
+        ):
+            return
+        self.async_cancel()
+        self._scheduled = next_crossing
+        self._unsub = async_track_point_in_time(
+            self._hass,
+            self._async_timer_fired,
+            dt_util.utc_from_timestamp(next_crossing),
+        )
+
+    @callback
+    def _async_timer_fired(self, now: datetime) -> None:
+        """Fire the crossings that are due."""
+        self._unsub = None
+        self._scheduled = None
+        state = self._hass.states.get(self._person_entity)
+        if state is not None and self._evaluated_at is not None:
+            if self._watch_position:
+                # Fixes keep arriving while the person stays put, only entering
+                # or leaving a zone moves the crossing
+                moved = self._zones_at(state) != self._members
+            else:
+                moved = state.last_changed.timestamp() > self._evaluated_at
+            if moved:
+                # The crossing may no longer hold, the refresh that is already
+                # on its way for the move recalculates it
+                return
+
+        now_ts = now.timestamp() + FIRE_TOLERANCE
+        for threshold, crossing in list(self._pending.items()):
+            if crossing <= now_ts:
+                del self._pending[threshold]
+                self._async_fire(threshold, crossing)
+        self._async_schedule()
+
+    def _zones_at(self, state: State | None) -> frozenset[str] | None:
+        """Return the zones containing the person's coordinates, if known."""
+        if state is None or self._zone_index is None:
+            return None
+        latitude = state.attributes.get(ATTR_LATITUDE)
+        longitude = state.attributes.get(ATTR_LONGITUDE)
+        if not isinstance(latitude, (int, float)) or not isinstance(
+            longitude, (int, float)
+        ):
+            return None
+        return self._zone_index.containing(latitude, longitude)
+
+    @callback
+    def _async_fire(self, threshold: Threshold, crossing: float) -> None:
+        """Fire the event for a reached threshold."""
+        self._reached.add((threshold.zone, threshold.period, threshold.start))
+        reached_at = dt_util.as_local(dt_util.utc_from_timestamp(crossing))
+        LOGGER.debug(
+            "%s reached %s h in %s (%s) at %s",
+            self._person_entity,
+            threshold.hours,
+            threshold.zone,
+            threshold.period,
+            reached_at,
+        )
+        self._hass.bus.async_fire(
+            EVENT_THRESHOLD_REACHED,
+            {
+                ATTR_PERSON_ENTITY: self._person_entity,
+                ATTR_ZONE: threshold.zone,
+                ATTR_PERIOD: threshold.period,
+                ATTR_THRESHOLD: threshold.hours,
+                ATTR_REACHED_AT: reached_at.isoformat(),
+            },
+        )
@@ -0,0 +1,67 @@
+"""Slot-addressed refresh results for p2z_tracker."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Iterable
+
+
+class TotalsLayout:
+    """The fixed position of every value an entry's refreshes produce."""
+
+    __slots__ = ("_slots", "keys")
+
+    def __init__(self, keys: Iterable[tuple[str, str]]) -> None:
+        """Initialize the layout from (zone, key) pairs in slot order."""
+        self.keys = tuple(dict.fromkeys(keys))
+        self._slots = {key: slot for slot, key in enumerate(self.keys)}
+
+    def slot(self, zone: str, key: str) -> int:
+        """Return the slot of a zone's value."""
+        return self._slots[zone, key]
+
+    def pack(self, data: dict[str, dict[str, Any]], previous: Totals | None) -> Totals:
+        """Lay out one refresh's values and find the ones that changed."""
+        values = [data.get(zone, {}).get(key) for zone, key in self.keys]
+        if previous is None or previous.layout is not self:
+            changed = frozenset(range(len(values)))
+        else:
+            changed = frozenset(
+                slot
+                for slot, (value, old) in enumerate(
+                    zip(values, previous.values, strict=True)
+                )
+                if value != old
+            )
+        return Totals(self, values, changed)
+
+
+class Totals:
+    """The values of one refresh, addressed by slot."""
+
+    __slots__ = ("changed", "layout", "values")
+
+    def __init__(
+        self, layout: TotalsLayout, values: list[Any], changed: frozenset[int]
+    ) -> None:
+        """Initialize the refresh results."""
+        self.layout = layout
+        self.values = values
+        # Slots whose value differs from the previous refresh
+        self.changed = changed
+
+    def __getitem__(self, slot: int) -> Any:
+        """Return the value in a slot."""
+        return self.values[slot]
+
+    def as_dict(
+        self, slots: Collection[int] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Return the values of some or all slots, grouped by zone."""
+        grouped: dict[str, dict[str, Any]] = {}
+        for slot in range(len(self.values)) if slots is None else sorted(slots):
+            zone, key = self.layout.keys[slot]
+            grouped.setdefault(zone, {})[key] = self.values[slot]
+        return grouped
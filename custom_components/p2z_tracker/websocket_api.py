@@ -0,0 +1,201 @@
+"""Websocket API for p2z_tracker."""
+
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DAILY_QUANTILES, DOMAIN, TIMELINE_MAX_PAGE_SIZE
+from .coordinator import P2ZDataUpdateCoordinator
+from .selection import WEEKDAY_PERIODS
+
+if TYPE_CHECKING:
+    from homeassistant.components.websocket_api import ActiveConnection
+
+    from .data import P2ZTrackerConfigEntry
+    from .totals import Totals
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, ws_timeline)
+    websocket_api.async_register_command(hass, ws_subscribe_totals)
+    websocket_api.async_register_command(hass, ws_daily_quantiles)
+
+
+def _get_entry(
+    hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
+) -> P2ZTrackerConfigEntry | None:
+    """Return the loaded entry a message refers to, or send an error."""
+    entry = hass.config_entries.async_get_entry(msg["entry_id"])
+    if entry is None or entry.domain != DOMAIN:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Config entry not found"
+        )
+        return None
+    if entry.state is not ConfigEntryState.LOADED:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Config entry not loaded"
+        )
+        return None
+    return entry
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/timeline",
+        vol.Required("entry_id"): str,
+        vol.Required("start_time"): str,
+        vol.Optional("end_time"): str,
+        vol.Optional("zones"): [str],
+        vol.Optional("page_size", default=TIMELINE_MAX_PAGE_SIZE): vol.All(
+            int, vol.Range(min=1, max=TIMELINE_MAX_PAGE_SIZE)
+        ),
+        vol.Optional("cursor"): vol.ExactSequence([vol.Coerce(float), str]),
+    }
+)
+@callback
+def ws_timeline(
+    hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Return a page of a person's zone visits, oldest first."""
+    if (entry := _get_entry(hass, connection, msg)) is None:
+        return
+    coordinator = entry.runtime_data.coordinator
+    if not isinstance(coordinator, P2ZDataUpdateCoordinator):
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_SUPPORTED, "Not a person entry"
+        )
+        return
+
+    start_time = dt_util.parse_datetime(msg["start_time"])
+    end_time = (
+        dt_util.parse_datetime(msg["end_time"]) if "end_time" in msg else dt_util.now()
+    )
+    if start_time is None or end_time is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_INVALID_FORMAT, "Invalid time"
+        )
+        return
+    start, end = start_time.timestamp(), end_time.timestamp()
+
+    store = coordinator.store
+    zones = msg.get("zones") or sorted(store.zones)
+    # Each zone's intervals are sorted, so the merge streams them in order
+    visits = heapq.merge(
+        *(
+            [
+                (max(interval_start, start), zone, min(interval_end, end))
+                for interval_start, interval_end in store.intervals(zone, start, end)
+            ]
+            for zone in zones
+        )
+    )
+    cursor = tuple(msg["cursor"]) if "cursor" in msg else None
+    page: list[dict[str, Any]] = []
+    next_cursor = None
+    for visit_start, zone, visit_end in visits:
+        if cursor is not None and (visit_start, zone) <= cursor:
+            continue
+        if len(page) == msg["page_size"]:
+            last = page[-1]
+            next_cursor = [last["start"], last["zone"]]
+            break
+        page.append({"zone": zone, "start": visit_start, "end": visit_end})
+
+    connection.send_result(
+        msg["id"],
+        {
+            "visits": page,
+            "next_cursor": next_cursor,
+            # Older visits only survive as daily totals
+            "covered_since": min(
+                (store.covered_since.get(zone, end) for zone in zones), default=None
+            ),
+        },
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe_totals",
+        vol.Required("entry_id"): str,
+    }
+)
+@callback
+def ws_subscribe_totals(
+    hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Send an entry's totals, then only the values that change."""
+    if (entry := _get_entry(hass, connection, msg)) is None:
+        return
+    coordinator = entry.runtime_data.coordinator
+    sent: Totals | None = None
+
+    @callback
+    def async_send_changes() -> None:
+        """Send the totals that differ from what the client has."""
+        nonlocal sent
+        totals = coordinator.data
+        # Failed refreshes keep the results the client already has
+        if totals is None or totals is sent:
+            return
+        # Each refresh knows its changed slots, the first message sends all
+        changes = totals.as_dict(None if sent is None else totals.changed)
+        sent = totals
+        if changes:
+            connection.send_message(
+                websocket_api.event_message(msg["id"], {"totals": changes})
+            )
+
+    connection.subscriptions[msg["id"]] = coordinator.async_add_listener(
+        async_send_changes
+    )
+    connection.send_result(msg["id"])
+    async_send_changes()
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/daily_quantiles",
+        vol.Required("entry_id"): str,
+        vol.Required("zone"): str,
+        vol.Optional("weekdays", default=WEEKDAY_PERIODS): [vol.In(WEEKDAY_PERIODS)],
+        vol.Optional("quantiles", default=list(DAILY_QUANTILES.values())): [
+            vol.All(vol.Coerce(float), vol.Range(min=0, max=1))
+        ],
+    }
+)
+@callback
+def ws_daily_quantiles(
+    hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Return quantiles of a zone's hours per day over some weekdays."""
+    if (entry := _get_entry(hass, connection, msg)) is None:
+        return
+    coordinator = entry.runtime_data.coordinator
+    if not isinstance(coordinator, P2ZDataUpdateCoordinator):
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_SUPPORTED, "Not a person entry"
+        )
+        return
+
+    # The weekday sketches are merged, no stored day is read
+    sketch = coordinator.store.sketch(
+        msg["zone"], [WEEKDAY_PERIODS.index(weekday) for weekday in msg["weekdays"]]
+    )
+    quantiles = {}
+    for fraction in msg["quantiles"]:
+        seconds = sketch.quantile(fraction)
+        quantiles[str(fraction)] = (
+            round(seconds / 3600, 2) if seconds is not None else None
+        )
+
+    connection.send_result(msg["id"], {"days": sketch.days, "quantiles": quantiles})
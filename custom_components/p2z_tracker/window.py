@@ -0,0 +1,84 @@
+"""The cached recorder rows of a refresh window for p2z_tracker."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from datetime import date
+
+_timestamp = itemgetter(0)
+
+
+class HistoryWindow:
+    """A person's recorder rows since the window start, extended by deltas.
+
+    Rows are tuples that start with their timestamp, the first one may be
+    the state at the window start.
+    """
+
+    __slots__ = ("day", "delta_reads", "full_reads", "rows", "start", "watermark")
+
+    def __init__(self) -> None:
+        """Initialize an empty window, the first refresh reads it in full."""
+        self.start: float | None = None
+        self.day: date | None = None
+        self.rows: list[tuple[Any, ...]] = []
+        # Timestamp of the newest row that was processed
+        self.watermark: float | None = None
+        self.full_reads = 0
+        self.delta_reads = 0
+
+    def needs_full_read(self, start: float, day: date) -> bool:
+        """Return whether the window rolled over since it was read."""
+        return self.watermark is None or start != self.start or day != self.day
+
+    def reset(self, start: float, day: date, rows: list[tuple[Any, ...]]) -> None:
+        """Replace the rows with a full read of the window."""
+        self.start = start
+        self.day = day
+        self.rows = rows
+        self.watermark = max(rows[-1][0], start) if rows else start
+        self.full_reads += 1
+
+    def invalidate(self) -> None:
+        """Make the next refresh read the window in full."""
+        self.watermark = None
+
+    def fold(
+        self, since: float, fetched: list[tuple[Any, ...]]
+    ) -> list[tuple[Any, ...]] | None:
+        """Append the rows newer than the watermark and return them.
+
+        The fetched rows start with the state at `since`, so everything the
+        window already knows from then on must come back unchanged. Returns
+        None when it does not, as rows were written late or removed.
+        """
+        rows = self.rows
+        split = bisect_right(rows, since, key=_timestamp)
+        known_state = rows[split - 1][1:] if split else None
+        fetched_state = None
+        if fetched and fetched[0][0] <= since:
+            fetched_state = fetched[0][1:]
+            fetched = fetched[1:]
+        overlap = len(rows) - split
+        if known_state != fetched_state or fetched[:overlap] != rows[split:]:
+            return None
+        new = fetched[overlap:]
+        rows.extend(new)
+        if rows:
+            self.watermark = max(rows[-1][0], self.watermark or since)
+        self.delta_reads += 1
+        return new
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the window's state for diagnostics."""
+        return {
+            "start": self.start,
+            "watermark": self.watermark,
+            "rows": len(self.rows),
+            "full_reads": self.full_reads,
+            "delta_reads": self.delta_reads,
+        }
@@ -0,0 +1,182 @@
+"""Zone identity resolution for p2z_tracker."""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import ATTR_FRIENDLY_NAME, EVENT_STATE_CHANGED, STATE_HOME
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, LOGGER, STORE_SAVE_DELAY
+
+if TYPE_CHECKING:
+    from homeassistant.helpers.event import EventStateChangedData
+
+DATA_ZONE_RESOLVER = f"{DOMAIN}_zone_resolver"
+STORAGE_KEY = f"{DOMAIN}.zone_names"
+STORAGE_VERSION = 1
+ZONE_HOME = "zone.home"
+
+
+def person_state_for_zone(state: State) -> str:
+    """Return the person state that means being in a zone."""
+    # Persons in the home zone are "home", whatever the zone is called
+    if state.entity_id == ZONE_HOME:
+        return STATE_HOME
+    return state.attributes.get(ATTR_FRIENDLY_NAME, state.object_id)
+
+
+async def async_setup_zone_resolver(hass: HomeAssistant) -> ZoneResolver:
+    """Create the resolver shared by all config entries."""
+    resolver = ZoneResolver(hass)
+    await resolver.async_start()
+    hass.data[DATA_ZONE_RESOLVER] = resolver
+    return resolver
+
+
+@callback
+def async_get_zone_resolver(hass: HomeAssistant) -> ZoneResolver:
+    """Return the resolver shared by all config entries."""
+    return hass.data[DATA_ZONE_RESOLVER]
+
+
+class ZoneResolver:
+    """Map person states to zone entity IDs, remembering past zone names."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the resolver."""
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # Per zone, the names it had as [since, name] pairs, oldest first
+        self._history: dict[str, list[list[Any]]] = {}
+        # Zone entity IDs that were renamed, old to new
+        self._renamed: dict[str, str] = {}
+        # Per name, the zones that had it as (since, until, entity ID)
+        self._by_name: dict[str, list[tuple[float, float, str]]] = {}
+
+    async def async_start(self) -> None:
+        """Load the name history and start following zone changes."""
+        if data := await self._store.async_load():
+            self._history = data["names"]
+            self._renamed = data["renamed"]
+        now = dt_util.utcnow().timestamp()
+        for state in self._hass.states.async_all("zone"):
+            self._record(state, now)
+        self._rebuild()
+
+        self._hass.bus.async_listen(
+            EVENT_STATE_CHANGED,
+            self._async_state_changed,
+            event_filter=_is_zone_state_event,
+        )
+        self._hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED,
+            self._async_registry_updated,
+            event_filter=_is_zone_rename_event,
+        )
+
+    def canonical(self, entity_id: str) -> str:
+        """Return a zone's current entity ID, following renames."""
+        seen = {entity_id}
+        while (entity_id := self._renamed.get(entity_id, entity_id)) not in seen:
+            seen.add(entity_id)
+        return entity_id
+
+    def knows(self, entity_id: str) -> bool:
+        """Return whether a zone exists or existed."""
+        return self.canonical(entity_id) in self._history
+
+    def resolve(self, state: str, timestamp: float) -> str:
+        """Return the zone a person state meant at a time, or the state itself."""
+        candidates = self._by_name.get(state)
+        if not candidates:
+            return state
+        if len(candidates) == 1:
+            return candidates[0][2]
+        # Several zones had this name at some point, pick the one that had it then
+        for since, until, entity_id in candidates:
+            if since <= timestamp < until:
+                return entity_id
+        return candidates[-1][2]
+
+    def _record(self, state: State, since: float) -> bool:
+        """Record a zone's current name, returning whether it is new."""
+        name = person_state_for_zone(state)
+        history = self._history.setdefault(state.entity_id, [])
+        if history and history[-1][1] == name:
+            return False
+        history.append([since if history else 0.0, name])
+        return True
+
+    def _rebuild(self) -> None:
+        """Rebuild the name index from the history."""
+        by_name: dict[str, list[tuple[float, float, str]]] = {}
+        for entity_id, history in self._history.items():
+            for index, (since, name) in enumerate(history):
+                until = history[index + 1][0] if index + 1 < len(history) else math.inf
+                by_name.setdefault(name, []).append((since, until, entity_id))
+        for candidates in by_name.values():
+            candidates.sort()
+        self._by_name = by_name
+
+    def _async_save(self) -> None:
+        """Write the name history after a delay."""
+        self._store.async_delay_save(
+            lambda: {"names": self._history, "renamed": self._renamed},
+            STORE_SAVE_DELAY,
+        )
+
+    @callback
+    def _async_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Record a zone's new name."""
+        if (state := event.data["new_state"]) is None:
+            # Removed zones keep their names, so old visits still match
+            return
+        if self._record(state, dt_util.utcnow().timestamp()):
+            LOGGER.debug(
+                "Zone %s is now matched as '%s'",
+                state.entity_id,
+                person_state_for_zone(state),
+            )
+            self._rebuild()
+            self._async_save()
+
+    @callback
+    def _async_registry_updated(
+        self, event: Event[er.EventEntityRegistryUpdatedData]
+    ) -> None:
+        """Carry a renamed zone's name history over to its new entity ID."""
+        old_entity_id = event.data["old_entity_id"]
+        entity_id = event.data["entity_id"]
+        LOGGER.debug("Zone %s was renamed to %s", old_entity_id, entity_id)
+        self._renamed[old_entity_id] = entity_id
+        self._renamed.pop(entity_id, None)
+        history = self._history.pop(old_entity_id, [])
+        # Names already seen under the new ID only apply from now on
+        now = dt_util.utcnow().timestamp()
+        for since, name in self._history.get(entity_id, []):
+            if not history or history[-1][1] != name:
+                history.append([max(since, now), name])
+        self._history[entity_id] = history
+        self._rebuild()
+        self._async_save()
+
+
+@callback
+def _is_zone_state_event(event_data: EventStateChangedData) -> bool:
+    """Return whether a state change belongs to a zone."""
+    return event_data["entity_id"].startswith("zone.")
+
+
+@callback
+def _is_zone_rename_event(event_data: er.EventEntityRegistryUpdatedData) -> bool:
+    """Return whether a registry update changed a zone's entity ID."""
+    return (
+        event_data["action"] == "update"
+        and "old_entity_id" in event_data
+        and event_data["entity_id"].startswith("zone.")
+    )
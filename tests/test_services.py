@@ -0,0 +1,59 @@
+"""Tests for the p2z_tracker services."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.p2z_tracker import services  # noqa: E402
+
+PERSON = "person.john"
+START = datetime(2025, 1, 6, tzinfo=UTC)
+
+
+class _Resolver:
+    """Resolve the names of a fixed set of zones."""
+
+    def __init__(self, zones: dict[str, str]) -> None:
+        self._zones = zones
+
+    def resolve(self, state: str, timestamp: float) -> str:
+        return self._zones.get(state, state)
+
+
+def test_export_skips_states_without_zone(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Stays outside any zone are not exported as zone visits."""
+    states = [
+        SimpleNamespace(state=state, last_updated=START + timedelta(hours=hours))
+        for state, hours in (
+            ("home", 0),
+            ("not_home", 8),
+            ("Work", 9),
+            ("unavailable", 17),
+            ("home", 18),
+        )
+    ]
+    monkeypatch.setattr(
+        services.history,
+        "get_significant_states",
+        lambda hass, start, end, *args: {
+            PERSON: [state for state in states if start <= state.last_updated < end]
+        },
+    )
+    resolver = _Resolver({"home": "zone.home", "Work": "zone.work"})
+
+    rows = list(
+        services._iter_export_rows(
+            None, resolver, [PERSON], None, START, START + timedelta(hours=20)
+        )
+    )
+
+    assert [(row[1], row[4]) for row in rows] == [
+        ("zone.home", 8.0),
+        ("zone.work", 8.0),
+        ("zone.home", 2.0),
+    ]